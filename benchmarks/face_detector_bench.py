@@ -0,0 +1,86 @@
+"""Speed and accuracy of each face detector backend on the bundled sample frames.
+
+Every frame in benchmarks/frames/manifest.json is labelled with its true face
+count. For each backend this reports single-core frames/sec (decode + detect,
+as the video workers do) and how often the count would raise a wrong
+monitoring_alert:
+
+  false alarms   one face present, but the detector saw 0 or several
+  missed alerts  0 or several faces present, but the detector saw exactly one
+
+    python benchmarks/face_detector_bench.py --detectors haar,yunet --yunet-model models/face_detection_yunet_2023mar.onnx
+"""
+import os
+import sys
+import json
+import time
+import argparse
+
+import cv2
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from face_detectors import DETECTORS  # noqa: E402
+from face_tracking import decode_frame  # noqa: E402
+
+FRAMES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "frames")
+
+
+def load_frames(frames_dir):
+    with open(os.path.join(frames_dir, "manifest.json")) as f:
+        manifest = json.load(f)
+    frames = []
+    for entry in manifest["frames"]:
+        with open(os.path.join(frames_dir, entry["file"]), "rb") as f:
+            frames.append((entry, np.frombuffer(f.read(), np.uint8)))
+    return frames
+
+
+def benchmark(detector, frames, repeats):
+    counts = []
+    start = time.process_time()
+    for _ in range(repeats):
+        counts = []
+        for _, buf in frames:
+            image, _ = decode_frame(buf, detector.detect_width, detector.color)
+            counts.append(len(detector.detect(image)))
+    elapsed = time.process_time() - start
+    return counts, repeats * len(frames) / elapsed
+
+
+def main(args):
+    cv2.setNumThreads(1)  # Per-core throughput, as in a video worker process
+    frames = load_frames(args.frames_dir)
+
+    print(f"{len(frames)} frames from {args.frames_dir}\n")
+    print(f"{'detector':<10}{'fps/core':>10}{'exact':>8}{'false alarms':>14}{'missed alerts':>15}")
+    for name in args.detectors.split(","):
+        options = {"model_path": args.yunet_model} if name == "yunet" and args.yunet_model else {}
+        try:
+            detector = DETECTORS[name](**options)
+        except Exception as e:
+            print(f"{name:<10}unavailable: {e}")
+            continue
+
+        counts, fps = benchmark(detector, frames, args.repeats)
+        expected = [entry["faces"] for entry, _ in frames]
+        exact = sum(c == e for c, e in zip(counts, expected))
+        false_alarms = sum(e == 1 and c != 1 for c, e in zip(counts, expected))
+        missed = sum(e != 1 and c == 1 for c, e in zip(counts, expected))
+        print(f"{name:<10}{fps:>10.1f}{exact:>5}/{len(frames):<2}{false_alarms:>14}{missed:>15}")
+
+        if args.verbose:
+            for (entry, _), count in zip(frames, counts):
+                if count != entry["faces"]:
+                    print(f"    {entry['file']}: expected {entry['faces']}, got {count} ({entry['note']})")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--detectors", default=",".join(DETECTORS))
+    parser.add_argument("--yunet-model", help="Path to face_detection_yunet ONNX (defaults to YUNET_MODEL_PATH)")
+    parser.add_argument("--frames-dir", default=FRAMES_DIR)
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("-v", "--verbose", action="store_true", help="List misclassified frames")
+    main(parser.parse_args())
@@ -0,0 +1,96 @@
+"""CPU cost per frame of the original face check vs tracked detection.
+
+Builds a short webcam-like clip from a face photo (small head movements on a
+plain background), JPEG-encodes each frame as the browser does, and times:
+
+  full     cv2.imdecode color + cvtColor + detectMultiScale at full resolution
+  tracked  decode_frame (reduced grayscale decode) + FaceTracker
+
+    python benchmarks/face_tracking_bench.py --image face.jpg --frames 200
+"""
+import os
+import sys
+import time
+import argparse
+
+import cv2
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from face_detectors import HaarDetector  # noqa: E402
+from face_tracking import FaceTracker, decode_frame  # noqa: E402
+
+RESOLUTIONS = [(640, 480), (1280, 720)]
+
+
+def make_clip(image, size, count, seed=0):
+    """JPEG frames with the photo drifting around the centre of the frame"""
+    width, height = size
+    rng = np.random.default_rng(seed)
+    face_h = int(height * 0.7)
+    face_w = int(image.shape[1] * face_h / image.shape[0])
+    face = cv2.resize(image, (face_w, face_h), interpolation=cv2.INTER_AREA)
+
+    frames = []
+    x, y = (width - face_w) // 2, (height - face_h) // 2
+    for _ in range(count):
+        x = int(np.clip(x + rng.integers(-6, 7), 0, width - face_w))
+        y = int(np.clip(y + rng.integers(-4, 5), 0, height - face_h))
+        frame = np.full((height, width, 3), 110, np.uint8)
+        frame[y:y + face_h, x:x + face_w] = face
+        frames.append(np.frombuffer(cv2.imencode('.jpg', frame, [cv2.IMWRITE_JPEG_QUALITY, 80])[1], np.uint8))
+    return frames
+
+
+def run_full(cascade, frames):
+    counts = []
+    for buf in frames:
+        frame = cv2.imdecode(buf, cv2.IMREAD_COLOR)
+        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+        counts.append(len(cascade.detectMultiScale(gray, 1.3, 5)))
+    return counts
+
+
+def run_tracked(cascade, frames, full_scan_every):
+    detector = HaarDetector(cascade)
+    tracker = FaceTracker(full_scan_every)
+    counts = []
+    for buf in frames:
+        gray, _ = decode_frame(buf, detector.detect_width)
+        counts.append(len(tracker.detect(detector, gray)))
+    return counts, tracker
+
+
+def timed(fn, *args):
+    start = time.process_time()
+    result = fn(*args)
+    return result, time.process_time() - start
+
+
+def main(args):
+    cv2.setNumThreads(1)  # Per-core cost, as in a video worker process
+    cascade = cv2.CascadeClassifier(cv2.data.haarcascades + 'haarcascade_frontalface_default.xml')
+    image = cv2.imread(args.image)
+    if image is None:
+        sys.exit(f"Could not read {args.image}")
+
+    for size in RESOLUTIONS:
+        frames = make_clip(image, size, args.frames)
+        full_counts, full_time = timed(run_full, cascade, frames)
+        (tracked_counts, tracker), tracked_time = timed(run_tracked, cascade, frames, args.full_scan_every)
+
+        agree = sum(a == b for a, b in zip(full_counts, tracked_counts)) / len(frames)
+        print(f"{size[0]}x{size[1]}: full {1000 * full_time / len(frames):.1f} ms/frame, "
+              f"tracked {1000 * tracked_time / len(frames):.1f} ms/frame "
+              f"({full_time / max(tracked_time, 1e-9):.1f}x less CPU)")
+        print(f"    full scans {tracker.full_scans}, roi scans {tracker.roi_scans}, "
+              f"face count agreement {100 * agree:.1f}%")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--image", required=True, help="Photo with one face")
+    parser.add_argument("--frames", type=int, default=200)
+    parser.add_argument("--full-scan-every", type=int, default=10)
+    main(parser.parse_args())
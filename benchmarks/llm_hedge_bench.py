@@ -0,0 +1,91 @@
+"""Tail latency of LLM calls with and without hedging, against stub backends.
+
+The standard tier answers in ~--latency seconds but --slow-rate of its
+calls take --slow-latency; the fast tier is quicker and has no slow tail.
+Each scenario runs --calls calls (--concurrency at a time) through one
+LLMClient, as generate() and as stream() (time to first chunk):
+
+  no hedging         every call waits for the standard tier
+  hedge same tier    duplicate on the standard tier after its p50
+  hedge fast tier    duplicate on the fast tier after the standard p50
+
+    python benchmarks/llm_hedge_bench.py --calls 400 --slow-rate 0.1
+"""
+import os
+import sys
+import time
+import random
+import asyncio
+import argparse
+import statistics
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from llm_client import LLMClient, StubBackend  # noqa: E402
+
+SCENARIOS = {
+    "no hedging": None,
+    "hedge same tier": "standard",
+    "hedge fast tier": "fast",
+}
+
+
+def percentile(samples, q):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+async def run_calls(client, args, streaming):
+    gate = asyncio.Semaphore(args.concurrency)
+    latencies = []
+
+    async def call():
+        async with gate:
+            start = time.perf_counter()
+            if streaming:
+                async for _ in client.stream("Say something short.", kind="bench"):
+                    latencies.append(time.perf_counter() - start)
+                    break
+            else:
+                await client.generate("Say something short.", kind="bench")
+                latencies.append(time.perf_counter() - start)
+
+    await asyncio.gather(*(call() for _ in range(args.calls)))
+    return latencies
+
+
+async def scenario(hedge, args, streaming):
+    random.seed(args.seed)
+    backends = {
+        "standard": StubBackend(latency=args.latency, jitter=args.latency / 4,
+                                slow_rate=args.slow_rate, slow_latency=args.slow_latency),
+        "fast": StubBackend(latency=args.latency / 2, jitter=args.latency / 8),
+    }
+    routes = {"bench": {"tier": "standard", "deadline": 30.0, "hedge": hedge}}
+    client = LLMClient(backends=backends, routes=routes, max_concurrency=4 * args.concurrency,
+                       requests_per_minute=10 ** 6, tokens_per_minute=10 ** 8)
+    latencies = await run_calls(client, args, streaming)
+    stats = client.stats()
+    return latencies, stats["hedged"], stats["hedge_wins"]
+
+
+def main(args):
+    print(f"{args.calls} calls, {args.concurrency} concurrent, standard tier {args.latency}s "
+          f"with {args.slow_rate:.0%} at {args.slow_latency}s\n")
+    for streaming in (False, True):
+        print("stream (first chunk)" if streaming else "generate")
+        for name, hedge in SCENARIOS.items():
+            latencies, hedged, wins = asyncio.run(scenario(hedge, args, streaming))
+            print(f"    {name:<18} p50 {statistics.median(latencies):6.2f}s  p95 {percentile(latencies, 0.95):6.2f}s"
+                  f"  p99 {percentile(latencies, 0.99):6.2f}s  hedged {hedged:>4}  hedge wins {wins:>4}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--calls", type=int, default=400)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--latency", type=float, default=0.4, help="Typical standard-tier latency (s)")
+    parser.add_argument("--slow-rate", type=float, default=0.1, help="Share of standard-tier calls that are slow")
+    parser.add_argument("--slow-latency", type=float, default=3.0, help="Latency of a slow call (s)")
+    parser.add_argument("--seed", type=int, default=0)
+    main(parser.parse_args())
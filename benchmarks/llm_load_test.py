@@ -0,0 +1,69 @@
+"""Offline load test for the shared LLM scheduler.
+
+Simulates many interview sessions calling LLMClient against the stub
+backend and reports latency percentiles, fallbacks and breaker activity.
+
+    python benchmarks/llm_load_test.py --sessions 500 --turns 7 --failure-rate 0.1
+"""
+import os
+import sys
+import time
+import asyncio
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from llm_client import LLMClient, StubBackend  # noqa: E402
+
+
+def percentile(values, pct):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * pct / 100))]
+
+
+async def session(client, turns, latencies, fallbacks):
+    for _ in range(turns):
+        start = time.monotonic()
+        reply = await client.generate("Ask the candidate one SaaS sales question.", fallback=None)
+        latencies.append(time.monotonic() - start)
+        if reply is None:
+            fallbacks.append(1)
+
+
+async def main(args):
+    backend = StubBackend(latency=args.latency, jitter=args.latency / 2, failure_rate=args.failure_rate)
+    client = LLMClient(
+        backend=backend,
+        max_concurrency=args.concurrency,
+        requests_per_minute=args.rpm,
+        deadline=args.deadline,
+        breaker_cooldown=args.breaker_cooldown,
+    )
+    latencies, fallbacks = [], []
+
+    start = time.monotonic()
+    await asyncio.gather(*(session(client, args.turns, latencies, fallbacks) for _ in range(args.sessions)))
+    elapsed = time.monotonic() - start
+
+    total = len(latencies)
+    print(f"sessions={args.sessions} turns={args.turns} calls={total} elapsed={elapsed:.1f}s "
+          f"throughput={total / elapsed:.1f} calls/s")
+    print(f"latency p50={percentile(latencies, 50):.2f}s p95={percentile(latencies, 95):.2f}s "
+          f"p99={percentile(latencies, 99):.2f}s max={max(latencies):.2f}s")
+    print(f"fallbacks={len(fallbacks)} ({100.0 * len(fallbacks) / total:.1f}%)")
+    print(f"client stats: {client.stats()}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sessions", type=int, default=200)
+    parser.add_argument("--turns", type=int, default=7)
+    parser.add_argument("--latency", type=float, default=0.8, help="Mean stub latency (s)")
+    parser.add_argument("--failure-rate", type=float, default=0.05)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--rpm", type=int, default=6000, help="Requests per minute limit")
+    parser.add_argument("--deadline", type=float, default=8.0)
+    parser.add_argument("--breaker-cooldown", type=float, default=5.0)
+    asyncio.run(main(parser.parse_args()))
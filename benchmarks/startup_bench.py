@@ -0,0 +1,82 @@
+"""Import and boot time of the web backend, each measured in a fresh interpreter.
+
+  import flask_backend   module import, as the uvicorn server does at boot
+  boot                   import + initialize one interview session (InterviewCore)
+  session init (warm)    initializing a further session once the process is up
+  import hihi            the Tk desktop bot module, without starting the GUI
+
+followed by the import cost of each heavy third-party dependency, so the
+numbers can be compared against what the server no longer loads.
+
+Polly prewarming is turned off and GEMINI_API_KEY gets a placeholder unless
+already set; nothing here makes a network call.
+
+    python benchmarks/startup_bench.py --repeats 5
+"""
+import os
+import sys
+import statistics
+import subprocess
+import argparse
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+STEPS = {
+    "import flask_backend": "import flask_backend",
+    "boot": "import flask_backend\nok, msg = flask_backend.WebInterviewBot('bench').initialize_bot()\n"
+            "assert ok, msg",
+    "session init (warm)": "import flask_backend\nflask_backend.WebInterviewBot('first').initialize_bot()\n"
+                           "_start = time.perf_counter()\n"
+                           "ok, msg = flask_backend.WebInterviewBot('bench').initialize_bot()\nassert ok, msg",
+    "import hihi": "import hihi",
+}
+
+DEPENDENCIES = [
+    "google.generativeai", "boto3", "cv2", "socketio",
+    "pygame", "speech_recognition", "pyttsx3", "pygetwindow", "tkinter", "PIL.ImageTk",
+]
+
+TIMER = """import time
+_start = time.perf_counter()
+{code}
+print(time.perf_counter() - _start)
+"""
+
+
+def timed_run(code, env):
+    """Seconds taken by code in a new interpreter, or the error it failed with"""
+    result = subprocess.run([sys.executable, "-c", TIMER.format(code=code)], cwd=ROOT, env=env,
+                            capture_output=True, text=True)
+    if result.returncode != 0:
+        lines = result.stderr.strip().splitlines()
+        return None, lines[-1] if lines else f"exit code {result.returncode}"
+    return float(result.stdout.strip().splitlines()[-1]), None
+
+
+def measure(code, env, repeats):
+    times = []
+    for _ in range(repeats):
+        seconds, error = timed_run(code, env)
+        if error:
+            return f"failed: {error}"
+        times.append(seconds)
+    return f"{1000 * statistics.median(times):8.1f} ms"
+
+
+def main(args):
+    env = dict(os.environ, TTS_PREWARM="0", PYTHONWARNINGS="ignore")
+    env.setdefault("GEMINI_API_KEY", "benchmark-placeholder")
+    env.setdefault("AWS_REGION", "ap-south-1")
+
+    print(f"median of {args.repeats} fresh interpreters\n")
+    for name, code in STEPS.items():
+        print(f"{name:<24}{measure(code, env, args.repeats)}")
+    print()
+    for module in DEPENDENCIES:
+        print(f"{'import ' + module:<24}{measure(f'import {module}', env, args.repeats)}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeats", type=int, default=5)
+    main(parser.parse_args())
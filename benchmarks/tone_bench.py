@@ -0,0 +1,127 @@
+"""Throughput of tone detection on a synthetic transcript corpus.
+
+Compares, for the default lexicons and for a large generated one:
+
+  loop     one re.search per phrase, as the old _detect_tone did (with the
+           escaping fixed so that it actually matches)
+  flat     all phrases in one plain alternation
+  detect   ToneDetector.detect (prefix-factored alternation), per transcript
+  batch    ToneDetector.detect_batch over the whole corpus
+
+and checks that every method tags the corpus the same way. loop only runs
+on the first --loop-sample transcripts; it takes minutes on large lexicons.
+
+    python benchmarks/tone_bench.py --transcripts 20000 --lexicon-size 2000
+"""
+import os
+import re
+import sys
+import time
+import random
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from tone_detection import DEFAULT_LEXICONS, PROFESSIONAL, ToneDetector, _normalize  # noqa: E402
+
+WORDS = ("we qualify leads by budget authority need and timeline then run a discovery call "
+         "to map the buying committee and build a business case around measurable roi for "
+         "the champion while handling pricing objections with a clear value story").split()
+
+
+def make_corpus(count, lexicons, hit_rate, seed=0):
+    rng = random.Random(seed)
+    phrases = [p for ps in lexicons.values() for p in ps]
+    corpus = []
+    for _ in range(count):
+        words = rng.choices(WORDS, k=rng.randint(20, 120))
+        if rng.random() < hit_rate:
+            words.insert(rng.randrange(len(words)), rng.choice(phrases))
+        corpus.append(" ".join(words).capitalize() + ".")
+    return corpus
+
+
+def make_lexicons(size, seed=1):
+    """The default lexicons plus generated two- and three-word phrases"""
+    rng = random.Random(seed)
+    lexicons = {tone: list(phrases) for tone, phrases in DEFAULT_LEXICONS.items()}
+    tones = list(lexicons)
+    letters = "abcdefghijklmnopqrstuvwxyz"
+    while sum(map(len, lexicons.values())) < size:
+        words = ["".join(rng.choices(letters, k=rng.randint(3, 8))) for _ in range(rng.randint(2, 3))]
+        lexicons[rng.choice(tones)].append(" ".join(words))
+    return lexicons
+
+
+def loop_detector(lexicons):
+    compiled = [(tone, r'(?<!\w)' + re.escape(_normalize(p)) + r'(?!\w)') for tone, ps in lexicons.items() for p in ps]
+
+    def detect(text):
+        text = _normalize(text)
+        for tone, pattern in compiled:
+            if re.search(pattern, text):
+                return tone
+        return PROFESSIONAL
+    return detect
+
+
+def flat_detector(lexicons):
+    tone_of = {}
+    for tone, phrases in lexicons.items():
+        for p in phrases:
+            tone_of.setdefault(_normalize(p), tone)
+    rank = {tone: i for i, tone in enumerate(lexicons)}
+    pattern = re.compile(r'(?<!\w)(?:' + '|'.join(sorted(map(re.escape, tone_of), key=len, reverse=True)) + r')(?!\w)')
+
+    def detect(text):
+        hits = {tone_of[m.group()] for m in pattern.finditer(_normalize(text))}
+        return min(hits, key=rank.__getitem__) if hits else PROFESSIONAL
+    return detect
+
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - start
+
+
+def run(name, lexicons, corpus, loop_sample):
+    size = sum(map(len, corpus)) / 1e6
+    print(f"{name}: {sum(map(len, lexicons.values()))} phrases, {len(corpus)} transcripts ({size:.1f} MB)")
+    build_start = time.perf_counter()
+    detector = ToneDetector(lexicons)
+    print(f"    compile {1000 * (time.perf_counter() - build_start):.1f} ms")
+
+    loop, flat = loop_detector(lexicons), flat_detector(lexicons)
+    methods = {
+        "loop": lambda: [loop(t) for t in corpus[:loop_sample]],
+        "flat": lambda: [flat(t) for t in corpus],
+        "detect": lambda: [detector.detect(t) for t in corpus],
+        "batch": lambda: detector.detect_batch(corpus),
+    }
+    reference = None
+    for method, fn in methods.items():
+        tones, elapsed = timed(fn)
+        reference = reference or tones
+        scanned = corpus[:len(tones)]
+        mb = sum(map(len, scanned)) / 1e6
+        flagged = sum(t != PROFESSIONAL for t in tones)
+        agree = "" if tones[:len(reference)] == reference else "  MISMATCH vs loop"
+        print(f"    {method:<7}{len(tones) / elapsed:>12,.0f} transcripts/s {mb / elapsed:>8.1f} MB/s"
+              f"  flagged {flagged}/{len(tones)}{agree}")
+
+
+def main(args):
+    corpus = make_corpus(args.transcripts, DEFAULT_LEXICONS, args.hit_rate)
+    run("default lexicons", DEFAULT_LEXICONS, corpus, args.loop_sample)
+    large = make_lexicons(args.lexicon_size)
+    run("large lexicons", large, make_corpus(args.transcripts, large, args.hit_rate), args.loop_sample)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--transcripts", type=int, default=20000)
+    parser.add_argument("--lexicon-size", type=int, default=2000)
+    parser.add_argument("--loop-sample", type=int, default=500, help="Transcripts timed with the per-phrase loop")
+    parser.add_argument("--hit-rate", type=float, default=0.1, help="Share of transcripts containing a phrase")
+    main(parser.parse_args())
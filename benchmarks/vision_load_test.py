@@ -0,0 +1,68 @@
+"""Load test for the cross-session video scheduler.
+
+Simulates N interview sessions uploading the bundled sample frames at the
+browser's capture rate and reports detector throughput, CPU used and how
+evenly analyses were shared between sessions.
+
+    python benchmarks/vision_load_test.py --sessions 50 --seconds 20 --cpu-budget 1.0
+"""
+import os
+import sys
+import time
+import argparse
+import threading
+from collections import Counter
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from video_analysis import VideoAnalyzer  # noqa: E402
+from face_detector_bench import FRAMES_DIR, load_frames  # noqa: E402
+
+
+def main(args):
+    frames = [buf.tobytes() for entry, buf in load_frames(FRAMES_DIR) if entry["faces"] == 1]
+    analyzer = VideoAnalyzer(workers=args.workers, detector=args.detector,
+                             tick_interval=args.tick, cpu_budget=args.cpu_budget)
+    results = Counter()
+    lock = threading.Lock()
+
+    def on_result(session):
+        def record(faces):
+            with lock:
+                results[session] += 1
+        return record
+
+    sessions = [f"session-{i}" for i in range(args.sessions)]
+    callbacks = {s: on_result(s) for s in sessions}
+    uploads = 0
+    start = time.monotonic()
+    while time.monotonic() - start < args.seconds:
+        for i, session in enumerate(sessions):
+            analyzer.submit(session, frames[(uploads + i) % len(frames)], callbacks[session])
+        uploads += 1
+        time.sleep(args.interval)
+    time.sleep(1.0)  # Let in-flight batches finish
+    elapsed = time.monotonic() - start
+
+    stats = analyzer.stats()
+    analyzer.shutdown()
+    per_session = [results[s] for s in sessions]
+    print(f"sessions={args.sessions} uploads={uploads * args.sessions} analyzed={stats['analyzed']} "
+          f"in {elapsed:.1f}s ({stats['analyzed'] / elapsed:.1f} frames/s)")
+    print(f"detector cpu={stats['cpu_seconds']:.1f}s ({stats['cpu_seconds'] / elapsed:.2f} cores, "
+          f"budget {stats['cpu_budget']}) batches={stats['batches']} "
+          f"replaced={stats['replaced']} deferred={stats['deferred']}")
+    print(f"analyses per session: min={min(per_session)} max={max(per_session)} "
+          f"mean={sum(per_session) / len(per_session):.1f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sessions", type=int, default=20)
+    parser.add_argument("--seconds", type=float, default=15)
+    parser.add_argument("--interval", type=float, default=1.0, help="Seconds between uploads per session")
+    parser.add_argument("--workers", type=int, default=2)
+    parser.add_argument("--detector", default="haar")
+    parser.add_argument("--tick", type=float, default=0.2)
+    parser.add_argument("--cpu-budget", type=float, default=None, help="Detector CPU cap in cores")
+    main(parser.parse_args())
@@ -0,0 +1,86 @@
+import asyncio
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
+
+
+class Cancelled(asyncio.CancelledError):
+    """Raised by work that stopped because its CancellationToken was cancelled.
+
+    A CancelledError, so `except Exception` handlers let it through and the
+    task running it ends as cancelled.
+    """
+
+
+class CancellationToken:
+    """One-shot, thread-safe stop signal shared by all of one interview's work.
+
+    Socket threads cancel it (end, reset, disconnect). Coroutines and executor
+    threads check it before starting work (raise_if_cancelled) or between
+    steps (cancelled), and run() cancels an awaitable in flight, even one in
+    a task nobody awaits, as soon as the token fires.
+    """
+    def __init__(self):
+        self._event = threading.Event()
+        self._lock = threading.Lock()
+        self._callbacks = []
+        self.reason = None
+
+    @property
+    def cancelled(self):
+        return self._event.is_set()
+
+    def cancel(self, reason="cancelled"):
+        """Cancel and run the registered callbacks; False if it already was"""
+        with self._lock:
+            if self._event.is_set():
+                return False
+            self.reason = reason
+            self._event.set()
+            callbacks, self._callbacks = self._callbacks, []
+        for callback in callbacks:
+            try:
+                callback()
+            except Exception as e:
+                logger.warning(f"Cancellation callback failed: {e}")
+        return True
+
+    def add_callback(self, callback):
+        """Call callback() on cancellation (right away if already cancelled)"""
+        with self._lock:
+            if not self._event.is_set():
+                self._callbacks.append(callback)
+                return
+        callback()
+
+    def remove_callback(self, callback):
+        with self._lock:
+            if callback in self._callbacks:
+                self._callbacks.remove(callback)
+
+    def raise_if_cancelled(self):
+        if self._event.is_set():
+            raise Cancelled(self.reason)
+
+    async def run(self, awaitable):
+        """Await awaitable, cancelling it (and raising Cancelled) when the token fires"""
+        if self.cancelled:
+            if asyncio.iscoroutine(awaitable):
+                awaitable.close()
+            raise Cancelled(self.reason)
+        task = asyncio.ensure_future(awaitable)
+        loop = asyncio.get_running_loop()
+
+        def cancel():
+            loop.call_soon_threadsafe(task.cancel)
+
+        self.add_callback(cancel)
+        try:
+            return await task
+        except asyncio.CancelledError:
+            if self.cancelled:
+                raise Cancelled(self.reason) from None
+            raise
+        finally:
+            self.remove_callback(cancel)
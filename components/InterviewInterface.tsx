@@ -1,7 +1,8 @@
-import { useState, useEffect, useRef } from "react"
+import { useState, useEffect, useRef, useCallback } from "react"
 import { Button } from "@/components/ui/button"
 import { Mic, MicOff, Video, VideoOff, Phone, MessageCircle, Volume2, VolumeX, CheckCircle, Headphones } from "lucide-react"
 import { Alert, AlertDescription } from "@/components/ui/alert"
+import { CaptureSettings, DEFAULT_CAPTURE_SETTINGS, captureFrame } from "@/lib/capture"
 
 interface Message {
   speaker: "AI" | "User"
@@ -9,11 +10,47 @@ interface Message {
   timestamp: number
 }
 
-const VideoFeed = ({ isVideoOff, isMuted, onVideoFrame }) => {
+interface StreamingClip {
+  message: string
+  nextSeq: number
+  pending: Map<number, Uint8Array | null>
+  ready: Uint8Array[]
+  ended: boolean
+  audio: HTMLAudioElement | null
+  mediaSource: MediaSource | null
+  sourceBuffer: SourceBuffer | null
+}
+
+// Audio arrives as a binary attachment (ArrayBuffer) or, from older servers, base64 text
+const audioToBytes = (data: string | ArrayBuffer | Uint8Array) => {
+  if (typeof data !== "string") return data instanceof Uint8Array ? data : new Uint8Array(data)
+  const binary = atob(data)
+  const bytes = new Uint8Array(binary.length)
+  for (let i = 0; i < binary.length; i++) bytes[i] = binary.charCodeAt(i)
+  return bytes
+}
+
+const canStreamMp3 = () =>
+  typeof window !== "undefined" && "MediaSource" in window && MediaSource.isTypeSupported("audio/mpeg")
+
+const VideoFeed = ({ isVideoOff, isMuted, onVideoFrame, captureSettings }) => {
   const videoRef = useRef<HTMLVideoElement>(null)
   const canvasRef = useRef<HTMLCanvasElement>(null)
   const streamRef = useRef<MediaStream | null>(null)
 
+  // Capture frames at the rate, size and quality the server asked for
+  useEffect(() => {
+    if (isVideoOff) return
+
+    const interval = setInterval(() => {
+      const video = videoRef.current
+      const canvas = canvasRef.current
+      if (video && canvas) captureFrame(video, canvas, captureSettings, onVideoFrame)
+    }, captureSettings.interval * 1000)
+
+    return () => clearInterval(interval)
+  }, [isVideoOff, onVideoFrame, captureSettings])
+
   useEffect(() => {
     if (!isVideoOff) {
       navigator.mediaDevices.getUserMedia({ video: true, audio: !isMuted })
@@ -133,17 +170,33 @@ export default function InterviewInterface() {
   const [speechRecognitionSupported, setSpeechRecognitionSupported] = useState(false)
   const [socketConnected, setSocketConnected] = useState(false)
   const [connectionAttempts, setConnectionAttempts] = useState(0)
+  const [captureSettings, setCaptureSettings] = useState<CaptureSettings>(DEFAULT_CAPTURE_SETTINGS)
 
   const alertIdRef = useRef(0)
   const speechSynthRef = useRef<SpeechSynthesis | null>(null)
   const currentUtteranceRef = useRef<SpeechSynthesisUtterance | null>(null)
   const autoStartTimeoutRef = useRef<NodeJS.Timeout | null>(null)
   const recognitionRef = useRef<any>(null)
+  const lastPartialRef = useRef('')  // Last interim transcript sent as user_partial
   const silenceTimeoutRef = useRef<NodeJS.Timeout | null>(null)
   const socketRef = useRef<any>(null)
   const reconnectTimeoutRef = useRef<NodeJS.Timeout | null>(null)
   const audioQueueRef = useRef<HTMLAudioElement[]>([])
   const isAudioPlayingRef = useRef(false)
+  const streamingClipsRef = useRef<Map<string, StreamingClip>>(new Map())
+
+  // Tell the server an utterance finished so it can move on without fixed pauses
+  const ackPlayback = (utteranceId?: string) => {
+    if (utteranceId && socketRef.current?.connected) {
+      socketRef.current.emit("audio_playback_ended", { utterance_id: utteranceId });
+    }
+  };
+
+  const queueAudio = (audio: HTMLAudioElement, utteranceId?: string) => {
+    if (utteranceId) audio.dataset.utteranceId = utteranceId;
+    audioQueueRef.current.push(audio); // 📦 Queue the audio
+    processPollyQueue();               // ▶️ Start processing queue
+  };
 
   const processPollyQueue = () => {
     if (isAudioPlayingRef.current || audioQueueRef.current.length === 0) return;
@@ -162,6 +215,7 @@ export default function InterviewInterface() {
       setIsAISpeaking(false);
       isAudioPlayingRef.current = false;
       console.log("✅ Polly audio ended");
+      ackPlayback(nextAudio.dataset.utteranceId);
       processPollyQueue(); // 🔁 Continue to next
     };
 
@@ -169,6 +223,7 @@ export default function InterviewInterface() {
       console.error("❌ Polly audio error:", e);
       setIsAISpeaking(false);
       isAudioPlayingRef.current = false;
+      ackPlayback(nextAudio.dataset.utteranceId);
       processPollyQueue();
     };
 
@@ -176,9 +231,97 @@ export default function InterviewInterface() {
       console.error("❌ Polly audio failed to play:", err);
       setIsAISpeaking(false);
       isAudioPlayingRef.current = false;
+      ackPlayback(nextAudio.dataset.utteranceId);
       processPollyQueue();
     });
   };
+  const speakFallback = (text: string, utteranceId?: string) => {
+    console.warn("⚠️ Polly audio missing, using fallback voice.");
+    if (!speechSynthRef.current) {
+      ackPlayback(utteranceId);
+      return;
+    }
+    const utterance = new SpeechSynthesisUtterance(text);
+    utterance.onstart = () => setIsAISpeaking(true);
+    utterance.onend = () => {
+      setIsAISpeaking(false);
+      ackPlayback(utteranceId);
+    };
+    utterance.onerror = () => {
+      setIsAISpeaking(false);
+      ackPlayback(utteranceId);
+    };
+    speechSynthRef.current.speak(utterance);
+  };
+
+  // Feed buffered chunks into the MediaSource one append at a time
+  const flushStreamingClip = (clip: StreamingClip) => {
+    const { mediaSource, sourceBuffer } = clip;
+    if (!mediaSource || !sourceBuffer || sourceBuffer.updating) return;
+    const next = clip.ready.shift();
+    if (next) {
+      sourceBuffer.appendBuffer(next);
+    } else if (clip.ended && mediaSource.readyState === "open") {
+      mediaSource.endOfStream();
+    }
+  };
+
+  const startStreamingClip = (utteranceId: string, message: string) => {
+    streamingClipsRef.current.set(utteranceId, {
+      message,
+      nextSeq: 0,
+      pending: new Map(),
+      ready: [],
+      ended: false,
+      audio: null,
+      mediaSource: null,
+      sourceBuffer: null,
+    });
+  };
+
+  // Start playback as soon as the first chunk arrives (MediaSource), or
+  // assemble the whole clip when MediaSource can't play MP3
+  const handleAudioChunk = (data: any) => {
+    const clip = streamingClipsRef.current.get(data.utterance_id);
+    if (!clip) return;
+
+    clip.pending.set(data.seq, data.final ? null : audioToBytes(data.audio));
+    while (clip.pending.has(clip.nextSeq)) {
+      const bytes = clip.pending.get(clip.nextSeq);
+      clip.pending.delete(clip.nextSeq);
+      clip.nextSeq++;
+      if (bytes === null) {
+        clip.ended = true;
+      } else if (bytes) {
+        clip.ready.push(bytes);
+      }
+    }
+
+    const hasAudio = clip.nextSeq > (clip.ended ? 1 : 0);
+    if (!clip.audio && hasAudio && canStreamMp3()) {
+      const mediaSource = new MediaSource();
+      clip.mediaSource = mediaSource;
+      clip.audio = new Audio(URL.createObjectURL(mediaSource));
+      mediaSource.addEventListener("sourceopen", () => {
+        clip.sourceBuffer = mediaSource.addSourceBuffer("audio/mpeg");
+        clip.sourceBuffer.addEventListener("updateend", () => flushStreamingClip(clip));
+        flushStreamingClip(clip);
+      });
+      queueAudio(clip.audio, data.utterance_id);
+    }
+    flushStreamingClip(clip);
+
+    if (clip.ended) {
+      streamingClipsRef.current.delete(data.utterance_id);
+      if (!hasAudio) {
+        speakFallback(clip.message, data.utterance_id);
+      } else if (!clip.audio) {
+        const blob = new Blob(clip.ready, { type: "audio/mpeg" });
+        queueAudio(new Audio(URL.createObjectURL(blob)), data.utterance_id);
+      }
+    }
+  };
+
   // SocketIO connection using socket.io-client
   const connectSocket = () => {
     try {
@@ -209,17 +352,15 @@ export default function InterviewInterface() {
       socket.on("ai_response", (data: any) => {
         console.log("📡 Received ai_response:", data);
         console.log("🔊 Polly audio present?", !!data.audio);
-        console.log("🎧 Audio base64 preview:", data.audio?.slice(0, 30));
-        if (data.audio) {
-          const audio = new Audio(`data:audio/mp3;base64,${data.audio}`);
-          audioQueueRef.current.push(audio); // 📦 Queue the audio
-          processPollyQueue();               // ▶️ Start processing queue
+        if (data.streaming) {
+          startStreamingClip(data.utterance_id, data.message); // 🔊 Audio follows as ai_audio_chunk
+        } else if (data.audio) {
+          const audio = typeof data.audio === "string"
+            ? new Audio(`data:audio/mp3;base64,${data.audio}`)
+            : new Audio(URL.createObjectURL(new Blob([data.audio], { type: "audio/mpeg" })));
+          queueAudio(audio, data.utterance_id);
         } else {
-          console.warn("⚠️ Polly audio missing, using fallback voice.");
-          const utterance = new SpeechSynthesisUtterance(data.message);
-          utterance.onstart = () => setIsAISpeaking(true);
-          utterance.onend = () => setIsAISpeaking(false);
-          speechSynthRef.current?.speak(utterance);
+          speakFallback(data.message, data.utterance_id);
         }
 
 
@@ -237,6 +378,13 @@ export default function InterviewInterface() {
       });
 
 
+      socket.on("ai_audio_chunk", handleAudioChunk);
+
+      // Server-driven webcam upload rate/size, tuned to its video analysis load
+      socket.on("capture_settings", (settings: Partial<CaptureSettings>) => {
+        setCaptureSettings(prev => ({ ...prev, ...settings }))
+      });
+
       socket.on('connection_response', (data) => {
         console.log('Connection response:', data)
         console.log("📢 AI responded:", data);
@@ -273,6 +421,12 @@ export default function InterviewInterface() {
         attemptReconnect()
       })
       
+      // Sent only when a monitoring check starts or stops failing, not per frame
+      socket.on('monitoring_alert', (data) => {
+        console.log('Monitoring alert:', data)
+        addAlert(data.message, data.severity === "critical" ? "error" : data.severity || "warning")
+      })
+
       socket.on('interview_ended', (data) => {
         console.log('Interview ended:', data)
         addAlert(data.message || "Interview ended", "info")
@@ -303,6 +457,12 @@ export default function InterviewInterface() {
     }
   }
 
+  const sendVideoFrame = useCallback((frame: ArrayBuffer) => {
+    if (socketRef.current && socketRef.current.connected) {
+      socketRef.current.emit('video_frame', { frame })
+    }
+  }, [])
+
   const sendMessage = (message: string, eventName: string = 'user_message') => {
     if (socketRef.current && socketRef.current.connected) {
       const data = {
@@ -319,6 +479,13 @@ export default function InterviewInterface() {
     }
   }
 
+  // Interim speech transcript; best effort, so nothing is reported if it can't be sent
+  const sendPartial = (partial: string) => {
+    if (socketRef.current && socketRef.current.connected) {
+      socketRef.current.emit('user_partial', { message: partial, timestamp: Date.now() })
+    }
+  }
+
   useEffect(() => {
     const SpeechRecognition = (window as any).SpeechRecognition || (window as any).webkitSpeechRecognition
     if (SpeechRecognition) {
@@ -326,7 +493,8 @@ export default function InterviewInterface() {
       
       const recognition = new SpeechRecognition()
       recognition.continuous = false
-      recognition.interimResults = false
+      // Interim results are streamed as user_partial so the server can draft its reply early
+      recognition.interimResults = true
       recognition.lang = 'en-US'
       
       recognition.onstart = () => {
@@ -336,13 +504,23 @@ export default function InterviewInterface() {
       
       recognition.onresult = (event: any) => {
         let finalTranscript = ''
+        let partialTranscript = ''
+        for (let i = 0; i < event.results.length; i++) {
+          partialTranscript += event.results[i][0].transcript
+        }
         for (let i = event.resultIndex; i < event.results.length; i++) {
           if (event.results[i].isFinal) {
             finalTranscript += event.results[i][0].transcript
           }
         }
+
+        if (!finalTranscript.trim() && partialTranscript.trim() !== lastPartialRef.current) {
+          lastPartialRef.current = partialTranscript.trim()
+          sendPartial(lastPartialRef.current)
+        }
         
         if (finalTranscript.trim()) {
+          lastPartialRef.current = ''
           console.log("Speech recognized:", finalTranscript.trim())
           sendUserMessage(finalTranscript.trim())
           stopListening()
@@ -659,7 +837,8 @@ export default function InterviewInterface() {
             <VideoFeed
               isVideoOff={isVideoOff}
               isMuted={isMuted}
-              onVideoFrame={(frame) => console.log('Video frame captured')}
+              onVideoFrame={sendVideoFrame}
+              captureSettings={captureSettings}
             />
             <div className="absolute bottom-4 left-4 bg-black bg-opacity-50 text-white px-2 py-1 rounded">You</div>
 
@@ -1,17 +1,24 @@
 "use client"
 
 import { useEffect, useRef } from "react"
+import { CaptureSettings, DEFAULT_CAPTURE_SETTINGS, captureFrame } from "@/lib/capture"
 
 interface VideoFeedProps {
   isVideoOff: boolean
   isMuted: boolean
-  onVideoFrame?: (frame: string) => void
+  onVideoFrame?: (frame: ArrayBuffer) => void
+  captureSettings?: CaptureSettings
 }
 
-export default function VideoFeed({ isVideoOff, isMuted, onVideoFrame }: VideoFeedProps) {
+export default function VideoFeed({ isVideoOff, isMuted, onVideoFrame, captureSettings = DEFAULT_CAPTURE_SETTINGS }: VideoFeedProps) {
   const videoRef = useRef<HTMLVideoElement>(null)
   const canvasRef = useRef<HTMLCanvasElement>(null)
   const streamRef = useRef<MediaStream | null>(null)
+  const settingsRef = useRef(captureSettings)
+
+  useEffect(() => {
+    settingsRef.current = captureSettings
+  }, [captureSettings])
 
   useEffect(() => {
     startCamera()
@@ -63,26 +70,16 @@ export default function VideoFeed({ isVideoOff, isMuted, onVideoFrame }: VideoFe
   }
 
   const startFrameCapture = () => {
-    const captureFrame = () => {
+    const capture = () => {
       if (videoRef.current && canvasRef.current && onVideoFrame) {
-        const canvas = canvasRef.current
-        const video = videoRef.current
-        const ctx = canvas.getContext("2d")
-
-        if (ctx) {
-          canvas.width = video.videoWidth
-          canvas.height = video.videoHeight
-          ctx.drawImage(video, 0, 0)
-
-          const frameData = canvas.toDataURL("image/jpeg", 0.8)
-          onVideoFrame(frameData)
-        }
+        // Raw JPEG bytes - Socket.IO ships them as a binary attachment
+        captureFrame(videoRef.current, canvasRef.current, settingsRef.current, onVideoFrame)
       }
 
-      setTimeout(captureFrame, 1000) // Capture every second
+      setTimeout(capture, settingsRef.current.interval * 1000) // Server-controlled capture interval
     }
 
-    setTimeout(captureFrame, 1000)
+    setTimeout(capture, settingsRef.current.interval * 1000)
   }
 
   return (
@@ -0,0 +1,136 @@
+import asyncio
+import logging
+
+from llm_client import approx_tokens
+
+logger = logging.getLogger(__name__)
+
+SPEAKERS = {'assistant': "Interviewer", 'user': "Candidate"}
+
+SUMMARY_PROMPT = """You keep running notes on a SaaS sales job interview.
+
+Current notes:
+{summary}
+
+New conversation to fold in:
+{turns}
+
+Rewrite the notes to include the new conversation. Keep the candidate's concrete experience,
+numbers, tools and claims, and which topics the interviewer has already asked about.
+Use at most {words} words. Reply with the notes only."""
+
+
+def _line(role, content):
+    return f"{SPEAKERS.get(role, role)}: {content}"
+
+
+class ConversationMemory:
+    """Token-budgeted interview context: recent turns verbatim plus a rolling summary.
+
+    Every message is stored with its approximate token count. Messages that
+    fall outside the newest recent_tokens are folded into the summary by
+    summarize(prompt) -> text, run as a background task whenever at least
+    summarize_batch tokens have aged out, so prompts never wait on it.
+    context() assembles the summary and as many recent turns as fit the
+    budget, so prompt size stays flat however long the interview runs.
+    Until a summary call succeeds, aged-out turns are simply kept (and may
+    be cut from the context by the budget).
+    """
+    def __init__(self, summarize=None, budget_tokens=600, recent_tokens=400,
+                 summary_tokens=150, summarize_batch=150):
+        self.summarize = summarize
+        self.budget_tokens = budget_tokens
+        self.recent_tokens = recent_tokens
+        self.summary_tokens = summary_tokens
+        self.summarize_batch = summarize_batch
+        self.summary = ""
+        self.turns = []  # (role, content, tokens) not yet in the summary, oldest first
+        self._task = None
+
+        self.summaries = 0
+        self.summary_failures = 0
+
+    def add(self, role, content):
+        """Record a message; call from the event loop so summarization can be scheduled"""
+        self.turns.append((role, content, approx_tokens(content)))
+        self._maybe_summarize()
+
+    def _aged_out(self):
+        """Number of oldest turns that fall outside the recent window"""
+        kept = 0
+        for i in range(len(self.turns) - 1, -1, -1):
+            kept += self.turns[i][2]
+            if kept > self.recent_tokens:
+                return i + 1
+        return 0
+
+    def _maybe_summarize(self):
+        if not self.summarize or (self._task and not self._task.done()):
+            return
+        count = self._aged_out()
+        if sum(t[2] for t in self.turns[:count]) < self.summarize_batch:
+            return
+        self._task = asyncio.get_running_loop().create_task(self._fold(count))
+
+    async def _fold(self, count):
+        turns = self.turns[:count]
+        prompt = SUMMARY_PROMPT.format(
+            summary=self.summary or "(none yet)",
+            turns="\n".join(_line(role, content) for role, content, _ in turns),
+            words=int(self.summary_tokens * 0.75),
+        )
+        try:
+            summary = await self.summarize(prompt)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.warning(f"Conversation summary failed: {e}")
+            summary = None
+        if not summary or not summary.strip():
+            self.summary_failures += 1
+            return
+        # Turns added meanwhile are after the folded ones, so a prefix drop is safe
+        self.summary = summary.strip()
+        del self.turns[:count]
+        self.summaries += 1
+        self._maybe_summarize()
+
+    def context(self, budget_tokens=None):
+        """Summary plus the newest turns that fit, oldest first, within the token budget"""
+        budget = self.budget_tokens if budget_tokens is None else budget_tokens
+        parts = []
+        summary = self.summary
+        if summary:
+            # Guard the budget if the model ignored the word limit
+            limit = min(self.summary_tokens, budget // 2) * 4
+            if len(summary) > limit:
+                summary = summary[:limit].rsplit(' ', 1)[0] + " ..."
+            budget -= approx_tokens(summary)
+
+        recent = []
+        for role, content, tokens in reversed(self.turns):
+            if tokens > budget:
+                break
+            recent.append(_line(role, content))
+            budget -= tokens
+        recent.reverse()
+
+        if summary:
+            parts.append(f"Earlier in the interview: {summary}")
+        if recent:
+            parts.append("\n".join(recent))
+        return "\n\n".join(parts)
+
+    def close(self):
+        """Cancel a pending summary (the interview ended)"""
+        if self._task and not self._task.done():
+            self._task.cancel()
+
+    def stats(self):
+        return {
+            'turns': len(self.turns),
+            'turn_tokens': sum(t[2] for t in self.turns),
+            'summary_tokens': approx_tokens(self.summary) if self.summary else 0,
+            'summaries': self.summaries,
+            'summary_failures': self.summary_failures,
+        }
@@ -0,0 +1,201 @@
+import cv2
+
+# Frames are analyzed at this width at most unless the detector asks for
+# another (HaarDetector.detect_width / YuNetDetector.detect_width)
+DETECT_WIDTH = 640
+# Scan the full frame at least this often, even while tracking succeeds
+FULL_SCAN_EVERY = 10
+# Search window around the last face, as a fraction of its size on each side
+ROI_PADDING = 0.5
+
+
+def _reduce(image, max_width):
+    """Downscale an image to at most max_width; returns (image, scale)"""
+    height, width = image.shape[:2]
+    if width <= max_width:
+        return image, 1.0
+    scale = max_width / width
+    return cv2.resize(image, (max_width, int(height * scale)), interpolation=cv2.INTER_AREA), scale
+
+
+# JPEG decoders can downscale by these factors for free while decoding
+_REDUCED_GRAYSCALE = [(8, cv2.IMREAD_REDUCED_GRAYSCALE_8), (4, cv2.IMREAD_REDUCED_GRAYSCALE_4),
+                      (2, cv2.IMREAD_REDUCED_GRAYSCALE_2)]
+_REDUCED_COLOR = [(8, cv2.IMREAD_REDUCED_COLOR_8), (4, cv2.IMREAD_REDUCED_COLOR_4),
+                  (2, cv2.IMREAD_REDUCED_COLOR_2)]
+
+
+def jpeg_size(buffer):
+    """(width, height) from a JPEG's start-of-frame header, or None if not a JPEG"""
+    data = memoryview(buffer).cast('B')
+    if len(data) < 4 or data[0] != 0xFF or data[1] != 0xD8:
+        return None
+    pos = 2
+    while pos + 9 <= len(data):
+        if data[pos] != 0xFF:
+            return None
+        marker = data[pos + 1]
+        if marker == 0xFF:  # Fill byte
+            pos += 1
+            continue
+        if 0xC0 <= marker <= 0xCF and marker not in (0xC4, 0xC8, 0xCC):
+            return (data[pos + 7] << 8) | data[pos + 8], (data[pos + 5] << 8) | data[pos + 6]
+        pos += 2 + ((data[pos + 2] << 8) | data[pos + 3])
+    return None
+
+
+def decode_frame(buffer, max_width=DETECT_WIDTH, color=False):
+    """Decode an encoded frame straight to reduced resolution (grayscale unless color).
+
+    For JPEG uploads the decoder itself downscales by 2/4/8 where that still
+    leaves at least max_width pixels, so full-resolution color pixels are
+    never materialized. Returns (image, scale) where scale maps original
+    coordinates to the image's, or (None, None) if the frame can't be decoded.
+    """
+    flag, factor = (cv2.IMREAD_COLOR if color else cv2.IMREAD_GRAYSCALE), 1
+    size = jpeg_size(buffer)
+    if size:
+        for reduction, reduced_flag in (_REDUCED_COLOR if color else _REDUCED_GRAYSCALE):
+            if size[0] // reduction >= max_width:
+                flag, factor = reduced_flag, reduction
+                break
+
+    image = cv2.imdecode(buffer, flag)
+    if image is None:
+        return None, None
+    image, scale = _reduce(image, max_width)
+    return image, scale / factor
+
+
+def reduce_frame(frame, max_width=DETECT_WIDTH, color=False):
+    """Reduced-resolution copy of a captured BGR frame (grayscale unless color); returns (image, scale)"""
+    if color:
+        return _reduce(frame, max_width)
+    return _reduce(cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY), max_width)
+
+
+class FaceTracker:
+    """Face detection that runs the full-frame detector only periodically.
+
+    Between full scans only a padded window around the last known face is
+    searched. Whenever that search doesn't find exactly one face (the
+    candidate moved away, turned, or someone else leaned in), the full
+    frame is scanned again on the same frame, so a face count of 0 or >1 is
+    always confirmed by a full scan. A second person entering elsewhere in
+    the frame is picked up by the next periodic full scan.
+
+    Holds only plain tracking state, so it can be pickled to a worker
+    process along with a frame and sent back updated.
+    """
+    def __init__(self, full_scan_every=FULL_SCAN_EVERY, padding=ROI_PADDING):
+        self.full_scan_every = full_scan_every
+        self.padding = padding
+        self.box = None  # (x, y, w, h) of the tracked face, in detection coordinates
+        self.frames_since_full_scan = 0
+        self.full_scans = 0
+        self.roi_scans = 0
+
+    def detect(self, detector, image):
+        """Return the faces in a (reduced) frame as a list of (x, y, w, h)"""
+        if self.box is not None and self.frames_since_full_scan < self.full_scan_every:
+            faces = self._search_roi(detector, image)
+            self.roi_scans += 1
+            if len(faces) == 1:
+                self.box = faces[0]
+                self.frames_since_full_scan += 1
+                return faces
+
+        faces = detector.detect(image)
+        self.full_scans += 1
+        self.frames_since_full_scan = 0
+        self.box = faces[0] if len(faces) == 1 else None
+        return faces
+
+    def _search_roi(self, detector, image):
+        x, y, w, h = self.box
+        pad_x, pad_y = int(w * self.padding), int(h * self.padding)
+        x0, y0 = max(0, x - pad_x), max(0, y - pad_y)
+        x1, y1 = min(image.shape[1], x + w + pad_x), min(image.shape[0], y + h + pad_y)
+        roi = image[y0:y1, x0:x1]
+        return [(fx + x0, fy + y0, fw, fh) for fx, fy, fw, fh in detector.detect(roi)]
+
+
+def scale_boxes(faces, scale):
+    """Map face boxes from detection coordinates back to the original frame"""
+    return [tuple(int(round(v / scale)) for v in face) for face in faces]
+
+
+# Thumbnail compared by the change gate; small enough that building it costs
+# a fraction of a full decode
+THUMBNAIL_SIZE = (32, 24)
+
+
+def thumbnail(buffer):
+    """Tiny grayscale thumbnail of an encoded frame, decoded at 1/8 scale where possible"""
+    flag = cv2.IMREAD_REDUCED_GRAYSCALE_8 if jpeg_size(buffer) else cv2.IMREAD_GRAYSCALE
+    image = cv2.imdecode(buffer, flag)
+    if image is None:
+        return None
+    return cv2.resize(image, THUMBNAIL_SIZE, interpolation=cv2.INTER_AREA)
+
+
+class ChangeGate:
+    """Skips detection on frames that look like the last analyzed one.
+
+    Each frame's thumbnail is compared with the thumbnail of the last frame
+    that went through the detector (not simply the previous upload, so slow
+    drift still adds up). The scene counts as changed when more than
+    changed_area of the thumbnail moved by over pixel_threshold grey levels,
+    e.g. someone stepping into the side of the frame. Whatever happens, a frame
+    is analyzed at least every max_staleness seconds.
+
+    Like FaceTracker it holds only plain state, so it travels to the video
+    workers with each frame.
+    """
+    def __init__(self, max_staleness=5.0, pixel_threshold=20, changed_area=0.02, outside_area=0.08):
+        self.max_staleness = max_staleness
+        self.pixel_threshold = pixel_threshold
+        self.changed_area = changed_area
+        self.outside_area = outside_area  # Change away from the tracked face that forces a full scan
+        self.reference = None  # Thumbnail of the last analyzed frame
+        self.faces = None      # Face count from that frame
+        self.analyzed_at = 0.0
+        self.moved = None      # Thumbnail pixels that changed in the last checked frame
+        self.skipped = 0
+        self.passed = 0
+
+    def check(self, thumb, now):
+        """Return the previous face count if this frame can reuse it, else None"""
+        if thumb is None or self.reference is None or self.faces is None:
+            self.moved = None
+            return None
+        self.moved = cv2.absdiff(thumb, self.reference) > self.pixel_threshold
+        if self.moved.mean() > self.changed_area or now - self.analyzed_at >= self.max_staleness:
+            return None
+        self.skipped += 1
+        return self.faces
+
+    def changed_outside(self, box, frame_shape, padding=ROI_PADDING):
+        """Whether the last checked frame changed away from box (x, y, w, h in frame_shape coordinates).
+
+        The tracker only searches around the known face, so a large change
+        elsewhere (a second person walking in) must trigger a full-frame scan;
+        the candidate shifting in their seat should not.
+        """
+        if self.moved is None:
+            return True
+        scale_x = THUMBNAIL_SIZE[0] / frame_shape[1]
+        scale_y = THUMBNAIL_SIZE[1] / frame_shape[0]
+        x, y, w, h = box
+        x0, y0 = int((x - w * padding) * scale_x), int((y - h * padding) * scale_y)
+        x1, y1 = int((x + w * (1 + padding)) * scale_x) + 1, int((y + h * (1 + padding)) * scale_y) + 1
+        outside = self.moved.copy()
+        outside[max(0, y0):max(0, y1), max(0, x0):max(0, x1)] = False
+        return outside.mean() > self.outside_area
+
+    def update(self, thumb, faces, now):
+        """Record the frame that was just analyzed"""
+        self.reference = thumb
+        self.faces = faces
+        self.analyzed_at = now
+        self.passed += 1
@@ -1,46 +1,306 @@
 from flask import Flask, request, jsonify
-from flask_socketio import SocketIO, emit
 from flask_cors import CORS
+from asgiref.wsgi import WsgiToAsgi
+import socketio
 import threading
 import queue
 import time
 import json
-import cv2
 import base64
-import numpy as np
 import traceback
 import asyncio
 from threading import Event
+from concurrent.futures import ThreadPoolExecutor
 import os
+import uuid
+import difflib
+import functools
+from contextlib import closing
+from tts_cache import TTSCache, mp3_duration, shared_polly_client
+from llm_client import (LLMClient, GeminiBackend, StubBackend, JsonStringField, JSON_REPLY_INSTRUCTION,
+                        parse_json_reply, stream_field, stream_sentences)
+from video_analysis import CAPTURE_TIERS, VideoAnalyzer, capture_tier
+from monitoring import ViolationMonitor
+from conversation_memory import ConversationMemory
+from question_bank import DEFAULT_BANK_FILE, QuestionBank
+from cancellation import CancellationToken
+from collections import Counter
 
-# Try to import your bot, with better error handling
+# Headless interview engine; the Tk desktop bot in hihi.py is never imported here
 try:
-    from hihi import SaaSInterviewBot
-    HIHI_AVAILABLE = True
+    from interview_core import (InterviewCore, GEMINI_FALLBACKS, TONE_RESPONSES, TONE_FINAL_REMINDER,
+                                shared_gemini_model)
+    CORE_AVAILABLE = True
 except ImportError as e:
-    print(f"Warning: Could not import SaaSInterviewBot from hihi.py: {e}")
-    print("Make sure hihi.py is in the same directory and contains the SaaSInterviewBot class")
-    HIHI_AVAILABLE = False
-    SaaSInterviewBot = None
+    print(f"Warning: Could not import InterviewCore from interview_core.py: {e}")
+    CORE_AVAILABLE = False
+    InterviewCore = None
+    GEMINI_FALLBACKS = []
+    TONE_RESPONSES = {}
+    TONE_FINAL_REMINDER = None
+
+# Fixed interviewer lines, spoken verbatim and prewarmed in the TTS cache
+SCRIPT = {
+    'greeting': "Hello! I'm Gyani, your AI interviewer for this SaaS Sales role. Welcome to the interview!",
+    'day_question': "Before we dive into the sales questions, how has your day been so far?",
+    'day_ack': "That's great to hear! I appreciate you taking the time for this interview.",
+    'intro_question': "To start, could you please introduce yourself and tell me a bit about your background in sales, particularly any experience with SaaS products?",
+    'intro_ack': "Thank you for that introduction. It's great to hear about your experience.",
+    'generic_question': "What do you think is the most important skill for a successful SaaS salesperson?",
+    'feedback_fallback': "Thanks for sharing that.",
+    'elaborate': "I'd love to hear more about your experience. Could you elaborate on that?",
+    'retry_ack': "Thank you for sharing that.",
+    'next_question': "Let me ask you a different question.",
+    'technical_issue': "We've encountered a technical issue. Thank you for your time today!",
+    'conclusion': "That was a great conversation. Thank you for sharing your insights about SaaS sales.",
+    'candidate_questions': "Do you have any questions for me about the role, the company, or the next steps?",
+    'questions_ack': "Those are great questions! The hiring team will be in touch with more details on the next steps very soon.",
+    'no_questions': "If you don't have any questions right now, that's perfectly fine.",
+    'farewell': "Thank you so much for your time today. It was a pleasure speaking with you, and I wish you the best of luck!",
+}
+
+# Sales questions list for fallback
+FALLBACK_QUESTIONS = [
+    "Can you walk me through your typical sales process when approaching a potential SaaS client?",
+    "How do you handle objections when a prospect says your SaaS solution is too expensive?",
+    "Describe a challenging SaaS deal you closed. What obstacles did you overcome?",
+    "How do you identify and qualify leads for B2B SaaS products?",
+    "What strategies do you use to demonstrate ROI to potential SaaS customers?",
+    "How do you handle long sales cycles typical in enterprise SaaS sales?",
+    "Tell me about a time you lost a significant SaaS deal. What did you learn?"
+]
 
 app = Flask(__name__)
 app.config['SECRET_KEY'] = 'your-secret-key'
-socketio = SocketIO(app, cors_allowed_origins="*")
 CORS(app)
 
+# Async Socket.IO server: every connection is state on the ASGI server's event loop, not a
+# thread. The Flask REST routes are served by the same ASGI app (asgi_app, at the end)
+sio = socketio.AsyncServer(async_mode="asgi", cors_allowed_origins="*")
+transport_loop = None  # The ASGI server's event loop, set at startup; owns every socket
+
+
+def emit_to(sid, event, data):
+    """Emit an event to one client from any thread; the send runs on the transport loop"""
+    loop = transport_loop
+    if loop is None or loop.is_closed():
+        return  # No server running (scripts, benchmarks)
+    asyncio.run_coroutine_threadsafe(sio.emit(event, data, to=sid), loop)
+
+# Stream Polly audio to the client in chunks instead of one base64 clip
+TTS_STREAMING = os.getenv("TTS_STREAMING", "1") == "1"
+TTS_CHUNK_BYTES = int(os.getenv("TTS_CHUNK_BYTES", "4096"))
+
+# Send audio as binary Socket.IO attachments instead of base64 strings
+BINARY_MEDIA = os.getenv("BINARY_MEDIA", "1") == "1"
+
+# Speak Gemini replies sentence by sentence as they stream in
+LLM_STREAMING = os.getenv("LLM_STREAMING", "1") == "1"
+
+# Ask for the feedback and the next question in one JSON reply when Gemini writes both
+COMBINED_TURNS = os.getenv("COMBINED_TURNS", "1") == "1"
+TURN_REPLY_SCHEMA = {'feedback': str, 'next_question': str}
+
+# Draft the feedback comment from interim transcripts (user_partial) once they stop
+# changing for PARTIAL_STABLE_SECONDS; the draft is used if the final answer only adds
+# up to PARTIAL_MAX_NEW_WORDS words to it
+SPECULATIVE_FEEDBACK = os.getenv("SPECULATIVE_FEEDBACK", "1") == "1"
+PARTIAL_STABLE_SECONDS = float(os.getenv("PARTIAL_STABLE_SECONDS", "0.8"))
+PARTIAL_MIN_WORDS = int(os.getenv("PARTIAL_MIN_WORDS", "6"))
+PARTIAL_MAX_NEW_WORDS = int(os.getenv("PARTIAL_MAX_NEW_WORDS", "12"))
+draft_stats = Counter()  # started / committed / discarded / failed
+
+# Work skipped or cut short because its interview was ended, reset or disconnected
+# (LLM calls are counted by llm.stats()['cancelled'])
+work_avoided = Counter()
+
+# Extra seconds to wait for a client's playback ack beyond the clip length
+PLAYBACK_ACK_GRACE = float(os.getenv("PLAYBACK_ACK_GRACE", "3.0"))
+
+# Shared pool for blocking LLM/TTS calls made from the interview loop
+llm_executor = ThreadPoolExecutor(max_workers=int(os.getenv("LLM_WORKERS", "32")), thread_name_prefix="llm")
+
+class InterviewLoop:
+    """Background asyncio event loop that runs every interview as a coroutine.
+
+    Socket handlers run on the ASGI server's loop (transport_loop) and hand
+    work over with submit()/call_soon(). A candidate who is thinking costs a
+    suspended coroutine here and an idle socket there, no OS thread. Keeping
+    interviews off the transport loop means a blocking step in interview code
+    never stalls the other clients' sockets; emit_to() carries sends back.
+    """
+    def __init__(self, executor):
+        self.loop = asyncio.new_event_loop()
+        self.loop.set_default_executor(executor)
+        self._thread = threading.Thread(target=self._run, name="interview-loop", daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        asyncio.set_event_loop(self.loop)
+        self.loop.run_forever()
+
+    def submit(self, coro):
+        """Schedule a coroutine; returns a concurrent.futures.Future"""
+        return asyncio.run_coroutine_threadsafe(coro, self.loop)
+
+    def call_soon(self, callback, *args):
+        """Run a callback on the loop thread"""
+        self.loop.call_soon_threadsafe(callback, *args)
+
+
+interview_loop = None  # InterviewLoop, created by start_services()
+
+# Model per tier; 'fast' prompts use the standard model when LLM_FAST_MODEL is empty
+LLM_MODEL = os.getenv("LLM_MODEL", "gemini-2.0-flash")
+LLM_FAST_MODEL = os.getenv("LLM_FAST_MODEL", "gemini-2.0-flash-lite")
+
+# Tier, deadline and hedge tier per prompt type. A call still running after its tier's
+# LLM_HEDGE_PERCENTILE latency (learned from the last 200 calls) is duplicated on the
+# hedge tier and the first good reply wins; see llm.stats()['tiers'] to tune these
+LLM_ROUTES = {
+    'feedback': {'tier': 'fast', 'deadline': 4.0, 'hedge': 'fast'},
+    'question': {'tier': 'standard', 'deadline': 6.0, 'hedge': 'fast'},
+    'turn': {'tier': 'standard', 'deadline': 8.0, 'hedge': 'fast'},
+    'summary': {'tier': 'fast', 'deadline': 15.0},  # Background, nobody waits on it
+}
+
+# Shared LLM scheduler: global concurrency/rate limits, backoff, deadlines, circuit breaker.
+# LLM_BACKEND=stub runs without Gemini (offline load testing).
+llm = LLMClient(
+    backends={'standard': StubBackend(), 'fast': StubBackend(latency=0.4, jitter=0.2)}
+    if os.getenv("LLM_BACKEND") == "stub" else None,
+    routes=LLM_ROUTES,
+    hedging=os.getenv("LLM_HEDGING", "1") == "1",
+    hedge_percentile=float(os.getenv("LLM_HEDGE_PERCENTILE", "0.5")),
+    max_concurrency=int(os.getenv("LLM_MAX_CONCURRENCY", "16")),
+    requests_per_minute=int(os.getenv("LLM_REQUESTS_PER_MINUTE", "600")),
+    tokens_per_minute=int(os.getenv("LLM_TOKENS_PER_MINUTE", "400000")),
+    deadline=float(os.getenv("LLM_DEADLINE", "8.0")),
+    stall_timeout=float(os.getenv("LLM_STREAM_STALL_TIMEOUT", "5.0"))
+)
+
+# Curated questions picked by similarity to the conversation. QUESTION_BANK_MODE:
+# 'tiered' (bank first, Gemini when nothing is close enough), 'only' (never ask Gemini
+# for questions) or 'off'
+QUESTION_BANK_MODE = os.getenv("QUESTION_BANK_MODE", "tiered")
+QUESTION_BANK_MIN_SIMILARITY = float(os.getenv("QUESTION_BANK_MIN_SIMILARITY", "0.12"))
+question_bank = None  # Loaded by start_services()
+question_sources = Counter()  # Where asked questions came from: bank / llm / fallback
+
+# Shared Polly audio cache, prewarmed with every fixed line at startup; the disk tier
+# keeps the most recently used TTS_CACHE_MAX_DISK_MB of clips. Created by start_services()
+tts_cache = None
+
+# Face detection runs in worker processes, batched across sessions on a fixed tick;
+# each session keeps only its latest frame. VIDEO_CPU_BUDGET is in cores.
+video_analyzer = VideoAnalyzer(
+    workers=int(os.getenv("VIDEO_WORKERS", "2")),
+    full_scan_every=int(os.getenv("VIDEO_FULL_SCAN_EVERY", "10")),
+    detector=os.getenv("FACE_DETECTOR", "haar"),
+    tick_interval=float(os.getenv("VIDEO_TICK_INTERVAL", "0.2")),
+    cpu_budget=float(os.getenv("VIDEO_CPU_BUDGET", "0")) or None,
+    max_staleness=float(os.getenv("VIDEO_MAX_STALENESS", "5.0"))
+)
+
+
+def start_services():
+    """Start the process-wide services: interview loop thread, question bank, TTS cache and its prewarm"""
+    global interview_loop, question_bank, tts_cache
+    interview_loop = InterviewLoop(llm_executor)
+
+    if QUESTION_BANK_MODE != 'off':
+        try:
+            question_bank = QuestionBank.from_file(os.getenv("QUESTION_BANK_FILE", DEFAULT_BANK_FILE))
+        except Exception as e:
+            print(f"⚠️ Question bank unavailable, using Gemini for every question: {e}")
+
+    tts_cache = TTSCache(
+        max_entries=int(os.getenv("TTS_CACHE_MAX_ENTRIES", "256")),
+        cache_dir=os.getenv("TTS_CACHE_DIR", ".tts_cache"),
+        max_disk_bytes=int(float(os.getenv("TTS_CACHE_MAX_DISK_MB", "200")) * 1024 * 1024)
+    )
+    if os.getenv("TTS_PREWARM", "1") == "1":
+        tts_cache.set_client(shared_polly_client())
+        tone_lines = [line for lines in TONE_RESPONSES.values() for line in lines] + [TONE_FINAL_REMINDER]
+        bank_lines = question_bank.questions if question_bank else []
+        tts_cache.prewarm(list(SCRIPT.values()) + FALLBACK_QUESTIONS + GEMINI_FALLBACKS + tone_lines + bank_lines)
+
+
+# The video analyzer's spawned workers re-import the script that started the server
+# (python flask_backend.py) as __mp_main__; they must not start a second set of services
+if __name__ != '__mp_main__':
+    start_services()
+
+# Prompt context per interview: MEMORY_CONTEXT_TOKENS total, of which the newest
+# MEMORY_RECENT_TOKENS stay verbatim; older turns are summarized in the background
+MEMORY_CONTEXT_TOKENS = int(os.getenv("MEMORY_CONTEXT_TOKENS", "600"))
+MEMORY_RECENT_TOKENS = int(os.getenv("MEMORY_RECENT_TOKENS", "400"))
+MEMORY_SUMMARY_TOKENS = int(os.getenv("MEMORY_SUMMARY_TOKENS", "150"))
+
+# Seconds after a monitoring alert during which the client is asked for more frames
+CAPTURE_ALERT_WINDOW = float(os.getenv("CAPTURE_ALERT_WINDOW", "30"))
+
+def _encode_audio(audio_bytes):
+    """Audio payload for an emit: raw bytes (binary attachment) or base64 text"""
+    if audio_bytes is None:
+        return None
+    if BINARY_MEDIA:
+        return audio_bytes
+    return base64.b64encode(audio_bytes).decode("utf-8")
+
+
+def _playback_timeout(audio_bytes, text):
+    """How long to wait for a playback ack: the clip's real length plus a grace period"""
+    duration = mp3_duration(audio_bytes) if audio_bytes else None
+    if duration is None:
+        duration = 0.4 * len(text.split())  # Browser speech fallback - estimate from words
+    return duration + PLAYBACK_ACK_GRACE
+
+
 class WebInterviewBot:
     """Modified version of your SaaSInterviewBot for web interface"""
-    def __init__(self):
+    def __init__(self, sid=None):
+        self.sid = sid  # Socket.IO session id this interview belongs to
         self.bot = None
         self.interview_active = False
-        self.conversation_history = []
+        self.conversation_history = []  # Full transcript, returned when the interview ends
+        self.memory = self._new_memory()  # Token-budgeted context for prompts
+        self.asked_questions = []
         self.question_count = 0
         self.max_questions = 7
         self.waiting_for_response = False
         self.current_question = None
-        self.response_event = threading.Event()
-        self.user_response = None
-        self.interview_thread = None
+        self._response_future = None  # Resolved by process_user_response
+        self.interview_task = None
+        self._task_finished = threading.Event()
+        self._task_finished.set()
+        self._speculative_question = None  # (turn, answer, task) prefetched next question
+        self._drafting = False  # Whether partial transcripts of the current answer are drafted
+        self._partial = None  # Latest interim transcript of the current answer
+        self._partial_timer = None
+        self._draft = None  # (partial, task) feedback drafted from a stable partial
+        self._playback_acks = {}  # utterance_id -> future resolved by audio_playback_ended
+        self._capture_tier = None  # CAPTURE_TIERS key last sent to the client
+        self._last_alert_at = 0.0
+        self.monitor = ViolationMonitor()  # Turns per-frame checks into escalating alerts
+        self.cancel_token = CancellationToken()  # Cancelled when this interview stops; replaced per interview
+
+    def _emit(self, event, data):
+        """Emit an event only to this session's client"""
+        emit_to(self.sid, event, data)
+
+    def _new_memory(self):
+        return ConversationMemory(
+            summarize=functools.partial(self._query_gemini, kind='summary'),
+            budget_tokens=MEMORY_CONTEXT_TOKENS,
+            recent_tokens=MEMORY_RECENT_TOKENS,
+            summary_tokens=MEMORY_SUMMARY_TOKENS
+        )
+
+    def _remember(self, role, content):
+        """Add a message to the transcript and the prompt memory"""
+        self.conversation_history.append({"role": role, "content": content})
+        self.memory.add(role, content)
         
     def reset_state(self):
         """Reset all interview state - useful for development"""
@@ -50,27 +310,18 @@ class WebInterviewBot:
             self.interview_active = False
             self.waiting_for_response = False
             
-            # Clear response mechanisms
-            if hasattr(self, 'response_event'):
-                self.response_event.set()  # Unblock any waiting threads
-                self.response_event.clear()  # Reset for next use
+            # Cancel the interview coroutine (this also unblocks any pending listen)
+            self._stop_interview_task(timeout=3.0, reason="reset")
             
             # Reset interview data    
             self.conversation_history = []
+            self.memory = self._new_memory()
+            self.asked_questions = []
             self.question_count = 0
             self.current_question = None
-            self.user_response = None
-            
-            # Wait for interview thread to finish
-            if self.interview_thread and self.interview_thread.is_alive():
-                print("⏳ Waiting for interview thread to finish...")
-                self.interview_thread.join(timeout=3.0)
-                if self.interview_thread.is_alive():
-                    print("⚠️ Interview thread didn't finish cleanly")
-                else:
-                    print("✅ Interview thread finished")
-            
-            self.interview_thread = None
+            self._response_future = None
+            self._speculative_question = None
+            self.monitor = ViolationMonitor()
             
             # Clean up bot if needed
             if self.bot and hasattr(self.bot, 'cleanup'):
@@ -90,21 +341,21 @@ class WebInterviewBot:
         
     def initialize_bot(self):
         """Initialize the interview bot"""
-        if not HIHI_AVAILABLE:
-            return False, "SaaSInterviewBot class not available. Check hihi.py import."
+        if not CORE_AVAILABLE:
+            return False, "InterviewCore not available. Check interview_core.py import."
             
         try:
             # Reset state first to ensure clean initialization
             self.reset_state()
             
-            # Create bot instance but don't start GUI
-            self.bot = SaaSInterviewBot(accent="us")
-            # Override the bot's speak method to use websockets instead
-            self.bot.speak = self._web_speak
-            self.polly = self.bot.polly  # ✅ Pass Polly from the SaaSInterviewBot
-
-            # Override listen method to wait for web input
-            self.bot.listen = self._web_listen
+            # Create bot instance but don't start GUI; speaking and listening
+            # go through the async _web_speak/_web_listen below instead
+            self.bot = InterviewCore(model=LLM_MODEL, accent="us")
+            self.polly = self.bot.polly  # ✅ Process-wide Polly client, shared with the TTS cache
+            tts_cache.set_client(self.polly)
+            llm.set_backend(GeminiBackend(self.bot.model))
+            if LLM_FAST_MODEL and not llm.has_backend('fast'):
+                llm.set_backend(GeminiBackend(shared_gemini_model(LLM_FAST_MODEL, self.bot.api_key)), tier='fast')
             return True, "Bot initialized successfully"
         except Exception as e:
             error_msg = f"Bot initialization error: {str(e)}"
@@ -112,72 +363,154 @@ class WebInterviewBot:
             print(traceback.format_exc())
             return False, error_msg
     
-    def _web_speak(self, text, interruptible=True):
-        """Override speak method to send to web interface"""
+    async def _web_speak(self, text, interruptible=True, record=True):
+        """Send speech to the web interface and wait until the client has played it.
+
+        Polly runs on the shared executor. Pacing comes from the client's
+        audio_playback_ended ack, bounded by the clip's real duration.
+        """
+        self._check_cancelled('speech')
         print("📢 [BACKEND] _web_speak called with:", text)
         print(f"AI: {text}")
-        if hasattr(self, 'polly'):
-            print("📞 Calling Amazon Polly for:", text)
-            response = self.polly.synthesize_speech(
-                Text=text,
-                OutputFormat="mp3",
-                VoiceId="Aditi"
-            )
-            audio_bytes = response["AudioStream"].read()
-            base64_audio = base64.b64encode(audio_bytes).decode("utf-8")
-            print("📦 Polly audio (first 50 chars):", base64_audio[:50])
+        utterance_id = uuid.uuid4().hex
+        playback = self._expect_playback(utterance_id)
+        audio_bytes = None
+
+        if hasattr(self, 'polly') and TTS_STREAMING:
+            audio_bytes = await asyncio.to_thread(self._stream_speech, utterance_id, text, interruptible,
+                                                  self.cancel_token)
         else:
-            print("❌ Polly not initialized!")
-            base64_audio = None
+            if hasattr(self, 'polly'):
+                print("📞 Fetching Polly audio for:", text)
+                audio_bytes = await asyncio.to_thread(tts_cache.synthesize, text)
+                print(f"📦 Polly audio: {len(audio_bytes)} bytes")
+            else:
+                print("❌ Polly not initialized!")
+                audio_bytes = None
+
+            self._emit('ai_response', {
+                'message': text,
+                'audio': _encode_audio(audio_bytes),  # ✅ Include Polly voice
+                'utterance_id': utterance_id,
+                'timestamp': time.time(),
+                'interruptible': interruptible
+            })
 
+        # Add to conversation history
+        if record:
+            self._remember("assistant", text)
+        
+        await self._await_playback(utterance_id, playback, _playback_timeout(audio_bytes, text))
 
-        socketio.emit('ai_response', {
+    def _expect_playback(self, utterance_id):
+        """Register the future that audio_playback_ended will resolve"""
+        future = asyncio.get_running_loop().create_future()
+        self._playback_acks[utterance_id] = future
+        return future
+
+    async def _await_playback(self, utterance_id, playback, timeout):
+        try:
+            await asyncio.wait_for(playback, timeout=timeout)
+        except asyncio.TimeoutError:
+            print(f"⏰ No playback ack for {utterance_id} after {timeout:.1f}s, continuing")
+        finally:
+            self._playback_acks.pop(utterance_id, None)
+
+    def playback_ended(self, utterance_id):
+        """Client finished playing an utterance (called from the socket thread)"""
+        interview_loop.call_soon(self._resolve_playback, utterance_id)
+
+    def _resolve_playback(self, utterance_id):
+        future = self._playback_acks.get(utterance_id)
+        if future and not future.done():
+            future.set_result(True)
+
+    def _stream_speech(self, utterance_id, text, interruptible=True, token=None):
+        """Send the message, then forward Polly audio as ai_audio_chunk events.
+
+        Stops forwarding (and reading from Polly) once token is cancelled.
+        Returns the full clip (or None if nothing was synthesized).
+        """
+        self._emit('ai_response', {
             'message': text,
-            'audio': base64_audio,  # ✅ Include Polly voice
+            'audio': None,
+            'streaming': True,
+            'utterance_id': utterance_id,
             'timestamp': time.time(),
             'interruptible': interruptible
         })
 
-        
-        # Add to conversation history
-        self.conversation_history.append({
-            "role": "assistant", 
-            "content": text
-        })
-        
-        # Small delay to allow message to be sent and processed
-        time.sleep(1.0)
-    
-    def _web_listen(self, max_attempts=3, timeout=60):
-        """Override listen method to wait for web input"""
+        seq = 0
+        chunks = []
+        try:
+            with closing(tts_cache.stream(text, chunk_size=TTS_CHUNK_BYTES)) as audio:
+                for chunk in audio:
+                    if token and token.cancelled:
+                        work_avoided['tts_streams'] += 1
+                        break
+                    chunks.append(chunk)
+                    self._emit('ai_audio_chunk', {
+                        'utterance_id': utterance_id,
+                        'seq': seq,
+                        'audio': _encode_audio(chunk),
+                        'final': False
+                    })
+                    seq += 1
+        except Exception as e:
+            print(f"❌ Polly streaming error: {e}")
+        finally:
+            # End marker - the client finalizes the clip (or falls back to browser TTS if seq == 0)
+            self._emit('ai_audio_chunk', {
+                'utterance_id': utterance_id,
+                'seq': seq,
+                'audio': None,
+                'final': True
+            })
+        return b"".join(chunks) or None
+
+    async def _web_listen(self, max_attempts=3, timeout=60, draft=False):
+        """Await the candidate's next web message.
+
+        With draft, stable interim transcripts of the answer start a feedback
+        draft that _respond_to_answer can use (see process_partial_response).
+        """
+        self._check_cancelled('listens')
         print("🎤 Waiting for user response...")
+        self._drop_draft()
+        self._drafting = draft and SPECULATIVE_FEEDBACK
         
-        # Reset the response event and clear previous response
-        self.response_event.clear()
-        self.user_response = None
+        # Fresh future for this answer; process_user_response resolves it
+        self._response_future = asyncio.get_running_loop().create_future()
         self.waiting_for_response = True
         
         # Notify frontend that we're waiting for response
-        socketio.emit('waiting_for_response', {
+        self._emit('waiting_for_response', {
             'waiting': True,
             'timeout': timeout
         })
         
         # Wait for response with timeout
-        response_received = self.response_event.wait(timeout=timeout)
-        
-        self.waiting_for_response = False
+        try:
+            response = await asyncio.wait_for(self._response_future, timeout=timeout)
+        except asyncio.TimeoutError:
+            response = None
+        finally:
+            self._response_future = None
+            self.waiting_for_response = False
+            self._drafting = False
         
         # Notify frontend that we're no longer waiting
-        socketio.emit('waiting_for_response', {
+        self._emit('waiting_for_response', {
             'waiting': False
         })
         
-        if response_received and self.user_response:
-            print(f"✅ Received user response: {self.user_response}")
-            response = self.user_response
-            # Clear the response for next time
-            self.user_response = None
+        if response:
+            print(f"✅ Received user response: {response}")
+            # Tone check, as the desktop bot does after speech recognition; the answer still counts
+            reply = self.bot.tone_reply(response) if self.bot else None
+            if reply:
+                print(f"⚠️ Tone warning {self.bot.tone_warnings}")
+                await self._web_speak(reply)
             return response
         else:
             print("⏰ No response received within timeout")
@@ -195,10 +528,13 @@ class WebInterviewBot:
             self.interview_active = True
             self.question_count = 0
             self.conversation_history = []
+            self.memory = self._new_memory()
+            self.asked_questions = []
+            self.monitor = ViolationMonitor()
+            self.cancel_token = CancellationToken()
             
-            # Start interview in separate thread
-            self.interview_thread = threading.Thread(target=self._run_full_interview_logic, daemon=True)
-            self.interview_thread.start()
+            # Run the interview as a coroutine on the shared loop
+            self.interview_task = interview_loop.submit(self._run_full_interview_logic())
             
             return True, "Interview started successfully"
         except Exception as e:
@@ -206,184 +542,421 @@ class WebInterviewBot:
             print(error_msg)
             return False, error_msg
     
-    def _run_full_interview_logic(self):
+    async def _run_full_interview_logic(self):
         """Run the complete interview logic from your original bot"""
+        self._task_finished.clear()
         try:
             print("🚀 Starting interview logic...")
             
             # Introduction Phase
-            socketio.emit('interview_phase', {'phase': 'introduction'})
+            self._emit('interview_phase', {'phase': 'introduction'})
             
-            self.bot.speak("Hello! I'm Gyani, your AI interviewer for this SaaS Sales role. Welcome to the interview!")
-            time.sleep(0.5)  # Brief pause
+            await self._web_speak(SCRIPT['greeting'])
             
-            self.bot.speak("Before we dive into the sales questions, how has your day been so far?")
-            day_response = self.bot.listen()
+            await self._web_speak(SCRIPT['day_question'])
+            day_response = await self._web_listen()
             
             if day_response and "didn't receive a response" not in day_response:
-                self.conversation_history.append({"role": "user", "content": day_response})
-                self.bot.speak("That's great to hear! I appreciate you taking the time for this interview.")
-                time.sleep(0.5)
+                self._remember("user", day_response)
+                await self._web_speak(SCRIPT['day_ack'])
 
-            self.bot.speak("To start, could you please introduce yourself and tell me a bit about your background in sales, particularly any experience with SaaS products?")
-            introduction = self.bot.listen()
+            await self._web_speak(SCRIPT['intro_question'])
+            introduction = await self._web_listen()
             
             if introduction and "didn't receive a response" not in introduction and len(introduction.split()) > 3:
-                self.conversation_history.append({"role": "user", "content": introduction})
-                self.bot.speak("Thank you for that introduction. It's great to hear about your experience.")
-                time.sleep(0.5)
+                self._remember("user", introduction)
+                await self._web_speak(SCRIPT['intro_ack'])
 
             # Sales Questions Phase
             print("🎯 Moving to sales questions phase...")
-            socketio.emit('interview_phase', {'phase': 'sales_questions'})
+            self._emit('interview_phase', {'phase': 'sales_questions'})
             
-            # Sales questions list for fallback
-            fallback_questions = [
-                "Can you walk me through your typical sales process when approaching a potential SaaS client?",
-                "How do you handle objections when a prospect says your SaaS solution is too expensive?",
-                "Describe a challenging SaaS deal you closed. What obstacles did you overcome?",
-                "How do you identify and qualify leads for B2B SaaS products?",
-                "What strategies do you use to demonstrate ROI to potential SaaS customers?",
-                "How do you handle long sales cycles typical in enterprise SaaS sales?",
-                "Tell me about a time you lost a significant SaaS deal. What did you learn?"
-            ]
             
             while self.question_count < self.max_questions and self.interview_active:
                 print(f"📊 Question {self.question_count + 1} of {self.max_questions}")
                 
-                # Keep conversation history manageable
-                if len(self.conversation_history) > 15:
-                    self.conversation_history = self.conversation_history[-8:]
-
-                # Generate or use fallback question
-                question = None
-                if hasattr(self.bot, 'query_gemini') and len(self.conversation_history) > 0:
+                # Use the question prefetched during the last turn, or pick/generate one now
+                question, source = await self._take_speculative_question()
+                if not question:
+                    question, source = self._bank_question(), 'bank'
+                if not question and hasattr(self.bot, 'query_gemini') and len(self.conversation_history) > 0 \
+                        and QUESTION_BANK_MODE != 'only':
                     try:
-                        system_prompt = f"""As a friendly and professional SaaS sales interviewer, ask one engaging question based on this conversation context.
-The question should:
-- Be encouraging and conversational
-- Build on what the candidate has shared about their sales background
-- Test practical SaaS sales knowledge and experience
-- Be appropriate for a sales professional
-- Keep it to one clear question
-- Focus on real-world SaaS sales scenarios
-- Avoid repeating previous questions
-- short and concise
-
-Recent conversation: {' '.join([msg['content'] for msg in self.conversation_history[-4:]])}
-
-Generate only the question in a friendly, professional tone."""
-
-                        response = self.bot.query_gemini(system_prompt)
+                        response = await self._query_gemini(self._question_prompt(), kind='question')
                         if response and response.strip():
-                            question = response.strip()
+                            question, source = response.strip(), 'llm'
                     except Exception as e:
                         print(f"Error generating question with Gemini: {e}")
                 
                 # Use fallback question if Gemini failed or no question generated
-                if not question and self.question_count < len(fallback_questions):
-                    question = fallback_questions[self.question_count]
+                if not question:
+                    question, source = self._bank_question(min_similarity=0.0), 'bank'
+                if not question and self.question_count < len(FALLBACK_QUESTIONS):
+                    question, source = FALLBACK_QUESTIONS[self.question_count], 'fallback'
                 elif not question:
-                    question = "What do you think is the most important skill for a successful SaaS salesperson?"
+                    question, source = SCRIPT['generic_question'], 'fallback'
 
                 print(f"❓ Asking question: {question}")
+                question_sources[source] += 1  # Counted when asked, not when prefetched
                 self.current_question = question
-                self.bot.speak(question)
+                self.asked_questions.append(question)
+                await self._web_speak(question)
 
                 # Wait for and process answer
                 print("⏳ Waiting for user answer...")
-                answer = self.bot.listen()
+                answer = await self._web_listen(draft=True)
                 print(f"💬 Received answer: {answer}")
 
                 if answer and "didn't receive a response" not in answer and len(answer.split()) > 2:
-                    # Add both question and answer to history
-                    self.conversation_history.append({"role": "assistant", "content": question})
-                    self.conversation_history.append({"role": "user", "content": answer})
+                    # The question was recorded when it was spoken
+                    self._remember("user", answer)
 
-                    # Provide encouraging feedback
+                    # Comment on the answer and get the next question ready
                     try:
-                        feedback_prompt = f"""You are a friendly SaaS sales interviewer. The candidate just said:
-
-                    "{answer}"
-
-                    Respond with one thoughtful follow-up comment. It should:
-                    - Be relevant to the content
-                    - Encourage further elaboration or reflection
-                    - Be very short (1–2 sentences)
-                    - Avoid generic phrases like "That's great"
-
-                    Say only the comment, nothing else.
-                    """
-                        feedback = self.bot.query_gemini(feedback_prompt)
-                        if feedback:
-                            self.bot.speak(feedback.strip())
-                        else:
-                            self.bot.speak("Thanks for sharing that.")
+                        await self._respond_to_answer(answer)
                     except Exception as e:
                         print(f"Gemini feedback error: {e}")
-                        self.bot.speak("Thanks for sharing that.")
+                        await self._web_speak(SCRIPT['feedback_fallback'])
 
-            
-                    
                     self.question_count += 1
                     print(f"✅ Question {self.question_count} completed")
                 else:
                     # If no proper response, try one more time
                     print("⚠️ No proper response received, asking follow-up...")
-                    self.bot.speak("I'd love to hear more about your experience. Could you elaborate on that?")
-                    retry_answer = self.bot.listen()
+                    await self._web_speak(SCRIPT['elaborate'])
+                    retry_answer = await self._web_listen()
                     
                     if retry_answer and "didn't receive a response" not in retry_answer and len(retry_answer.split()) > 2:
-                        self.conversation_history.append({"role": "assistant", "content": question})
-                        self.conversation_history.append({"role": "user", "content": retry_answer})
-                        self.bot.speak("Thank you for sharing that.")
+                        self._remember("user", retry_answer)
+                        self._speculate_next_question(retry_answer)
+                        await self._web_speak(SCRIPT['retry_ack'])
                         self.question_count += 1
                     else:
                         # Move on to next question
-                        self.bot.speak("Let me ask you a different question.")
+                        await self._web_speak(SCRIPT['next_question'])
                         self.question_count += 1
 
-                # Small delay between questions
-                if self.interview_active and self.question_count < self.max_questions:
-                    time.sleep(1.0)
 
             # Conclude Interview
             if self.interview_active:
                 print("🏁 Concluding interview...")
-                self._conclude_interview()
+                await self._conclude_interview()
 
         except Exception as e:
             print(f"❌ Interview logic error: {e}")
             print(traceback.format_exc())
             if self.interview_active:
-                self.bot.speak("We've encountered a technical issue. Thank you for your time today!")
+                await self._web_speak(SCRIPT['technical_issue'])
             self.interview_active = False
+        finally:
+            self._drop_speculative_question()
+            self._drop_draft()
+            self.memory.close()
+            self._task_finished.set()
 
-    def _conclude_interview(self):
+    def _question_prompt(self):
+        """Prompt asking Gemini for the next question given the recent conversation"""
+        return f"""As a friendly and professional SaaS sales interviewer, ask one engaging question based on this conversation context.
+The question should:
+- Be encouraging and conversational
+- Build on what the candidate has shared about their sales background
+- Test practical SaaS sales knowledge and experience
+- Be appropriate for a sales professional
+- Keep it to one clear question
+- Focus on real-world SaaS sales scenarios
+- Avoid repeating previous questions
+- short and concise
+
+Conversation so far:
+{self.memory.context()}
+
+Generate only the question in a friendly, professional tone."""
+
+    def _bank_question(self, min_similarity=None):
+        """Next question from the local bank, or None when nothing fits well enough.
+
+        Matches the candidate's last two answers; a few hundred microseconds,
+        against seconds for a Gemini call.
+        """
+        if question_bank is None:
+            return None
+        if min_similarity is None:
+            min_similarity = 0.0 if QUESTION_BANK_MODE == 'only' else QUESTION_BANK_MIN_SIMILARITY
+        answers = [m['content'] for m in self.conversation_history if m['role'] == 'user'][-2:]
+        question, score = question_bank.select(' '.join(answers), self.asked_questions, min_similarity)
+        if question:
+            print(f"📚 Question bank match ({score:.2f})")
+        return question
+
+    def _feedback_prompt(self, answer):
+        """Prompt asking Gemini for a short follow-up comment on an answer"""
+        return f"""You are a friendly SaaS sales interviewer. The candidate just said:
+
+                    "{answer}"
+
+                    Respond with one thoughtful follow-up comment. It should:
+                    - Be relevant to the content
+                    - Encourage further elaboration or reflection
+                    - Be very short (1–2 sentences)
+                    - Avoid generic phrases like "That's great"
+
+                    Say only the comment, nothing else.
+                    """
+
+    def _turn_prompt(self, answer):
+        """One prompt for both the comment on an answer and the next question, as JSON"""
+        return f"""You are a friendly and professional SaaS sales interviewer.
+
+Conversation so far:
+{self.memory.context()}
+
+The candidate just said:
+"{answer}"
+
+Reply with a JSON object with exactly two string keys:
+{{"feedback": "...", "next_question": "..."}}
+
+feedback: one thoughtful follow-up comment on what the candidate just said. Relevant to the
+content, very short (1–2 sentences), no generic phrases like "That's great".
+
+next_question: the next interview question. Encouraging and conversational, builds on what the
+candidate has shared, tests practical real-world SaaS sales knowledge, one clear and concise
+question, does not repeat an earlier question.
+
+{JSON_REPLY_INSTRUCTION}"""
+
+    def _next_question_source(self):
+        """Where the next question will come from: a bank question, 'llm', or None if none is needed"""
+        if self.question_count + 1 >= self.max_questions:
+            return None  # No next question to prepare
+        question = self._bank_question()
+        if question:
+            return question
+        if hasattr(self.bot, 'query_gemini') and QUESTION_BANK_MODE != 'only':
+            return 'llm'
+        return None
+
+    def _speculate(self, answer, coro, source):
+        """Prepare the next question in the background, tagged with the turn and answer it was built from.
+
+        source ('bank' or 'llm') is counted in question_sources once the question is asked.
+        """
+        self._speculative_question = (self.question_count + 1, answer, asyncio.create_task(coro), source)
+
+    async def _respond_to_answer(self, answer):
+        """Speak a comment on the answer while the next question is prepared.
+
+        Feedback drafted from the partial answer is used when it still fits.
+        Otherwise a bank question is prepared locally next to the feedback call. When
+        Gemini has to write the question, one structured call returns both
+        (COMBINED_TURNS); otherwise the two calls run concurrently.
+        """
+        draft = await self._take_draft(answer)
+        self._drop_speculative_question()
+        source = self._next_question_source()
+        if draft:
+            print("⚡ Using feedback drafted from the partial answer")
+            feedback, question = draft
+            self._plan_next_question(answer, source, drafted=question)
+            await self._web_speak(feedback)
+            return
+
+        if source == 'llm' and COMBINED_TURNS:
+            await self._speak_turn(answer)
+            return
+        self._plan_next_question(answer, source)
+        await self._speak_generated(self._feedback_prompt(answer), SCRIPT['feedback_fallback'])
+
+    async def _speak_turn(self, answer):
+        """Speak the feedback from a combined turn reply and keep its question for the next turn.
+
+        While streaming, the feedback field is decoded and spoken sentence by
+        sentence before the question has arrived; once the field closes its
+        last sentence is spoken and the rest of the stream is read as the
+        next turn's speculative question. If the reply doesn't parse as
+        TURN_REPLY_SCHEMA, the feedback fallback is spoken (unless some
+        feedback already was) and the next turn picks its question itself.
+        """
+        prompt = self._turn_prompt(answer)
+
+        def question_from(reply):
+            if reply:
+                return reply['next_question']
+            print("⚠️ Turn reply failed validation, next question will be generated separately")
+            return None
+
+        if not LLM_STREAMING:
+            reply = parse_json_reply(await self._query_gemini(prompt, kind='turn'), TURN_REPLY_SCHEMA)
+            self._speculate(answer, self._prepare_question(question_from(reply)), 'llm')
+            feedback = reply['feedback'] if reply else SCRIPT['feedback_fallback']
+            await self._web_speak(feedback)
+            return
+
+        raw = []
+        field = JsonStringField('feedback')
+        stream = llm.stream(prompt, kind='turn', token=self.cancel_token)
+
+        async def read_question():
+            try:
+                async for chunk in stream:
+                    raw.append(chunk)
+            except Exception as e:
+                print(f"Gemini streaming error: {e}")
+            return await self._prepare_question(question_from(parse_json_reply(''.join(raw), TURN_REPLY_SCHEMA)))
+
+        async def feedback_chunks():
+            try:
+                # Ends when the feedback closes, so its last sentence isn't held until the question arrives
+                async for text in stream_field(stream, field, raw):
+                    yield text
+            finally:
+                self._speculate(answer, read_question(), 'llm')
+
+        await self._speak_generated(prompt, SCRIPT['feedback_fallback'], chunks=feedback_chunks())
+
+    def _speculate_next_question(self, answer):
+        """Prepare (and pre-synthesize) the next question in the background.
+
+        The question bank answers most turns locally; otherwise Gemini runs
+        while the acknowledgement is spoken. _take_speculative_question drops
+        the result if the conversation moved on.
+        """
+        self._drop_speculative_question()
+        self._plan_next_question(answer, self._next_question_source())
+
+    def _plan_next_question(self, answer, source, drafted=None):
+        """Start preparing the question named by _next_question_source; drafted is one Gemini already wrote"""
+        if source == 'llm' and drafted:
+            self._speculate(answer, self._prepare_question(drafted), 'llm')
+        elif source == 'llm':
+            self._speculate(answer, self._generate_question(self._question_prompt()), 'llm')
+        elif source:
+            self._speculate(answer, self._prepare_question(source), 'bank')
+
+    async def _generate_question(self, prompt):
+        response = await self._query_gemini(prompt, kind='question')
+        question = response.strip() if response else None
+        return await self._prepare_question(question)
+
+    async def _prepare_question(self, question):
+        if question and hasattr(self, 'polly'):
+            # Warm the cache so speaking it is instant
+            await asyncio.to_thread(self._warm_tts, question)
+        return question
+
+    async def _take_speculative_question(self):
+        """(question, source) prefetched for this turn, or (None, None) if missing or stale"""
+        speculation, self._speculative_question = self._speculative_question, None
+        if not speculation:
+            return None, None
+
+        turn, answer, task, source = speculation
+        latest_answer = next((m['content'] for m in reversed(self.conversation_history) if m['role'] == 'user'), None)
+        if turn != self.question_count or answer != latest_answer:
+            print("🗑️ Dropping stale speculative question")
+            task.cancel()
+            return None, None
+
+        try:
+            question = await task
+            print("⚡ Using prefetched question")
+            return question, source
+        except Exception as e:
+            print(f"Error generating speculative question: {e}")
+            return None, None
+
+    async def _speak_generated(self, prompt, fallback, chunks=None, kind='feedback'):
+        """Speak a Gemini reply sentence by sentence while it is still generating.
+
+        Each completed sentence is pre-synthesized as soon as it arrives, so
+        Polly and playback of earlier sentences overlap LLM decoding of later
+        ones. chunks replaces the plain LLM stream (e.g. one field of a JSON
+        reply). Returns the full text spoken.
+        """
+        if not LLM_STREAMING:
+            reply = await self._query_gemini(prompt, kind=kind)
+            reply = reply.strip() if reply and reply.strip() else fallback
+            await self._web_speak(reply)
+            return reply
+
+        sentences = asyncio.Queue()
+
+        async def produce():
+            try:
+                async for sentence in stream_sentences(chunks or llm.stream(prompt, kind=kind, token=self.cancel_token)):
+                    if hasattr(self, 'polly'):
+                        llm_executor.submit(self._warm_tts, sentence, self.cancel_token)
+                    await sentences.put(sentence)
+            except Exception as e:
+                print(f"Gemini streaming error: {e}")
+            finally:
+                await sentences.put(None)
+
+        producer = asyncio.create_task(produce())
+        spoken = []
+        try:
+            while (sentence := await sentences.get()) is not None:
+                await self._web_speak(sentence, record=False)
+                spoken.append(sentence)
+        finally:
+            producer.cancel()
+
+        if not spoken:
+            await self._web_speak(fallback, record=False)
+            spoken.append(fallback)
+
+        reply = ' '.join(spoken)
+        self._remember("assistant", reply)
+        return reply
+
+    def _warm_tts(self, text, token=None):
+        if (token or self.cancel_token).cancelled:
+            work_avoided['tts_warmups'] += 1
+            return
+        try:
+            tts_cache.synthesize(text)
+        except Exception as e:
+            print(f"⚠️ TTS prefetch failed: {e}")
+
+    async def _query_gemini(self, prompt, fallback=None, kind=None):
+        """Query Gemini through the shared scheduler (kind picks the LLM_ROUTES entry);
+        returns fallback on failure or deadline, raises Cancelled once the interview stops"""
+        return await llm.generate(prompt, fallback=fallback, kind=kind, token=self.cancel_token)
+
+    def _check_cancelled(self, work):
+        """Raise Cancelled, counting the skipped work, once this interview was stopped"""
+        if self.cancel_token.cancelled:
+            work_avoided[work] += 1
+            self.cancel_token.raise_if_cancelled()
+
+    def _drop_speculative_question(self):
+        if self._speculative_question:
+            self._speculative_question[2].cancel()
+            self._speculative_question = None
+
+    async def _conclude_interview(self):
         """Conclude the interview"""
         if not self.interview_active:
             return
             
         try:
             print("🎬 Starting interview conclusion...")
-            socketio.emit('interview_phase', {'phase': 'conclusion'})
+            self._emit('interview_phase', {'phase': 'conclusion'})
             
-            self.bot.speak("That was a great conversation. Thank you for sharing your insights about SaaS sales.")
-            time.sleep(0.5)
+            await self._web_speak(SCRIPT['conclusion'])
 
-            self.bot.speak("Do you have any questions for me about the role, the company, or the next steps?")
-            final_questions = self.bot.listen()
+            await self._web_speak(SCRIPT['candidate_questions'])
+            final_questions = await self._web_listen()
 
             if final_questions and "didn't receive a response" not in final_questions:
-                self.conversation_history.append({"role": "user", "content": final_questions})
-                self.bot.speak("Those are great questions! The hiring team will be in touch with more details on the next steps very soon.")
+                self._remember("user", final_questions)
+                await self._web_speak(SCRIPT['questions_ack'])
             else:
-                self.bot.speak("If you don't have any questions right now, that's perfectly fine.")
+                await self._web_speak(SCRIPT['no_questions'])
 
-            time.sleep(0.5)
-            self.bot.speak("Thank you so much for your time today. It was a pleasure speaking with you, and I wish you the best of luck!")
+            await self._web_speak(SCRIPT['farewell'])
             
-            socketio.emit('interview_complete', {
+            self._emit('interview_complete', {
                 'message': 'Interview completed successfully!',
                 'conversation_history': self.conversation_history
             })
@@ -402,60 +975,187 @@ Generate only the question in a friendly, professional tone."""
             return
             
         if self.waiting_for_response:
-            self.user_response = message.strip()
-            print(f"✅ Response set: '{self.user_response}'")
-            self.response_event.set()  # Signal that response was received
-            print("🚨 Event triggered!")
+            # Resolve the pending listen on the interview loop's thread
+            interview_loop.call_soon(self._deliver_response, message.strip())
+            print(f"✅ Response set: '{message.strip()}'")
         else:
             print("⚠️ Not currently waiting for response")
     
+    def _deliver_response(self, message):
+        future = self._response_future
+        if future and not future.done():
+            future.set_result(message)
+
+    def process_partial_response(self, message):
+        """Interim transcript of the answer being spoken (called from the socket thread)"""
+        if self.waiting_for_response and message and message.strip():
+            interview_loop.call_soon(self._on_partial, message.strip())
+
+    def _on_partial(self, text):
+        """Restart the stability timer whenever the interim transcript changes"""
+        if not self._drafting or text == self._partial:
+            return
+        self._partial = text
+        if self._partial_timer:
+            self._partial_timer.cancel()
+            self._partial_timer = None
+        if len(text.split()) >= PARTIAL_MIN_WORDS:
+            self._partial_timer = asyncio.get_running_loop().call_later(
+                PARTIAL_STABLE_SECONDS, self._start_draft, text)
+
+    def _start_draft(self, text):
+        self._partial_timer = None
+        if not self._drafting or (self._draft and self._draft[0] == text):
+            return
+        if self._draft:
+            self._draft[1].cancel()
+        print(f"✏️ Drafting feedback from partial answer ({len(text.split())} words)")
+        draft_stats['started'] += 1
+        self._draft = (text, asyncio.create_task(self._draft_feedback(text)))
+
+    async def _draft_feedback(self, text):
+        """(feedback, next question or None) drafted from a partial answer.
+
+        Uses the combined turn prompt when Gemini may have to write the next
+        question, so a committed draft still costs one call per turn.
+        """
+        combined = (COMBINED_TURNS and self.question_count + 1 < self.max_questions
+                    and hasattr(self.bot, 'query_gemini') and QUESTION_BANK_MODE != 'only')
+        if combined:
+            reply = parse_json_reply(await self._query_gemini(self._turn_prompt(text), kind='turn'), TURN_REPLY_SCHEMA)
+            feedback, question = (reply['feedback'], reply['next_question']) if reply else (None, None)
+        else:
+            reply = await self._query_gemini(self._feedback_prompt(text), kind='feedback')
+            feedback, question = (reply.strip() if reply and reply.strip() else None), None
+        if feedback and hasattr(self, 'polly'):
+            await asyncio.to_thread(self._warm_tts, feedback)
+        return feedback, question
+
+    @staticmethod
+    def _draft_fits(partial, answer):
+        """Whether the final answer is the drafted partial plus a short ending"""
+        def words(text):
+            return [w.strip('.,!?;:"').lower() for w in text.split()]
+        partial, answer = words(partial), words(answer)
+        if len(answer) - len(partial) > PARTIAL_MAX_NEW_WORDS:
+            return False
+        # Recognizers revise a few words when they finalize, so compare loosely
+        return difflib.SequenceMatcher(None, partial, answer[:len(partial)]).ratio() >= 0.8
+
+    async def _take_draft(self, answer):
+        """(feedback, question) drafted from the partial answer if it still fits the final one, else None"""
+        draft, self._draft = self._draft, None
+        self._drop_draft()
+        if not draft:
+            return None
+        partial, task = draft
+        if not self._draft_fits(partial, answer):
+            print("🗑️ Final answer moved on from the draft, generating fresh feedback")
+            draft_stats['discarded'] += 1
+            task.cancel()
+            return None
+        try:
+            feedback, question = await task
+        except Exception as e:
+            print(f"Error drafting feedback: {e}")
+            feedback, question = None, None
+        draft_stats['committed' if feedback else 'failed'] += 1
+        return (feedback, question) if feedback else None
+
+    def _drop_draft(self):
+        if self._partial_timer:
+            self._partial_timer.cancel()
+            self._partial_timer = None
+        if self._draft:
+            self._draft[1].cancel()
+            self._draft = None
+        self._partial = None
+
+    def _stop_interview_task(self, timeout, reason="ended"):
+        """Cancel the interview's work and wait (bounded) for its coroutine to unwind.
+
+        The token stops work the coroutine doesn't await directly: drafts,
+        prefetched questions, summaries, TTS prefetches and Polly streams
+        running on executor threads.
+        """
+        self.cancel_token.cancel(reason)
+        task, self.interview_task = self.interview_task, None
+        if task and not task.done():
+            print("⏳ Waiting for interview task to finish...")
+            work_avoided['interviews'] += 1
+            task.cancel()
+            if self._task_finished.wait(timeout=timeout):
+                print("✅ Interview task finished")
+            else:
+                print("⚠️ Interview task didn't finish cleanly")
+
     def analyze_video_frame(self, frame_data):
-        """Analyze video frame for monitoring using original bot logic"""
+        """Queue a video frame for monitoring; analysis runs off the socket thread"""
         if not self.bot or not self.interview_active:
             return
-        
+        video_analyzer.submit(self.sid, frame_data, self._on_face_count)
+
+    def _on_face_count(self, faces):
+        """Feed an analyzed frame to the alert state machine"""
+        if not self.interview_active:
+            return
+        self._report(self.monitor.observe_faces(faces))
+        self.update_capture_settings()
+
+    def report_tab_change(self):
+        """Client switched away from the interview tab"""
+        if not self.interview_active:
+            return
+        self._report(self.monitor.observe_tab_change())
+
+    def _report(self, events):
+        """Send monitoring state changes to the client; end the interview on the last warning"""
+        for event in events:
+            if event['state'] == 'active':
+                self.note_alert()
+            self._emit('monitoring_alert', event)
+            if event.get('terminate'):
+                print(f"🚫 Violation limit reached ({event['type']}), ending interview")
+                threading.Thread(target=self._terminate_for_violations, args=(event['message'],),
+                                 daemon=True).start()
+
+    def _terminate_for_violations(self, message):
+        """Stop the interview, then tell the candidate why (runs off the reporting thread)"""
+        self.interview_active = False
+        self.waiting_for_response = False
+        self._stop_interview_task(timeout=2.0, reason="violations")
+        self.cancel_token = CancellationToken()  # For the announcement, so a disconnect still cuts it short
         try:
-            # Decode base64 frame
-            frame_bytes = base64.b64decode(frame_data.split(',')[1])
-            nparr = np.frombuffer(frame_bytes, np.uint8)
-            frame = cv2.imdecode(nparr, cv2.IMREAD_COLOR)
-            
-            # Use your existing face detection logic
-            if hasattr(self.bot, 'face_cascade') and self.bot.face_cascade is not None:
-                gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-                faces = self.bot.face_cascade.detectMultiScale(gray, 1.3, 5)
-                
-                # Check for violations using your original logic
-                if len(faces) == 0:
-                    socketio.emit('monitoring_alert', {
-                        'type': 'no_face',
-                        'message': 'Please ensure your face is visible to the camera',
-                        'severity': 'warning'
-                    })
-                elif len(faces) > 1:
-                    socketio.emit('monitoring_alert', {
-                        'type': 'multiple_faces',
-                        'message': 'Multiple faces detected. Please ensure you are alone.',
-                        'severity': 'warning'
-                    })
-                
+            interview_loop.submit(self._web_speak(message, interruptible=False)).result(timeout=30)
         except Exception as e:
-            print(f"Video analysis error: {e}")
+            print(f"Error announcing interview termination: {e}")
+        self._emit('interview_ended', {
+            'message': message,
+            'reason': 'violations',
+            'conversation_history': self.conversation_history
+        })
+
+    def note_alert(self):
+        """Remember a monitoring alert so the client is asked for closer video for a while"""
+        self._last_alert_at = time.time()
+
+    def update_capture_settings(self):
+        """Tell the client how often and how large to send frames, if that changed"""
+        recently_alerted = time.time() - self._last_alert_at < CAPTURE_ALERT_WINDOW
+        tier = capture_tier(video_analyzer.load(), recently_alerted)
+        if tier != self._capture_tier:
+            self._capture_tier = tier
+            self._emit('capture_settings', dict(CAPTURE_TIERS[tier], tier=tier))
     
-    def end_interview(self):
-        """End the interview"""
+    def end_interview(self, reason="ended"):
+        """End the interview (reason: 'ended' by the client/API, or 'disconnected')"""
         try:
             print("🛑 Ending interview...")
             self.interview_active = False
             self.waiting_for_response = False
             
-            # Unblock any waiting threads
-            if hasattr(self, 'response_event'):
-                self.response_event.set()
-                
-            # Wait for interview thread to finish
-            if self.interview_thread and self.interview_thread.is_alive():
-                self.interview_thread.join(timeout=2.0)
+            # Cancel the interview coroutine and its in-flight LLM/TTS work
+            self._stop_interview_task(timeout=2.0, reason=reason)
                 
             if self.bot and hasattr(self.bot, 'cleanup'):
                 self.bot.cleanup()
@@ -465,25 +1165,86 @@ Generate only the question in a friendly, professional tone."""
             print(f"Error ending interview: {e}")
             return False, f"Error ending interview: {str(e)}"
 
-# Global bot instance
-web_bot = WebInterviewBot()
+class SessionManager:
+    """Registry of interview sessions keyed by Socket.IO sid"""
+    def __init__(self):
+        self._sessions = {}
+        self._lock = threading.Lock()
+
+    def create(self, sid):
+        """Create (or return the existing) session for a connected client"""
+        with self._lock:
+            session = self._sessions.get(sid)
+            if session is None:
+                session = WebInterviewBot(sid=sid)
+                self._sessions[sid] = session
+            return session
+
+    def get(self, sid):
+        """Return the session for a sid, or None if it is not registered"""
+        with self._lock:
+            return self._sessions.get(sid)
+
+    def remove(self, sid):
+        """Unregister a session and stop its interview and in-flight work"""
+        with self._lock:
+            session = self._sessions.pop(sid, None)
+        if session:
+            session.end_interview(reason="disconnected")
+        return session
+
+    def all(self):
+        """Snapshot of all registered sessions"""
+        with self._lock:
+            return list(self._sessions.values())
+
+    def __len__(self):
+        with self._lock:
+            return len(self._sessions)
+
+
+# Global session registry - one WebInterviewBot per connected client
+sessions = SessionManager()
+
+
+def _request_sid():
+    """Read the target session id from a REST request (JSON body or query string)"""
+    data = request.get_json(silent=True) or {}
+    return data.get('sid') or request.args.get('sid')
+
 
 @app.route('/health', methods=['GET'])
 def health_check():
     """Health check endpoint"""
+    active = [s for s in sessions.all() if s.interview_active]
     return jsonify({
         'status': 'healthy',
-        'hihi_available': HIHI_AVAILABLE,
-        'interview_active': web_bot.interview_active,
-        'waiting_for_response': web_bot.waiting_for_response,
+        'hihi_available': CORE_AVAILABLE,
+        'sessions': len(sessions),
+        'active_interviews': len(active),
+        'interview_active': len(active) > 0,
+        'waiting_for_response': any(s.waiting_for_response for s in active),
+        'tts_cache': tts_cache.stats(),
+        'llm': llm.stats(),
+        'video': video_analyzer.stats(),
+        'questions': dict(question_sources),
+        'feedback_drafts': dict(draft_stats),
+        'work_avoided': dict(work_avoided, llm_calls=llm.stats_counters['cancelled']),
         'message': 'Flask backend is running'
     })
 
 @app.route('/api/reset', methods=['POST'])
 def reset_state():
-    """Reset interview state - useful for development"""
+    """Reset one session's interview state (sid required) - useful for development"""
     try:
-        success, message = web_bot.reset_state()
+        sid = _request_sid()
+        if not sid:
+            return jsonify({'success': False, 'message': 'sid is required'}), 400
+        session = sessions.get(sid)
+        if not session:
+            return jsonify({'success': False, 'message': f'Unknown session: {sid}'}), 404
+
+        success, message = session.reset_state()
         return jsonify({
             'success': success,
             'message': message
@@ -496,9 +1257,13 @@ def reset_state():
 
 @app.route('/api/initialize', methods=['POST'])
 def initialize():
-    """Initialize the interview bot"""
+    """Check that interview sessions can be created.
+
+    Each socket connection gets its own bot, initialized on client_ready.
+    """
     try:
-        success, message = web_bot.initialize_bot()
+        success = CORE_AVAILABLE
+        message = "Ready to start interviews" if success else "InterviewCore not available. Check interview_core.py import."
         return jsonify({
             'success': success,
             'message': message,
@@ -527,9 +1292,16 @@ def start_interview():
 
 @app.route('/api/end-interview', methods=['POST'])
 def end_interview():
-    """End the interview"""
+    """End the interview for one session; sid is required so a stray call can't end every interview"""
     try:
-        success, message = web_bot.end_interview()
+        sid = _request_sid()
+        if not sid:
+            return jsonify({'success': False, 'message': 'sid is required'}), 400
+        session = sessions.get(sid)
+        if not session:
+            return jsonify({'success': False, 'message': f'Unknown session: {sid}'}), 404
+
+        success, message = session.end_interview()
         return jsonify({
             'success': success,
             'message': message
@@ -542,33 +1314,80 @@ def end_interview():
 
 @app.route('/api/status', methods=['GET'])
 def get_status():
-    """Get current interview status"""
+    """Get interview status for one session (?sid=...) or a summary of all sessions"""
+    sid = request.args.get('sid')
+    if sid:
+        session = sessions.get(sid)
+        if not session:
+            return jsonify({'error': f'Unknown session: {sid}'}), 404
+        return jsonify({
+            'sid': sid,
+            'interview_active': session.interview_active,
+            'waiting_for_response': session.waiting_for_response,
+            'question_count': session.question_count,
+            'max_questions': session.max_questions
+        })
+
+    all_sessions = sessions.all()
     return jsonify({
-        'interview_active': web_bot.interview_active,
-        'waiting_for_response': web_bot.waiting_for_response,
-        'question_count': web_bot.question_count,
-        'max_questions': web_bot.max_questions
+        'sessions': len(all_sessions),
+        'active_interviews': sum(1 for s in all_sessions if s.interview_active),
+        'waiting_for_response': sum(1 for s in all_sessions if s.waiting_for_response)
     })
 
-@socketio.on('connect')
-def handle_connect():
+@sio.on('connect')
+async def handle_connect(sid, environ, auth=None):
     """Handle client connection"""
-    print('👋 Client connected')
-    emit('connection_status', {'status': 'connected'})
+    print(f'👋 Client connected: {sid}')
+    sessions.create(sid)
+    await sio.emit('connection_status', {'status': 'connected', 'sid': sid}, to=sid)
 
-@socketio.on("client_ready")
-def on_client_ready():
-    print("✅ Frontend is ready. Starting interview.")
-    web_bot.start_interview()
+@sio.on("client_ready")
+async def on_client_ready(sid, data=None):
+    session = sessions.create(sid)
+    if not session.bot:
+        # Builds the engine and may wait on a previous interview; keep it off the transport loop
+        success, message = await asyncio.to_thread(session.initialize_bot)
+        if not success:
+            await sio.emit('error', {'message': message}, to=sid)
+            return
+    print(f"✅ Frontend {sid} is ready. Starting interview.")
+    session.start_interview()
+    session.update_capture_settings()
 
 
-@socketio.on('disconnect')
-def handle_disconnect():
+@sio.on('disconnect')
+async def handle_disconnect(sid, reason=None):
     """Handle client disconnection"""
-    print('👋 Client disconnected')
+    print(f'👋 Client disconnected: {sid}')
+    video_analyzer.discard(sid)
+    # Waits for the interview coroutine to stop, which must not block the transport loop
+    await asyncio.to_thread(sessions.remove, sid)
+
+@sio.on('end_interview')
+async def handle_end_interview(sid, data=None):
+    """Handle the client ending its interview"""
+    session = sessions.get(sid)
+    if session:
+        await asyncio.to_thread(session.end_interview)
 
-@socketio.on('user_message')
-def handle_user_message(data):
+@sio.on('audio_playback_ended')
+async def handle_audio_playback_ended(sid, data):
+    """Client finished playing an utterance - lets the interview continue"""
+    session = sessions.get(sid)
+    if session and data and data.get('utterance_id'):
+        session.playback_ended(data['utterance_id'])
+
+@sio.on('user_partial')
+async def handle_user_partial(sid, data):
+    """Interim speech transcript of the answer in progress"""
+    data = data or {}
+    session = sessions.get(sid)
+    if session:
+        session.process_partial_response(data.get('message', ''))
+
+@sio.on('user_message')
+async def handle_user_message(sid, data):
     """Handle user text message"""
     try:
         message = data.get('message', '').strip()
@@ -576,51 +1395,64 @@ def handle_user_message(data):
         
         if not message:
             print("⚠️ Empty message received")
-            emit('error', {'message': 'Empty message received'})
+            await sio.emit('error', {'message': 'Empty message received'}, to=sid)
+            return
+
+        session = sessions.get(sid)
+        if not session:
+            await sio.emit('error', {'message': 'No interview session for this connection'}, to=sid)
             return
             
         # Process the response
-        web_bot.process_user_response(message)
+        session.process_user_response(message)
         
         # Send confirmation back to frontend
-        emit('message_received', {
+        await sio.emit('message_received', {
             'message': 'Response received and processed',
             'timestamp': time.time()
-        })
+        }, to=sid)
         
     except Exception as e:
         print(f"❌ Error handling user message: {e}")
         print(traceback.format_exc())
-        emit('error', {'message': f'Failed to process your message: {str(e)}'})
+        await sio.emit('error', {'message': f'Failed to process your message: {str(e)}'}, to=sid)
 
-@socketio.on('video_frame')
-def handle_video_frame(data):
+@sio.on('video_frame')
+async def handle_video_frame(sid, data):
     """Handle video frame for monitoring"""
     try:
-        web_bot.analyze_video_frame(data['frame'])
+        session = sessions.get(sid)
+        if session:
+            session.analyze_video_frame(data['frame'])
     except Exception as e:
         print(f"Error handling video frame: {e}")
 
-@socketio.on('tab_change')
-def handle_tab_change():
+@sio.on('tab_change')
+async def handle_tab_change(sid, data=None):
     """Handle tab change detection"""
     try:
-        emit('monitoring_alert', {
-            'type': 'tab_change',
-            'message': 'Please stay focused on the interview',
-            'severity': 'warning'
-        })
+        session = sessions.get(sid)
+        if session:
+            session.report_tab_change()
     except Exception as e:
         print(f"Error handling tab change: {e}")
 
+
+def _attach_transport_loop():
+    """ASGI startup: remember the server's loop so other threads can emit through it"""
+    global transport_loop
+    transport_loop = asyncio.get_running_loop()
+
+
+# The ASGI entry point: Socket.IO on /socket.io, everything else to the Flask REST routes
+asgi_app = socketio.ASGIApp(sio, other_asgi_app=WsgiToAsgi(app), on_startup=_attach_transport_loop)
+
 if __name__ == '__main__':
     print("🚀 Starting Flask backend...")
-    print(f"HIHI module available: {HIHI_AVAILABLE}")
-    if not HIHI_AVAILABLE:
-        print("⚠️ Warning: hihi.py not found or SaaSInterviewBot class not available")
-    
-    # Reset state on startup
-    web_bot.reset_state()
+    print(f"Interview core available: {CORE_AVAILABLE}")
+    if not CORE_AVAILABLE:
+        print("⚠️ Warning: interview_core.py not found or InterviewCore class not available")
     
 if __name__ == "__main__":
-    app.run(host="0.0.0.0", port=8000)
+    import uvicorn
+    uvicorn.run(asgi_app, host="0.0.0.0", port=8000)
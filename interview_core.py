@@ -0,0 +1,189 @@
+import os
+import time
+import random
+import logging
+import threading
+
+import cv2
+from dotenv import load_dotenv
+
+from llm_client import response_text
+from face_detectors import FACE_CASCADE_FILE, HaarDetector, create_detector
+from tts_cache import shared_polly_client
+from tone_detection import PROFESSIONAL, ToneDetector
+
+logger = logging.getLogger(__name__)
+
+# Load environment variables
+load_dotenv()
+
+# Canned replies used when Gemini is unavailable
+GEMINI_FALLBACKS = [
+    "Could you tell me more about your experience with that?",
+    "That's interesting. Can you elaborate on your approach?",
+    "What challenges have you faced in that area?",
+    "Tell me more about your sales process."
+]
+
+# What the interviewer says when a response's tone isn't professional
+TONE_RESPONSES = {
+    "arrogant": [
+        "I appreciate your confidence! Let's channel that into demonstrating your sales knowledge.",
+        "Great confidence! Now let's see how you apply that expertise to sales scenarios.",
+    ],
+    "rude": [
+        "I understand interviews can be stressful. Let's take a moment and continue professionally.",
+        "No worries, let's refocus on showcasing your sales abilities.",
+    ]
+}
+TONE_FINAL_REMINDER = "I appreciate your participation, but let's maintain a professional tone throughout our conversation."
+
+# Heavyweight resources built once per process and shared by every interview
+_shared = {}
+_shared_lock = threading.Lock()
+
+
+def _shared_resource(key, factory):
+    """Return the cached resource for key, building it on first use (failures aren't cached)"""
+    with _shared_lock:
+        if key not in _shared:
+            _shared[key] = factory()
+        return _shared[key]
+
+
+def shared_gemini_model(model, api_key):
+    """One Gemini model handle per (model, key); GenerativeModel is stateless between calls"""
+    def build():
+        import google.generativeai as genai
+        genai.configure(api_key=api_key)
+        return genai.GenerativeModel(model)
+    return _shared_resource(('gemini', model, api_key), build)
+
+
+def shared_face_detection():
+    """(face_cascade, eye_cascade, face_detector), loaded from disk once per process.
+
+    FACE_DETECTOR picks the detector backend; the Haar default reuses the face cascade.
+    """
+    def build():
+        face_cascade = cv2.CascadeClassifier(cv2.data.haarcascades + FACE_CASCADE_FILE)
+        eye_cascade = cv2.CascadeClassifier(cv2.data.haarcascades + 'haarcascade_eye.xml')
+        if os.getenv("FACE_DETECTOR", HaarDetector.name) == HaarDetector.name:
+            face_detector = HaarDetector(face_cascade)
+        else:
+            face_detector = create_detector()
+        return face_cascade, eye_cascade, face_detector
+    return _shared_resource('face_detection', build)
+
+
+def shared_tone_detector():
+    """The compiled tone lexicons; TONE_LEXICON_FILE (JSON) replaces the defaults"""
+    def build():
+        path = os.getenv("TONE_LEXICON_FILE")
+        return ToneDetector.from_file(path) if path else ToneDetector()
+    return _shared_resource('tone_detector', build)
+
+
+class InterviewCore:
+    """Headless interview engine: Gemini, Polly, face detection and tone checks.
+
+    Imports nothing that needs a display, microphone or speakers, so the web
+    server can create one per session. The Tk desktop bot in hihi.py builds
+    on it and loads its own dependencies when the GUI starts.
+
+    The Gemini model, Polly client and face detectors are process-wide (see
+    shared_*), so an instance only holds interview state and the first
+    construction is the only slow one.
+    """
+    def __init__(self, model="gemini-2.0-flash", accent="us"):
+        try:
+            self.api_key = os.getenv("GEMINI_API_KEY")
+            if not self.api_key:
+                raise ValueError("Please set the GEMINI_API_KEY in .env file")
+
+            # Core AI setup
+            self.model = shared_gemini_model(model, self.api_key)
+
+            # Interview state management
+            self.interview_state = "introduction"
+            self.conversation_history = []
+            self.last_question = None
+
+            # Monitoring flags
+            self.tone_warnings = 0
+            self.cheating_warnings = 0
+            self.last_face_detection_time = time.time()
+            self.interview_active = True
+            self.monitoring_active = True
+
+            # Configuration
+            self.response_delay = 0.3
+            self.accent = accent.lower()
+
+            # Thread safety
+            self._lock = threading.Lock()
+
+            # Initialize face detection
+            try:
+                self.face_cascade, self.eye_cascade, self.face_detector = shared_face_detection()
+            except Exception as e:
+                logger.warning(f"Face detection initialization failed: {e}")
+                self.face_cascade = None
+                self.eye_cascade = None
+                self.face_detector = None
+
+            # ✅ Amazon Polly Initialization
+            self.polly = shared_polly_client()
+            if self.polly is None:
+                raise RuntimeError("Amazon Polly initialization failed")
+            logger.info("✅ Amazon Polly initialized successfully")
+        except Exception as e:
+            logger.error(f"Initialization error in {type(self).__name__}: {e}")
+            raise
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.cleanup()
+
+    def cleanup(self):
+        """Stop the interview; subclasses release their own resources"""
+        with self._lock:
+            self.interview_active = False
+            self.monitoring_active = False
+
+    def _detect_tone(self, text):
+        """Detect tone of the candidate's response"""
+        return shared_tone_detector().detect(text)
+
+    def tone_reply(self, text):
+        """Count a tone warning if the response isn't professional and return what to say, else None"""
+        tone = self._detect_tone(text)
+        if tone == PROFESSIONAL:
+            return None
+        self.tone_warnings += 1
+        if self.tone_warnings >= 3:
+            return TONE_FINAL_REMINDER
+        if tone in TONE_RESPONSES:
+            return random.choice(TONE_RESPONSES[tone])
+        return None
+
+    def query_gemini(self, prompt, max_retries=3):
+        """Query Gemini AI with retry logic"""
+        for attempt in range(max_retries):
+            try:
+                response = self.model.generate_content(prompt)
+                text = response_text(response)
+                if text:
+                    return text
+
+            except Exception as e:
+                logger.error(f"Gemini API Error (attempt {attempt + 1}): {e}")
+                if attempt < max_retries - 1:
+                    # Exponential backoff with full jitter before retrying
+                    time.sleep(random.uniform(0, min(8.0, 0.5 * 2 ** attempt)))
+                continue
+
+        # Fallback responses
+        return random.choice(GEMINI_FALLBACKS)
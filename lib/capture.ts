@@ -0,0 +1,31 @@
+// Webcam upload settings. The server adjusts them per session through the
+// "capture_settings" event, based on its video analysis load.
+export interface CaptureSettings {
+  interval: number // seconds between frames
+  width: number    // max frame width in pixels (height keeps the aspect ratio)
+  quality: number  // JPEG quality, 0-1
+}
+
+export const DEFAULT_CAPTURE_SETTINGS: CaptureSettings = {
+  interval: 1,
+  width: 640,
+  quality: 0.8,
+}
+
+// Draw the current video frame at the requested size and hand it over as raw JPEG bytes
+export const captureFrame = (
+  video: HTMLVideoElement,
+  canvas: HTMLCanvasElement,
+  settings: CaptureSettings,
+  onFrame: (frame: ArrayBuffer) => void,
+) => {
+  if (!video.videoWidth) return
+
+  const scale = Math.min(1, settings.width / video.videoWidth)
+  canvas.width = Math.round(video.videoWidth * scale)
+  canvas.height = Math.round(video.videoHeight * scale)
+  canvas.getContext("2d")?.drawImage(video, 0, 0, canvas.width, canvas.height)
+  canvas.toBlob((blob) => {
+    blob?.arrayBuffer().then((buffer) => onFrame(buffer))
+  }, "image/jpeg", settings.quality)
+}
@@ -0,0 +1,660 @@
+import re
+import json
+import time
+import random
+import asyncio
+import logging
+import threading
+from collections import Counter, deque
+from contextlib import asynccontextmanager
+
+from cancellation import Cancelled
+
+logger = logging.getLogger(__name__)
+
+
+class LLMUnavailable(Exception):
+    """Raised when a call is refused (circuit open) or runs out of time"""
+
+
+def response_text(response):
+    """Extract the text from a Gemini response, or None if it has none"""
+    if hasattr(response, 'text') and response.text:
+        return response.text
+    elif hasattr(response, 'candidates') and response.candidates:
+        return response.candidates[0].content.parts[0].text
+    logger.warning(f"Unexpected response format from Gemini: {response}")
+    return None
+
+
+def approx_tokens(text):
+    """Rough token count (~4 characters per token) used for rate limiting"""
+    return max(1, len(text) // 4)
+
+
+class SentenceSplitter:
+    """Incrementally split streamed text into complete sentences"""
+    # Sentence-ending punctuation (plus closing quotes/brackets) followed by whitespace
+    _SENTENCE_END = re.compile(r'[.!?]+["\')\]]*(?=\s)')
+
+    def __init__(self, min_chars=20):
+        self.min_chars = min_chars  # Shorter fragments are merged into the next sentence
+        self._buffer = ""
+
+    def feed(self, text):
+        """Add streamed text; return the sentences it completed"""
+        self._buffer += text
+        sentences = []
+        start = 0
+        for match in self._SENTENCE_END.finditer(self._buffer):
+            if match.end() - start < self.min_chars:
+                continue
+            sentences.append(self._buffer[start:match.end()].strip())
+            start = match.end()
+        self._buffer = self._buffer[start:]
+        return sentences
+
+    def flush(self):
+        """Return whatever is left once the stream has ended"""
+        rest, self._buffer = self._buffer.strip(), ""
+        return [rest] if rest else []
+
+
+async def stream_sentences(chunks):
+    """Turn an async stream of text chunks into an async stream of sentences"""
+    splitter = SentenceSplitter()
+    async for text in chunks:
+        for sentence in splitter.feed(text):
+            yield sentence
+    for sentence in splitter.flush():
+        yield sentence
+
+
+async def stream_field(chunks, field, raw):
+    """Yield the text of a JsonStringField as chunks arrive, stopping once its value is complete.
+
+    Every chunk read is appended to raw. chunks is left open, so the caller
+    can read the rest of the object from it afterwards.
+    """
+    async for chunk in chunks:
+        raw.append(chunk)
+        text = field.feed(chunk)
+        if text:
+            yield text
+        if field.done:
+            return
+
+
+# Last line of prompts that expect a JSON object back (see parse_json_reply)
+JSON_REPLY_INSTRUCTION = "Reply with the JSON object only."
+
+_JSON_OBJECT = re.compile(r'\{.*\}', re.DOTALL)
+
+
+def parse_json_reply(text, schema):
+    """Parse a JSON object reply and check it against schema ({key: type}).
+
+    Tolerates code fences and text around the object. Returns the object
+    with string values stripped, or None if it is missing, malformed, lacks
+    a key, has a value of the wrong type or an empty string.
+    """
+    if not text:
+        return None
+    match = _JSON_OBJECT.search(text)
+    if not match:
+        return None
+    try:
+        reply = json.loads(match.group())
+    except ValueError:
+        return None
+    if not isinstance(reply, dict):
+        return None
+    for key, kind in schema.items():
+        value = reply.get(key)
+        if not isinstance(value, kind):
+            return None
+        if isinstance(value, str):
+            value = value.strip()
+            if not value:
+                return None
+            reply[key] = value
+    return reply
+
+
+class JsonStringField:
+    """Incrementally decode one string field out of a streamed JSON object.
+
+    feed() takes raw chunks and returns the newly available characters of the
+    field's value, so a reply can be spoken before the rest of the object
+    (e.g. a second field) has arrived.
+    """
+    _ESCAPES = {'"': '"', '\\': '\\', '/': '/', 'b': '\b', 'f': '\f', 'n': '\n', 'r': '\r', 't': '\t'}
+
+    def __init__(self, key):
+        self._start = re.compile(r'"%s"\s*:\s*"' % re.escape(key))
+        self._buffer = ""
+        self._pos = None  # Next undecoded character of the value
+        self.done = False
+
+    def feed(self, chunk):
+        self._buffer += chunk
+        if self.done:
+            return ""
+        if self._pos is None:
+            match = self._start.search(self._buffer)
+            if not match:
+                return ""
+            self._pos = match.end()
+
+        out = []
+        buffer, i = self._buffer, self._pos
+        while i < len(buffer):
+            char = buffer[i]
+            if char == '"':
+                self.done = True
+                i += 1
+                break
+            if char != '\\':
+                out.append(char)
+                i += 1
+                continue
+            if i + 1 >= len(buffer):
+                break  # Escape split across chunks
+            code = buffer[i + 1]
+            if code == 'u':
+                if i + 6 > len(buffer):
+                    break
+                try:
+                    out.append(chr(int(buffer[i + 2:i + 6], 16)))
+                except ValueError:
+                    pass
+                i += 6
+            else:
+                out.append(self._ESCAPES.get(code, code))
+                i += 2
+        self._pos = i
+        return "".join(out)
+
+
+class GeminiBackend:
+    """Backend calling a google.generativeai GenerativeModel"""
+    def __init__(self, model):
+        self.model = model
+
+    async def generate(self, prompt):
+        response = await self.model.generate_content_async(prompt)
+        text = response_text(response)
+        if not text:
+            raise ValueError("Empty response from Gemini")
+        return text
+
+    async def stream(self, prompt):
+        response = await self.model.generate_content_async(prompt, stream=True)
+        async for chunk in response:
+            try:
+                text = chunk.text
+            except ValueError:
+                continue  # Chunk without text (e.g. safety metadata)
+            if text:
+                yield text
+
+
+class StubBackend:
+    """Offline backend with configurable latency, slow tail and failure rate, for load tests"""
+    def __init__(self, latency=0.8, jitter=0.4, failure_rate=0.0, reply=None, question=None,
+                 slow_rate=0.0, slow_latency=5.0):
+        self.latency = latency
+        self.jitter = jitter
+        self.failure_rate = failure_rate
+        self.slow_rate = slow_rate  # Share of calls that take slow_latency instead
+        self.slow_latency = slow_latency
+        self.reply = reply or "That's an interesting approach. How did you measure its impact on the deal?"
+        self.question = question or "What would you do differently if you ran that deal again?"
+
+    def _reply_for(self, prompt):
+        if prompt.rstrip().endswith(JSON_REPLY_INSTRUCTION):
+            return json.dumps({"feedback": self.reply, "next_question": self.question})
+        return self.reply
+
+    async def _wait(self):
+        latency = self.slow_latency if random.random() < self.slow_rate else self.latency
+        await asyncio.sleep(max(0.0, latency + random.uniform(-self.jitter, self.jitter)))
+        if random.random() < self.failure_rate:
+            raise RuntimeError("Stub backend: simulated 429 Resource exhausted")
+
+    async def generate(self, prompt):
+        await self._wait()
+        return self._reply_for(prompt)
+
+    async def stream(self, prompt):
+        await self._wait()
+        for word in self._reply_for(prompt).split(" "):
+            await asyncio.sleep(0.01)
+            yield word + " "
+
+
+class TokenBucket:
+    """Async token bucket: `rate` tokens per second, bursting up to `capacity`"""
+    def __init__(self, rate, capacity):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self, cost=1):
+        cost = min(cost, self.capacity)
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= cost:
+                    self._tokens -= cost
+                    return
+                await asyncio.sleep((cost - self._tokens) / self.rate)
+
+
+class CircuitBreaker:
+    """Opens after `threshold` consecutive failures; allows one probe after `cooldown` seconds"""
+    def __init__(self, threshold=5, cooldown=30.0):
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self.failures = 0
+        self.opened_at = None
+        self._probing = False
+
+    @property
+    def state(self):
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at >= self.cooldown:
+            return "half_open"
+        return "open"
+
+    def allow(self):
+        state = self.state
+        if state == "closed":
+            return True
+        if state == "half_open" and not self._probing:
+            self._probing = True
+            return True
+        return False
+
+    def release(self):
+        """End a half-open probe that finished without a result (cancelled or abandoned)"""
+        self._probing = False
+
+    def record_success(self):
+        self.failures = 0
+        self.opened_at = None
+        self._probing = False
+
+    def record_failure(self):
+        self.failures += 1
+        self._probing = False
+        if self.failures >= self.threshold or self.opened_at is not None:
+            if self.opened_at is None:
+                logger.warning("LLM circuit breaker opened")
+            self.opened_at = time.monotonic()
+
+
+class LatencyHistogram:
+    """Latency distribution of one model tier.
+
+    Fixed buckets (seconds, cumulative like a Prometheus histogram) for
+    export, plus a window of recent samples for the percentiles that decide
+    when to hedge.
+    """
+    BUCKETS = (0.1, 0.25, 0.5, 0.75, 1.0, 1.5, 2.0, 3.0, 5.0, 8.0, 13.0)
+
+    def __init__(self, window=200, min_samples=20):
+        self.min_samples = min_samples
+        self.counts = [0] * (len(self.BUCKETS) + 1)  # Last one is +Inf
+        self.count = 0
+        self.total = 0.0
+        self._recent = deque(maxlen=window)
+
+    def observe(self, seconds):
+        self.count += 1
+        self.total += seconds
+        self._recent.append(seconds)
+        for i, bound in enumerate(self.BUCKETS):
+            if seconds <= bound:
+                self.counts[i] += 1
+                break
+        else:
+            self.counts[-1] += 1
+
+    def percentile(self, q):
+        """q-quantile (0..1) of the recent samples, or None until there are min_samples"""
+        if len(self._recent) < self.min_samples:
+            return None
+        ordered = sorted(self._recent)
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+    def snapshot(self):
+        buckets, running = {}, 0
+        for bound, count in zip(self.BUCKETS + ('+Inf',), self.counts):
+            running += count
+            buckets[str(bound)] = running
+        recent = sorted(self._recent)
+
+        def quantile(q):
+            return round(recent[min(len(recent) - 1, int(q * len(recent)))], 3) if recent else None
+        return {
+            'count': self.count,
+            'sum': round(self.total, 3),
+            'p50': quantile(0.5),
+            'p95': quantile(0.95),
+            'buckets': buckets,
+        }
+
+
+DEFAULT_TIER = "standard"
+
+
+class LLMClient:
+    """Shared LLM call scheduler.
+
+    Every session's calls go through one client that enforces a global
+    concurrency limit and request/token rate limits, retries with
+    exponential backoff and full jitter, bounds each call by a deadline and
+    short-circuits to the caller's fallback while the circuit is open.
+    Must be used from a single asyncio event loop; stats() may be called
+    from any thread.
+
+    Calls name their prompt type (kind), which routes maps to a model tier
+    (a backend), a deadline and an optional hedge tier: a call still running
+    after its tier's hedge_percentile latency is duplicated on the hedge
+    tier and the first good reply wins. Latency histograms are kept per tier.
+
+    A call given a CancellationToken is refused once the token is cancelled
+    and aborted if it fires mid-call; either way Cancelled is raised.
+    """
+    def __init__(self, backend=None, max_concurrency=16, requests_per_minute=600,
+                 tokens_per_minute=400000, max_retries=3, base_delay=0.5, max_delay=8.0,
+                 deadline=10.0, breaker_threshold=5, breaker_cooldown=30.0, stall_timeout=5.0,
+                 backends=None, routes=None, hedging=True, hedge_percentile=0.5):
+        self.backends = dict(backends or {})
+        if backend is not None:
+            self.backends[DEFAULT_TIER] = backend
+        self.routes = routes or {}  # kind -> {'tier', 'deadline', 'hedge'}
+        self.hedging = hedging
+        self.hedge_percentile = hedge_percentile
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.deadline = deadline
+        self.stall_timeout = stall_timeout  # Longest wait between two streamed chunks
+
+        self._concurrency = asyncio.Semaphore(max_concurrency)
+        self._requests = TokenBucket(requests_per_minute / 60.0, max(1, requests_per_minute // 10))
+        self._tokens = TokenBucket(tokens_per_minute / 60.0, max(1, tokens_per_minute // 10))
+        self.breaker = CircuitBreaker(breaker_threshold, breaker_cooldown)
+
+        # (tier, 'generate' | 'first_chunk') -> LatencyHistogram of successful backend calls
+        self.latency = {}
+        self.route_calls = Counter()
+        self._stats_lock = threading.Lock()  # Guards latency and route_calls against stats() readers
+        self.stats_counters = {
+            'calls': 0, 'successes': 0, 'retries': 0, 'failures': 0,
+            'deadline_expired': 0, 'short_circuited': 0, 'in_flight': 0,
+            'hedged': 0, 'hedge_wins': 0, 'cancelled': 0,
+        }
+
+    @property
+    def backend(self):
+        return self.backends.get(DEFAULT_TIER)
+
+    def has_backend(self, tier=DEFAULT_TIER):
+        return tier in self.backends
+
+    def set_backend(self, backend, tier=DEFAULT_TIER):
+        """Attach a backend for a tier if the client doesn't have one yet"""
+        self.backends.setdefault(tier, backend)
+
+    def stats(self):
+        tiers = {}
+        with self._stats_lock:
+            for (tier, metric), histogram in self.latency.items():
+                tiers.setdefault(tier, {})[metric] = histogram.snapshot()
+            routes = dict(self.route_calls)
+        return dict(self.stats_counters, breaker=self.breaker.state, routes=routes, tiers=tiers)
+
+    def _route(self, kind):
+        """(tier, deadline, hedge tier or None) for a prompt type; tiers without a backend use the default"""
+        with self._stats_lock:
+            self.route_calls[kind or 'other'] += 1
+        route = self.routes.get(kind, {})
+        tier = route.get('tier', DEFAULT_TIER)
+        hedge = route.get('hedge')
+        tier = tier if tier in self.backends else DEFAULT_TIER
+        hedge = (hedge if hedge in self.backends else DEFAULT_TIER) if hedge else None
+        return tier, route.get('deadline') or self.deadline, hedge
+
+    def _histogram(self, tier, metric):
+        """The tier's histogram for metric; call with _stats_lock held"""
+        key = (tier, metric)
+        if key not in self.latency:
+            self.latency[key] = LatencyHistogram()
+        return self.latency[key]
+
+    def _observe(self, tier, metric, seconds):
+        with self._stats_lock:
+            self._histogram(tier, metric).observe(seconds)
+
+    async def generate(self, prompt, fallback=None, deadline=None, kind=None, token=None):
+        """Return the model's reply, or `fallback` if the call can't complete in time"""
+        self.stats_counters['calls'] += 1
+        self._check(token)
+        allowed, probe = self._admit()
+        if not allowed:
+            self.stats_counters['short_circuited'] += 1
+            return fallback
+
+        tier, route_deadline, hedge = self._route(kind)
+        call = asyncio.wait_for(self._generate_with_retries(prompt, tier, hedge), deadline or route_deadline)
+        try:
+            return await (token.run(call) if token else call)
+        except Cancelled:
+            self.stats_counters['cancelled'] += 1
+            raise
+        except asyncio.TimeoutError:
+            # One breaker failure per call, whether it timed out or ran out of retries
+            self.stats_counters['deadline_expired'] += 1
+            self.breaker.record_failure()
+            logger.warning("LLM call exceeded its deadline, using fallback")
+        except Exception as e:
+            self.stats_counters['failures'] += 1
+            self.breaker.record_failure()
+            logger.error(f"LLM call failed: {e}")
+        finally:
+            if probe:
+                self.breaker.release()
+        return fallback
+
+    def _admit(self):
+        """(allowed, probe): whether a call may go out, and whether it is the breaker's half-open probe.
+
+        A probe must end in breaker.release() if it records neither success nor
+        failure (e.g. it is cancelled), or the breaker never lets another through.
+        """
+        probe = self.breaker.state == "half_open"
+        allowed = self.backend is not None and self.breaker.allow()
+        return allowed, probe and allowed
+
+    async def _generate_with_retries(self, prompt, tier=DEFAULT_TIER, hedge=None):
+        for attempt in range(self.max_retries):
+            try:
+                text = await self._hedged(lambda t: self._generate_on(prompt, t), tier, hedge, 'generate')
+                self.breaker.record_success()
+                self.stats_counters['successes'] += 1
+                return text
+            except Exception as e:
+                logger.error(f"LLM API Error (attempt {attempt + 1}): {e}")
+                if attempt == self.max_retries - 1 or not self.breaker.allow():
+                    raise
+                self.stats_counters['retries'] += 1
+                # Exponential backoff with full jitter
+                await asyncio.sleep(random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt)))
+
+    async def _generate_on(self, prompt, tier):
+        async with self._slot(prompt):
+            start = time.monotonic()
+            text = await self.backends[tier].generate(prompt)
+            self._observe(tier, 'generate', time.monotonic() - start)
+            return text
+
+    async def _hedged(self, attempt, tier, hedge, metric, discard=None):
+        """Run attempt(tier); if it is still running after the tier's usual latency, also
+        run attempt(hedge) and return the first result that isn't an error.
+
+        discard(result) releases a successful result that lost the race.
+        """
+        primary = asyncio.ensure_future(attempt(tier))
+        delay = self._hedge_delay(tier, hedge, metric)
+        if delay is None:
+            return await primary
+
+        tasks = {primary: tier}
+        winner = None
+        try:
+            await asyncio.wait([primary], timeout=delay)
+            if not primary.done() and self._can_hedge():
+                self.stats_counters['hedged'] += 1
+                tasks[asyncio.ensure_future(attempt(hedge))] = hedge
+            pending, error = set(tasks), None
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        winner = task
+                        if task is not primary:
+                            self.stats_counters['hedge_wins'] += 1
+                        return task.result()
+                    error = task.exception()
+            raise error
+        finally:
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+                elif task is not winner and not task.cancelled() and task.exception() is None and discard:
+                    discard(task.result())
+
+    def _hedge_delay(self, tier, hedge, metric):
+        """Seconds to wait before hedging, or None to not hedge (off, no hedge tier, too few samples)"""
+        if not self.hedging or not hedge:
+            return None
+        with self._stats_lock:
+            return self._histogram(tier, metric).percentile(self.hedge_percentile)
+
+    def _can_hedge(self):
+        # A duplicate only helps if it doesn't queue behind other calls or probe a failing API
+        return self.breaker.state == "closed" and not self._concurrency.locked()
+
+    def _check(self, token):
+        if token is not None and token.cancelled:
+            self.stats_counters['cancelled'] += 1
+            token.raise_if_cancelled()
+
+    async def stream(self, prompt, first_chunk_deadline=None, kind=None, token=None):
+        """Yield the reply as text chunks.
+
+        Raises LLMUnavailable if refused, too slow to start, or stalled for
+        stall_timeout between two chunks.
+        """
+        self.stats_counters['calls'] += 1
+        self._check(token)
+        allowed, probe = self._admit()
+        if not allowed:
+            self.stats_counters['short_circuited'] += 1
+            raise LLMUnavailable("LLM circuit open")
+
+        tier, route_deadline, hedge = self._route(kind)
+
+        def discard(opened):
+            asyncio.ensure_future(opened[0].aclose())
+
+        opening = asyncio.wait_for(
+            self._hedged(lambda t: self._open_stream(prompt, t), tier, hedge, 'first_chunk', discard),
+            first_chunk_deadline or route_deadline)
+        try:
+            try:
+                chunks, first = await (token.run(opening) if token else opening)
+            except Cancelled:
+                self.stats_counters['cancelled'] += 1
+                raise
+            except asyncio.TimeoutError:
+                self.stats_counters['deadline_expired'] += 1
+                self.breaker.record_failure()
+                raise LLMUnavailable("LLM stream did not start before its deadline")
+            except Exception:
+                self.stats_counters['failures'] += 1
+                self.breaker.record_failure()
+                raise
+
+            try:
+                if first is None:
+                    self.breaker.record_success()
+                    return
+                yield first
+                while True:
+                    next_chunk = asyncio.wait_for(chunks.__anext__(), self.stall_timeout)
+                    try:
+                        text = await (token.run(next_chunk) if token else next_chunk)
+                    except StopAsyncIteration:
+                        break
+                    except Cancelled:
+                        self.stats_counters['cancelled'] += 1
+                        raise
+                    except asyncio.TimeoutError:
+                        self.stats_counters['deadline_expired'] += 1
+                        self.breaker.record_failure()
+                        raise LLMUnavailable(f"LLM stream stalled for {self.stall_timeout:.1f}s")
+                    except Exception:
+                        self.stats_counters['failures'] += 1
+                        self.breaker.record_failure()
+                        raise
+                    self._check(token)  # Stops within one chunk of a cancellation
+                    yield text
+                self.breaker.record_success()
+                self.stats_counters['successes'] += 1
+            finally:
+                await chunks.aclose()
+        finally:
+            if probe:
+                self.breaker.release()
+
+    async def _open_stream(self, prompt, tier):
+        """(chunk iterator, first chunk or None if the reply is empty) from one tier"""
+        chunks = self._stream_on(prompt, tier)
+        try:
+            return chunks, await chunks.__anext__()
+        except StopAsyncIteration:
+            return chunks, None
+        except BaseException:
+            await chunks.aclose()
+            raise
+
+    async def _stream_on(self, prompt, tier):
+        async with self._slot(prompt):
+            start = time.monotonic()
+            first = True
+            async for text in self.backends[tier].stream(prompt):
+                if first:
+                    self._observe(tier, 'first_chunk', time.monotonic() - start)
+                    first = False
+                yield text
+
+    @asynccontextmanager
+    async def _slot(self, prompt):
+        """Hold a concurrency slot plus rate-limit tokens for one call"""
+        await self._requests.acquire(1)
+        await self._tokens.acquire(approx_tokens(prompt))
+        async with self._concurrency:
+            self.stats_counters['in_flight'] += 1
+            try:
+                yield
+            finally:
+                self.stats_counters['in_flight'] -= 1
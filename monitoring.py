@@ -0,0 +1,167 @@
+import time
+import threading
+
+# Per violation: how long it must persist before it counts (hold), how long it
+# must be gone before it is considered resolved (clear), and the minimum time
+# between two counted violations of the same kind (cooldown). Seconds.
+VIOLATION_RULES = {
+    'no_face': {
+        'hold': 20.0, 'clear': 3.0, 'cooldown': 60.0,
+        'message': "Please ensure your face is clearly visible to the camera throughout the interview.",
+    },
+    'multiple_faces': {
+        'hold': 2.0, 'clear': 5.0, 'cooldown': 60.0,
+        'message': "Please ensure you are alone during this interview session.",
+    },
+    'tab_change': {
+        'hold': 0.0, 'clear': 0.0, 'cooldown': 10.0,
+        'message': "Please stay focused on the interview and avoid switching to other applications.",
+    },
+}
+
+MAX_WARNINGS = 3
+
+TERMINATION_MESSAGE = "Multiple policy violations detected. This interview session will now end."
+
+
+class _Condition:
+    """Hysteresis state for one kind of violation: ok -> suspect -> violating -> ok"""
+    def __init__(self):
+        self.state = 'ok'
+        self.since = 0.0          # When the current state (or clearing) began
+        self.announced = False    # Whether the current violation raised an alert
+        self.last_counted = None  # When this kind last added to the violation count
+
+
+class ViolationMonitor:
+    """Temporal alert state machine for one web interview session.
+
+    Per-frame face counts and tab switches are turned into a handful of
+    events: an alert when a violation has persisted for its hold time, and
+    a resolution once it has been gone for its clear time. Alerts for the
+    same kind are rate-limited by a cooldown, and every counted alert
+    advances a shared violation counter, like SaaSInterviewBot's
+    _handle_cheating_attempt: warnings escalate to a final warning, and the
+    interview ends when max_warnings is reached.
+
+    observe_* return the events to send as monitoring_alert; the caller
+    stops the interview when an event has 'terminate' set.
+    """
+    def __init__(self, max_warnings=MAX_WARNINGS, rules=None):
+        self.max_warnings = max_warnings
+        self.rules = rules or VIOLATION_RULES
+        self.violations = 0
+        self.terminated = False
+        self._conditions = {kind: _Condition() for kind in self.rules}
+        self._lock = threading.Lock()
+
+        self.observations = 0
+        self.alerts = 0
+        self.suppressed = 0
+
+    def observe_faces(self, faces, now=None):
+        """Feed one analyzed frame's face count"""
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            self.observations += 1
+            events = []
+            for kind, present in (('no_face', faces == 0), ('multiple_faces', faces > 1)):
+                event = self._step(kind, present, now)
+                if event:
+                    events.append(event)
+            return events
+
+    def observe_tab_change(self, now=None):
+        """Feed a tab/window switch reported by the client"""
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            self.observations += 1
+            event = self._step('tab_change', True, now)
+            # Instantaneous: ready to trigger again once the cooldown allows
+            self._conditions['tab_change'].state = 'ok'
+            return [event] if event else []
+
+    def _step(self, kind, present, now):
+        rule = self.rules[kind]
+        condition = self._conditions[kind]
+
+        if condition.state == 'ok':
+            if not present:
+                return None
+            condition.state, condition.since = 'suspect', now
+
+        if condition.state == 'suspect':
+            if not present:
+                condition.state = 'ok'
+                return None
+            if now - condition.since < rule['hold']:
+                return None
+            condition.state, condition.since = 'violating', now
+            return self._raise(kind, condition, now)
+
+        # violating / clearing
+        if present:
+            condition.state, condition.since = 'violating', now
+            if not condition.announced and not self.terminated and not self._cooling_down(kind, condition, now):
+                # Suppressed by the cooldown when it began, and still going on: count it now
+                return self._raise(kind, condition, now)
+            return None
+        if condition.state == 'violating':
+            condition.state, condition.since = 'clearing', now
+        if now - condition.since < rule['clear']:
+            return None
+        condition.state = 'ok'
+        if not condition.announced:
+            return None
+        condition.announced = False
+        return {
+            'type': kind,
+            'state': 'resolved',
+            'message': "Thank you, that's resolved.",
+            'severity': 'info',
+        }
+
+    def _cooling_down(self, kind, condition, now):
+        return condition.last_counted is not None and now - condition.last_counted < self.rules[kind]['cooldown']
+
+    def _raise(self, kind, condition, now):
+        rule = self.rules[kind]
+        if self.terminated or self._cooling_down(kind, condition, now):
+            self.suppressed += 1
+            condition.announced = False
+            return None
+
+        condition.last_counted = now
+        condition.announced = True
+        self.violations += 1
+        self.alerts += 1
+
+        if self.violations >= self.max_warnings:
+            self.terminated = True
+            return {
+                'type': kind,
+                'state': 'active',
+                'message': TERMINATION_MESSAGE,
+                'severity': 'critical',
+                'warning': self.violations,
+                'max_warnings': self.max_warnings,
+                'terminate': True,
+            }
+        return {
+            'type': kind,
+            'state': 'active',
+            'message': f"Reminder: {rule['message']} This is warning {self.violations} of {self.max_warnings}.",
+            'severity': 'error' if self.violations == self.max_warnings - 1 else 'warning',
+            'warning': self.violations,
+            'max_warnings': self.max_warnings,
+        }
+
+    def stats(self):
+        with self._lock:
+            return {
+                'violations': self.violations,
+                'alerts': self.alerts,
+                'suppressed': self.suppressed,
+                'observations': self.observations,
+                'states': {kind: c.state for kind, c in self._conditions.items()},
+            }
@@ -0,0 +1,115 @@
+import os
+import re
+import json
+import zlib
+import logging
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BANK_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "question_bank.json")
+
+EMBEDDING_DIM = 2048
+
+_WORD = re.compile(r"[a-z0-9]+")
+_STOPWORDS = frozenset("""
+a about after all also am an and any are as at be because been but by can could did do does doing
+for from had has have how i if in into is it its just me more most my no not of on or our out over
+so some than that the their them then there these they this to too up us very was we were what
+when where which while who why will with would you your yeah really think thing things like well
+""".split())
+
+
+def _stem(word):
+    for suffix in ("ing", "ed", "es", "s"):
+        if len(word) > len(suffix) + 3 and word.endswith(suffix):
+            return word[:-len(suffix)]
+    return word
+
+
+def _features(text):
+    """Stemmed content words and adjacent-word pairs"""
+    words = [_stem(w) for w in _WORD.findall(text.lower()) if w not in _STOPWORDS]
+    return words + [a + " " + b for a, b in zip(words, words[1:])]
+
+
+class TextEmbedder:
+    """Hashed TF-IDF vectors (unigrams + bigrams), L2-normalized; NumPy only.
+
+    IDF weights are learned from the bank at load time so that words every
+    question shares ("sales", "saas") count for little.
+    """
+    def __init__(self, documents, dim=EMBEDDING_DIM):
+        self.dim = dim
+        df = np.zeros(dim, np.float32)
+        for doc in documents:
+            df[np.unique(self._buckets(doc))] += 1
+        self.idf = np.log((1 + len(documents)) / (1 + df)).astype(np.float32) + 1
+
+    def _buckets(self, text):
+        return np.array([zlib.crc32(f.encode()) % self.dim for f in _features(text)], np.int64)
+
+    def embed(self, text):
+        vector = np.zeros(self.dim, np.float32)
+        buckets = self._buckets(text)
+        if buckets.size:
+            np.add.at(vector, buckets, 1.0)
+            vector = np.log1p(vector) * self.idf
+            vector /= np.linalg.norm(vector)
+        return vector
+
+    def embed_many(self, texts):
+        return np.stack([self.embed(t) for t in texts]) if texts else np.zeros((0, self.dim), np.float32)
+
+
+class QuestionBank:
+    """Curated interview questions with their embeddings in one NumPy matrix.
+
+    select() scores every question against the recent conversation with a
+    single matrix-vector product (cosine similarity, vectors are unit length),
+    drops questions already asked and penalizes ones close to them, so the
+    next question follows the conversation without repeating a topic.
+    """
+    def __init__(self, questions, dim=EMBEDDING_DIM, redundancy_penalty=0.5):
+        self.questions = [q["text"] if isinstance(q, dict) else q for q in questions]
+        self.topics = [q.get("topic") if isinstance(q, dict) else None for q in questions]
+        self.redundancy_penalty = redundancy_penalty
+        self.embedder = TextEmbedder(self.questions, dim)
+        self.vectors = self.embedder.embed_many(self.questions)  # (n, dim), unit rows
+        self._index = {q: i for i, q in enumerate(self.questions)}
+
+    @classmethod
+    def from_file(cls, path=DEFAULT_BANK_FILE, **options):
+        """Load a bank from JSON: {"questions": [{"text": ..., "topic": ...}, ...]}"""
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+        return cls(data["questions"], **options)
+
+    def __len__(self):
+        return len(self.questions)
+
+    def select(self, context, asked=(), min_similarity=0.0):
+        """Best unasked question for the conversation as (question, similarity).
+
+        Returns (None, best_similarity) if nothing reaches min_similarity,
+        leaving the turn to the LLM.
+        """
+        if not self.questions:
+            return None, 0.0
+        scores = self.vectors @ self.embedder.embed(context)
+        ranked = scores.copy()
+
+        asked_rows = [self._index[q] for q in asked if q in self._index]
+        other_asked = [q for q in asked if q not in self._index]
+        if asked_rows or other_asked:
+            asked_vectors = self.vectors[asked_rows]
+            if other_asked:
+                asked_vectors = np.vstack([asked_vectors, self.embedder.embed_many(other_asked)])
+            ranked -= self.redundancy_penalty * (self.vectors @ asked_vectors.T).max(axis=1)
+            ranked[asked_rows] = -np.inf
+
+        best = int(np.argmax(ranked))
+        if not np.isfinite(ranked[best]) or scores[best] < min_similarity:
+            return None, float(scores[best]) if np.isfinite(ranked[best]) else 0.0
+        return self.questions[best], float(scores[best])
@@ -4,9 +4,10 @@
 echo "Installing backend dependencies..."
 pip install -r requirements.txt
 
-# Step 2: Start the Flask backend (flask_backend.py should have `app = Flask(__name__)`)
-echo "Starting Flask backend..."
-gunicorn flask_backend:app --bind 0.0.0.0:8000 &
+# Step 2: Start the backend: async Socket.IO plus the Flask REST routes, one ASGI app
+# (a single process; interview sessions live in memory)
+echo "Starting backend..."
+uvicorn flask_backend:asgi_app --host 0.0.0.0 --port 8000 &
 
 # Step 3: Install frontend dependencies
 echo "Installing frontend dependencies..."
@@ -0,0 +1,115 @@
+import asyncio
+
+from conversation_memory import ConversationMemory
+
+
+def message(i):
+    """A 40-character message, 10 tokens by approx_tokens"""
+    return f"answer number {i}".ljust(40, ".")
+
+
+def line(i):
+    return f"{'Candidate' if i % 2 else 'Interviewer'}: {message(i)}"
+
+
+def fill(memory, count):
+    for i in range(count):
+        memory.add('user' if i % 2 else 'assistant', message(i))
+
+
+async def settle(memory):
+    """Wait until no summary is being folded in"""
+    while memory._task and not memory._task.done():
+        await asyncio.sleep(0)
+
+
+def small_memory(summarize=None):
+    return ConversationMemory(summarize, budget_tokens=60, recent_tokens=40, summary_tokens=20, summarize_batch=30)
+
+
+def test_context_keeps_newest_turns_within_budget():
+    memory = ConversationMemory(budget_tokens=50, recent_tokens=40)
+    fill(memory, 10)
+    assert memory.context() == "\n".join(line(i) for i in range(5, 10))
+    assert memory.context(budget_tokens=25) == "\n".join(line(i) for i in range(8, 10))
+
+
+def test_aged_out_turns_are_folded_into_summary():
+    prompts = []
+
+    async def summarize(prompt):
+        prompts.append(prompt)
+        return " notes on the candidate "
+
+    async def run():
+        memory = small_memory(summarize)
+        fill(memory, 7)
+        await settle(memory)
+        return memory
+
+    memory = asyncio.run(run())
+    assert len(prompts) == 1
+    assert all(message(i) in prompts[0] for i in range(3))
+    assert message(3) not in prompts[0]
+    assert memory.summary == "notes on the candidate"
+    assert memory.stats()['summaries'] == 1 and memory.stats()['turns'] == 4
+    assert memory.context() == ("Earlier in the interview: notes on the candidate\n\n"
+                                + "\n".join(line(i) for i in range(3, 7)))
+
+
+def test_no_summary_until_batch_has_aged_out():
+    calls = []
+
+    async def summarize(prompt):
+        calls.append(prompt)
+        return "notes"
+
+    async def run():
+        memory = small_memory(summarize)
+        fill(memory, 6)  # Two turns (20 tokens) aged out, batch is 30
+        await settle(memory)
+        return memory
+
+    memory = asyncio.run(run())
+    assert calls == []
+    assert memory.stats()['turns'] == 6
+
+
+def test_failed_summary_keeps_turns():
+    async def summarize(prompt):
+        raise RuntimeError("model down")
+
+    async def run():
+        memory = small_memory(summarize)
+        fill(memory, 7)
+        await settle(memory)
+        return memory
+
+    memory = asyncio.run(run())
+    assert memory.summary == ""
+    assert memory.stats()['summary_failures'] == 1 and memory.stats()['turns'] == 7
+
+
+def test_long_summary_is_cut_to_its_budget():
+    memory = small_memory()
+    memory.summary = "word " * 200
+    summary = memory.context().split("\n\n")[0]
+    assert summary.startswith("Earlier in the interview: word")
+    assert summary.endswith(" ...")
+    assert len(summary) <= len("Earlier in the interview: ") + 20 * 4 + 4
+
+
+def test_close_cancels_pending_summary():
+    async def summarize(prompt):
+        await asyncio.sleep(10)
+        return "notes"
+
+    async def run():
+        memory = small_memory(summarize)
+        fill(memory, 7)
+        task = memory._task
+        memory.close()
+        await asyncio.sleep(0)
+        return task
+
+    assert asyncio.run(run()).cancelled()
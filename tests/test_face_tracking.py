@@ -0,0 +1,130 @@
+import numpy as np
+
+from face_tracking import THUMBNAIL_SIZE, ChangeGate, FaceTracker
+
+WIDTH, HEIGHT = 640, 480
+# Each pixel holds its own index, so a detector can tell where a window it is shown sits
+FRAME = np.arange(WIDTH * HEIGHT, dtype=np.int32).reshape(HEIGHT, WIDTH)
+FACE = (300, 200, 80, 80)
+
+
+class FakeDetector:
+    """Finds `faces` (frame coordinates) that lie inside whatever window it is shown"""
+    def __init__(self, faces):
+        self.faces = list(faces)
+        self.windows = []  # (x, y, w, h) of every image searched
+
+    def detect(self, image):
+        y0, x0 = divmod(int(image[0, 0]), WIDTH)
+        h, w = image.shape[:2]
+        self.windows.append((x0, y0, w, h))
+        return [(x - x0, y - y0, fw, fh) for x, y, fw, fh in self.faces
+                if x >= x0 and y >= y0 and x + fw <= x0 + w and y + fh <= y0 + h]
+
+
+def is_full(window):
+    return window == (0, 0, WIDTH, HEIGHT)
+
+
+# FaceTracker
+
+def test_tracks_face_in_padded_window_after_full_scan():
+    detector, tracker = FakeDetector([FACE]), FaceTracker(padding=0.5)
+    assert tracker.detect(detector, FRAME) == [FACE]
+    assert tracker.detect(detector, FRAME) == [FACE]
+    assert is_full(detector.windows[0])
+    assert detector.windows[1] == (260, 160, 160, 160)  # 40 px (half the face) on each side
+    assert (tracker.full_scans, tracker.roi_scans) == (1, 1)
+
+
+def test_full_scan_forced_every_n_frames():
+    detector, tracker = FakeDetector([FACE]), FaceTracker(full_scan_every=3)
+    for _ in range(9):
+        assert tracker.detect(detector, FRAME) == [FACE]
+    assert [is_full(w) for w in detector.windows] == [True, False, False, False] * 2 + [True]
+    assert tracker.full_scans == 3
+
+
+def test_lost_face_is_confirmed_by_full_scan_on_same_frame():
+    detector, tracker = FakeDetector([FACE]), FaceTracker()
+    tracker.detect(detector, FRAME)
+    detector.faces = [(20, 20, 80, 80)]  # The candidate moved out of the window
+    assert tracker.detect(detector, FRAME) == [(20, 20, 80, 80)]
+    assert [is_full(w) for w in detector.windows] == [True, False, True]
+    assert tracker.box == (20, 20, 80, 80)
+
+
+def test_no_face_drops_tracking_until_one_is_found():
+    detector, tracker = FakeDetector([FACE]), FaceTracker()
+    tracker.detect(detector, FRAME)
+    detector.faces = []
+    assert tracker.detect(detector, FRAME) == []
+    assert tracker.box is None
+    assert tracker.detect(detector, FRAME) == []
+    assert [is_full(w) for w in detector.windows] == [True, False, True, True]
+
+
+def test_second_face_in_window_is_confirmed_by_full_scan():
+    second = (345, 250, 60, 60)  # Leaning in next to the candidate, inside the search window
+    detector, tracker = FakeDetector([FACE]), FaceTracker()
+    tracker.detect(detector, FRAME)
+    detector.faces = [FACE, second]
+    assert sorted(tracker.detect(detector, FRAME)) == sorted([FACE, second])
+    assert is_full(detector.windows[-1])
+    assert tracker.box is None
+
+
+# ChangeGate
+
+def thumb(value=100):
+    return np.full((THUMBNAIL_SIZE[1], THUMBNAIL_SIZE[0]), value, np.uint8)
+
+
+def analyzed_gate(faces=1, now=0.0, **options):
+    gate = ChangeGate(**options)
+    assert gate.check(thumb(), now) is None  # Nothing analyzed yet
+    gate.update(thumb(), faces, now)
+    return gate
+
+
+def test_unchanged_frame_reuses_face_count():
+    gate = analyzed_gate(faces=2)
+    assert gate.check(thumb(), 1.0) == 2
+    assert gate.skipped == 1
+
+
+def test_noise_below_pixel_threshold_is_not_change():
+    gate = analyzed_gate(pixel_threshold=20)
+    assert gate.check(thumb(115), 1.0) == 1
+
+
+def test_change_over_area_threshold_forces_detection():
+    gate = analyzed_gate(changed_area=0.02)
+    pixels = THUMBNAIL_SIZE[0] * THUMBNAIL_SIZE[1]
+    small, large = thumb(), thumb()
+    small.flat[:int(pixels * 0.01)] = 255
+    large.flat[:int(pixels * 0.05)] = 255
+    assert gate.check(small, 1.0) == 1
+    assert gate.check(large, 1.0) is None
+
+
+def test_stale_result_forces_detection():
+    gate = analyzed_gate(max_staleness=5.0)
+    assert gate.check(thumb(), 4.9) == 1
+    assert gate.check(thumb(), 5.0) is None
+
+
+def test_change_away_from_tracked_face_needs_full_scan():
+    gate = analyzed_gate()
+    near, far = thumb(), thumb()
+    near[8:17, 13:22] = 255   # Around the face, e.g. the candidate shifting in their seat
+    far[:, :6] = 255          # Left edge, e.g. someone walking in
+    box = (300, 200, 80, 80)  # In a 640x480 frame; padded, thumbnail columns 13-21, rows 8-16
+    gate.check(near, 1.0)
+    assert not gate.changed_outside(box, (HEIGHT, WIDTH))
+    gate.check(far, 1.0)
+    assert gate.changed_outside(box, (HEIGHT, WIDTH))
+
+
+def test_unchecked_frame_counts_as_changed_outside():
+    assert ChangeGate().changed_outside(FACE, (HEIGHT, WIDTH))
@@ -0,0 +1,399 @@
+import time
+import asyncio
+import threading
+
+import pytest
+
+from cancellation import CancellationToken, Cancelled
+from llm_client import (CircuitBreaker, JsonStringField, LatencyHistogram, LLMClient, LLMUnavailable,
+                        SentenceSplitter, parse_json_reply, stream_field, stream_sentences)
+
+
+class FakeBackend:
+    """Replies with `reply` after `latency` seconds, or raises if `fail` is set.
+
+    A stream hangs after its first `stall_after` chunks if that is set.
+    """
+    def __init__(self, reply="ok", latency=0.0, fail=False, chunks=None, stall_after=None):
+        self.reply = reply
+        self.latency = latency
+        self.fail = fail
+        self.chunks = chunks or [reply]
+        self.stall_after = stall_after
+        self.calls = 0
+
+    async def generate(self, prompt):
+        self.calls += 1
+        await asyncio.sleep(self.latency)
+        if self.fail:
+            raise RuntimeError("backend down")
+        return self.reply
+
+    async def stream(self, prompt):
+        self.calls += 1
+        await asyncio.sleep(self.latency)
+        if self.fail:
+            raise RuntimeError("backend down")
+        for i, chunk in enumerate(self.chunks):
+            if i == self.stall_after:
+                await asyncio.sleep(3600)
+            yield chunk
+
+
+def make_client(backends, **options):
+    options.setdefault('max_retries', 1)
+    return LLMClient(backends=backends, requests_per_minute=10 ** 6, tokens_per_minute=10 ** 8, **options)
+
+
+def open_breaker(client):
+    """Fail one call so a threshold-1 breaker opens, then wait out its cooldown"""
+    backend = client.backends['standard']
+    backend.fail = True
+    assert asyncio.run(client.generate("hi", fallback="fallback")) == "fallback"
+    assert client.breaker.state == "open"
+    backend.fail = False
+    time.sleep(client.breaker.cooldown + 0.01)
+    assert client.breaker.state == "half_open"
+
+
+# CircuitBreaker
+
+def test_breaker_opens_after_threshold_and_probes_once():
+    breaker = CircuitBreaker(threshold=2, cooldown=0.05)
+    breaker.record_failure()
+    assert breaker.state == "closed" and breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == "open" and not breaker.allow()
+
+    time.sleep(0.06)
+    assert breaker.allow()       # The probe
+    assert not breaker.allow()   # Only one at a time
+    breaker.record_success()
+    assert breaker.state == "closed" and breaker.allow()
+
+
+def test_failed_probe_reopens_breaker():
+    breaker = CircuitBreaker(threshold=1, cooldown=0.05)
+    breaker.record_failure()
+    time.sleep(0.06)
+    assert breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == "open"
+
+
+def test_released_probe_lets_the_next_call_probe():
+    breaker = CircuitBreaker(threshold=1, cooldown=0.05)
+    breaker.record_failure()
+    time.sleep(0.06)
+    assert breaker.allow()
+    breaker.release()
+    assert breaker.allow()
+
+
+def test_cancelled_generate_probe_does_not_wedge_breaker():
+    client = make_client({'standard': FakeBackend(latency=0.2)}, breaker_threshold=1, breaker_cooldown=0.05)
+    open_breaker(client)
+
+    async def cancel_probe():
+        token = CancellationToken()
+        asyncio.get_running_loop().call_later(0.05, token.cancel)
+        with pytest.raises(Cancelled):
+            await client.generate("hi", fallback="fallback", token=token)
+
+    asyncio.run(cancel_probe())
+    assert asyncio.run(client.generate("hi", fallback="fallback")) == "ok"
+    assert client.breaker.state == "closed"
+
+
+def test_abandoned_stream_probe_does_not_wedge_breaker():
+    backend = FakeBackend(chunks=["one ", "two ", "three"])
+    client = make_client({'standard': backend}, breaker_threshold=1, breaker_cooldown=0.05)
+    open_breaker(client)
+
+    async def read_one_chunk():
+        chunks = client.stream("hi")
+        assert await chunks.__anext__() == "one "
+        await chunks.aclose()
+
+    asyncio.run(read_one_chunk())
+    assert asyncio.run(client.generate("hi", fallback="fallback")) == "ok"
+
+
+def test_open_breaker_short_circuits():
+    client = make_client({'standard': FakeBackend()}, breaker_threshold=1, breaker_cooldown=60)
+    client.backends['standard'].fail = True
+    asyncio.run(client.generate("hi"))
+    client.backends['standard'].fail = False
+    assert asyncio.run(client.generate("hi", fallback="fallback")) == "fallback"
+
+    async def stream():
+        return [chunk async for chunk in client.stream("hi")]
+
+    with pytest.raises(LLMUnavailable):
+        asyncio.run(stream())
+    assert client.stats()['short_circuited'] == 2
+
+
+def test_stream_that_stalls_mid_reply_raises():
+    backend = FakeBackend(chunks=["Good point. ", "And ", "more"], stall_after=1)
+    client = make_client({'standard': backend}, stall_timeout=0.1)
+    received = []
+
+    async def read():
+        async for chunk in client.stream("hi"):
+            received.append(chunk)
+
+    start = time.monotonic()
+    with pytest.raises(LLMUnavailable):
+        asyncio.run(read())
+    assert time.monotonic() - start < 1.0
+    assert received == ["Good point. "]
+    stats = client.stats()
+    assert stats['deadline_expired'] == 1 and stats['in_flight'] == 0
+    assert client.breaker.failures == 1
+
+
+def test_failed_call_counts_once_against_breaker():
+    client = make_client({'standard': FakeBackend(fail=True)}, max_retries=3, base_delay=0.0)
+    assert asyncio.run(client.generate("hi", fallback="fallback")) == "fallback"
+    assert client.stats()['retries'] == 2
+    assert client.breaker.failures == 1
+
+
+def test_call_past_deadline_counts_once_against_breaker(monkeypatch):
+    # The first attempt fails, then the deadline expires during the backoff
+    monkeypatch.setattr("llm_client.random.uniform", lambda low, high: high)
+    client = make_client({'standard': FakeBackend(fail=True)}, max_retries=3, base_delay=10.0, deadline=0.1)
+    assert asyncio.run(client.generate("hi", fallback="fallback")) == "fallback"
+    assert client.stats()['deadline_expired'] == 1
+    assert client.breaker.failures == 1
+
+
+# Cancellation
+
+def test_cancel_stops_generate_in_flight():
+    backend = FakeBackend(latency=5.0)
+    client = make_client({'standard': backend})
+
+    async def call():
+        token = CancellationToken()
+        asyncio.get_running_loop().call_later(0.05, token.cancel)
+        with pytest.raises(Cancelled):
+            await client.generate("hi", token=token)
+
+    start = time.monotonic()
+    asyncio.run(call())
+    assert time.monotonic() - start < 1.0
+    stats = client.stats()
+    assert stats['cancelled'] == 1 and stats['in_flight'] == 0
+    assert client._concurrency._value == 16
+    assert client.breaker.failures == 0
+
+
+def test_cancel_stops_stream_waiting_for_next_chunk():
+    backend = FakeBackend(chunks=["Good point. ", "And ", "more"], stall_after=1)
+    client = make_client({'standard': backend}, stall_timeout=60)
+    received = []
+
+    async def read():
+        token = CancellationToken()
+        asyncio.get_running_loop().call_later(0.05, token.cancel)
+        with pytest.raises(Cancelled):
+            async for chunk in client.stream("hi", token=token):
+                received.append(chunk)
+
+    start = time.monotonic()
+    asyncio.run(read())
+    assert time.monotonic() - start < 1.0
+    assert received == ["Good point. "]
+    stats = client.stats()
+    assert stats['cancelled'] == 1 and stats['in_flight'] == 0
+    assert client.breaker.failures == 0
+
+
+def test_cancelled_token_refuses_new_calls():
+    backend = FakeBackend()
+    client = make_client({'standard': backend})
+    token = CancellationToken()
+    token.cancel()
+    with pytest.raises(Cancelled):
+        asyncio.run(client.generate("hi", token=token))
+    assert backend.calls == 0
+
+
+def test_stream_with_live_token_reads_whole_reply():
+    client = make_client({'standard': FakeBackend(chunks=["one ", "two ", "three"])})
+
+    async def read():
+        return "".join([chunk async for chunk in client.stream("hi", token=CancellationToken())])
+
+    assert asyncio.run(read()) == "one two three"
+    assert client.stats()['successes'] == 1
+
+
+# Hedging
+
+ROUTES = {'chat': {'tier': 'standard', 'deadline': 5.0, 'hedge': 'fast'}}
+
+
+def warm(client, metric, seconds=0.02):
+    for _ in range(LatencyHistogram().min_samples):
+        client._observe('standard', metric, seconds)
+
+
+def test_no_hedge_until_tier_has_latency_samples():
+    client = make_client({'standard': FakeBackend("slow", latency=0.1), 'fast': FakeBackend("fast")},
+                         routes=ROUTES)
+    assert asyncio.run(client.generate("hi", kind='chat')) == "slow"
+    assert client.stats()['hedged'] == 0
+
+
+def test_slow_call_is_hedged_on_fast_tier():
+    standard, fast = FakeBackend("slow", latency=0.5), FakeBackend("fast", latency=0.01)
+    client = make_client({'standard': standard, 'fast': fast}, routes=ROUTES)
+    warm(client, 'generate')
+
+    start = time.monotonic()
+    assert asyncio.run(client.generate("hi", kind='chat')) == "fast"
+    assert time.monotonic() - start < 0.3
+    stats = client.stats()
+    assert stats['hedged'] == 1 and stats['hedge_wins'] == 1 and stats['in_flight'] == 0
+
+
+def test_fast_primary_is_not_hedged():
+    standard, fast = FakeBackend("standard", latency=0.0), FakeBackend("fast")
+    client = make_client({'standard': standard, 'fast': fast}, routes=ROUTES)
+    warm(client, 'generate', seconds=0.2)
+    assert asyncio.run(client.generate("hi", kind='chat')) == "standard"
+    assert fast.calls == 0
+
+
+def test_hedge_survives_primary_failure():
+    standard, fast = FakeBackend(latency=0.1, fail=True), FakeBackend("fast", latency=0.2)
+    client = make_client({'standard': standard, 'fast': fast}, routes=ROUTES)
+    warm(client, 'generate')
+    assert asyncio.run(client.generate("hi", kind='chat', fallback="fallback")) == "fast"
+
+
+def test_hedged_stream_releases_losing_slot():
+    standard = FakeBackend(latency=0.5, chunks=["slow"])
+    fast = FakeBackend(latency=0.01, chunks=["fast ", "reply"])
+    client = make_client({'standard': standard, 'fast': fast}, routes=ROUTES)
+    warm(client, 'first_chunk')
+
+    async def read():
+        text = "".join([chunk async for chunk in client.stream("hi", kind='chat')])
+        await asyncio.sleep(0.01)  # Let the cancelled loser unwind
+        return text
+
+    assert asyncio.run(read()) == "fast reply"
+    assert client.stats()['in_flight'] == 0
+    assert client._concurrency._value == 16
+
+
+def test_unknown_tier_falls_back_to_standard():
+    client = make_client({'standard': FakeBackend("standard")}, routes=ROUTES)
+    assert asyncio.run(client.generate("hi", kind='chat')) == "standard"
+    assert 'standard' in client.stats()['tiers']
+
+
+def test_stats_can_be_read_while_the_loop_records():
+    client = make_client({'standard': FakeBackend()})
+    stop, errors = threading.Event(), []
+
+    def read_stats():
+        while not stop.is_set():
+            try:
+                client.stats()
+            except RuntimeError as e:  # dictionary changed size during iteration
+                errors.append(e)
+
+    reader = threading.Thread(target=read_stats)
+    reader.start()
+    try:
+        for i in range(20000):
+            client._route(f"kind-{i}")
+            client._observe(f"tier-{i % 2000}", 'generate', 0.1)
+    finally:
+        stop.set()
+        reader.join()
+    assert not errors
+    assert client.stats()['routes']['kind-0'] == 1
+
+
+# Structured replies
+
+SCHEMA = {'feedback': str, 'next_question': str}
+
+
+def test_parse_json_reply_accepts_fenced_object():
+    text = '```json\n{"feedback": " Nice. ", "next_question": "Why?"}\n```'
+    assert parse_json_reply(text, SCHEMA) == {'feedback': "Nice.", 'next_question': "Why?"}
+
+
+@pytest.mark.parametrize("text", [
+    None,
+    "",
+    "no json here",
+    '{"feedback": "Nice."',
+    '{"feedback": "Nice."}',
+    '{"feedback": "Nice.", "next_question": 3}',
+    '{"feedback": "  ", "next_question": "Why?"}',
+    '["feedback"]',
+])
+def test_parse_json_reply_rejects_invalid(text):
+    assert parse_json_reply(text, SCHEMA) is None
+
+
+def test_json_string_field_decodes_across_chunks():
+    reply = '{"feedback": "Say \\"hi\\"\\nthen caf\\u00e9.", "next_question": "Why?"}'
+    field = JsonStringField('feedback')
+    decoded = "".join(field.feed(reply[i:i + 3]) for i in range(0, len(reply), 3))
+    assert decoded == 'Say "hi"\nthen café.'
+    assert field.done
+
+
+def test_json_string_field_waits_for_its_key():
+    field = JsonStringField('feedback')
+    assert field.feed('{"next_question": "Why?", ') == ""
+    assert field.feed('"feedback": "Go') == "Go"
+    assert field.feed('od."}') == "od."
+    assert field.feed(' more') == ""
+
+
+def test_last_field_sentence_is_not_held_for_the_rest_of_the_object():
+    async def reply():
+        yield '{"feedback": "Discovery calls are a solid start. '
+        yield 'Tell me how you handle pricing."'
+        await asyncio.sleep(0.5)  # The question is still generating
+        yield ', "next_question": "How do you qualify leads?"}'
+
+    async def speak():
+        chunks, raw, spoken = reply(), [], []
+        start = time.monotonic()
+        async for sentence in stream_sentences(stream_field(chunks, JsonStringField('feedback'), raw)):
+            spoken.append((sentence, time.monotonic() - start))
+        async for chunk in chunks:
+            raw.append(chunk)
+        return spoken, parse_json_reply(''.join(raw), SCHEMA)
+
+    spoken, parsed = asyncio.run(speak())
+    assert [sentence for sentence, _ in spoken] == ["Discovery calls are a solid start.",
+                                                    "Tell me how you handle pricing."]
+    assert spoken[-1][1] < 0.25
+    assert parsed['next_question'] == "How do you qualify leads?"
+
+
+# Sentence splitting
+
+def test_sentence_splitter_emits_complete_sentences():
+    splitter = SentenceSplitter(min_chars=10)
+    assert splitter.feed("That is a good point. How did") == ["That is a good point."]
+    assert splitter.feed(" you measure it? Ok") == ["How did you measure it?"]
+    assert splitter.flush() == ["Ok"]
+    assert splitter.flush() == []
+
+
+def test_sentence_splitter_merges_short_fragments():
+    splitter = SentenceSplitter(min_chars=20)
+    assert splitter.feed("Great. That really helps the deal. ") == ["Great. That really helps the deal."]
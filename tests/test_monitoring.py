@@ -0,0 +1,90 @@
+from monitoring import TERMINATION_MESSAGE, ViolationMonitor
+
+
+def feed(monitor, faces, start, seconds, step=1.0):
+    """Feed `faces` every `step` seconds from start for `seconds`; returns (events, end time)"""
+    events, now = [], start
+    while now < start + seconds:
+        events += monitor.observe_faces(faces, now=now)
+        now += step
+    return events, now
+
+
+def test_violation_must_persist_for_hold_time():
+    monitor = ViolationMonitor()
+    events, now = feed(monitor, 2, 0.0, 1.5)          # Shorter than the 2 s hold
+    events += feed(monitor, 1, now, 10)[0]
+    assert events == []
+    assert monitor.violations == 0
+
+    events, _ = feed(monitor, 2, 100.0, 3)
+    assert [(e['type'], e['state'], e['warning']) for e in events] == [('multiple_faces', 'active', 1)]
+
+
+def test_resolution_after_clear_time():
+    monitor = ViolationMonitor()
+    _, now = feed(monitor, 2, 0.0, 3)
+    events, now = feed(monitor, 1, now, 4)              # Clear time is 5 s
+    assert events == []
+    events, _ = feed(monitor, 1, now, 3)
+    assert [(e['type'], e['state']) for e in events] == [('multiple_faces', 'resolved')]
+
+
+def test_brief_return_during_clearing_keeps_violation():
+    monitor = ViolationMonitor()
+    _, now = feed(monitor, 2, 0.0, 3)
+    _, now = feed(monitor, 1, now, 2)
+    events, now = feed(monitor, 2, now, 30)
+    assert events == [] and monitor.violations == 1
+
+
+def test_violation_within_cooldown_is_raised_once_cooldown_passes():
+    monitor = ViolationMonitor()
+    feed(monitor, 1, 0.0, 5)
+    events, now = feed(monitor, 2, 5.0, 10)             # Counted at t=7
+    assert len(events) == 1
+    _, now = feed(monitor, 1, now, 10)                  # Resolved
+    events, _ = feed(monitor, 2, now, 600)              # Back within the 60 s cooldown, stays
+    active = [e for e in events if e['state'] == 'active']
+    assert len(active) == 1 and active[0]['warning'] == 2
+    assert monitor.violations == 2
+    assert monitor.suppressed == 1
+
+
+def test_no_face_uses_its_own_hold():
+    monitor = ViolationMonitor()
+    events, _ = feed(monitor, 0, 0.0, 20)
+    assert events == []
+    events, _ = feed(monitor, 0, 20.0, 2)
+    assert [e['type'] for e in events] == ['no_face']
+
+
+def test_tab_changes_are_rate_limited():
+    monitor = ViolationMonitor()
+    assert len(monitor.observe_tab_change(now=0.0)) == 1
+    assert monitor.observe_tab_change(now=5.0) == []     # 10 s cooldown
+    events = monitor.observe_tab_change(now=11.0)
+    assert events[0]['warning'] == 2 and events[0]['severity'] == 'error'
+    assert monitor.suppressed == 1
+
+
+def test_third_violation_terminates():
+    monitor = ViolationMonitor()
+    monitor.observe_tab_change(now=0.0)
+    monitor.observe_tab_change(now=20.0)
+    events, _ = feed(monitor, 2, 30.0, 3)
+    assert events[-1]['terminate'] and events[-1]['severity'] == 'critical'
+    assert events[-1]['message'] == TERMINATION_MESSAGE
+    assert monitor.terminated
+
+    # Nothing more is counted once the interview is over
+    assert monitor.observe_tab_change(now=100.0) == []
+    assert monitor.violations == 3
+
+
+def test_stats():
+    monitor = ViolationMonitor()
+    feed(monitor, 2, 0.0, 3)
+    stats = monitor.stats()
+    assert stats['violations'] == 1 and stats['observations'] == 3
+    assert stats['states']['multiple_faces'] == 'violating'
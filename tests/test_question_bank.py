@@ -0,0 +1,48 @@
+import pytest
+
+from question_bank import DEFAULT_BANK_FILE, QuestionBank
+
+PRICING = "How do you handle objections when a prospect says your SaaS solution is too expensive?"
+DISCOVERY = "What does a great first discovery call look like for you, from opening to next steps?"
+CHURN = "How do you work with customer success to keep renewals from churning?"
+QUESTIONS = [PRICING, DISCOVERY, CHURN]
+
+
+@pytest.fixture
+def bank():
+    return QuestionBank([{"text": q, "topic": None} for q in QUESTIONS])
+
+
+def test_selects_most_similar_question(bank):
+    question, score = bank.select("The prospect pushed back on price, they said it was too expensive")
+    assert question == PRICING
+    assert score > 0
+    assert bank.select("I open every discovery call by asking about their goals")[0] == DISCOVERY
+
+
+def test_similarity_follows_context(bank):
+    _, pricing_score = bank.select("the prospect said our price was too expensive", min_similarity=0.0)
+    _, other_score = bank.select("we went hiking at the weekend", min_similarity=0.0)
+    assert pricing_score > other_score
+
+
+def test_excludes_asked_questions(bank):
+    context = "The prospect pushed back on price, they said it was too expensive"
+    question, _ = bank.select(context, asked=[PRICING])
+    assert question in (DISCOVERY, CHURN)
+    assert bank.select(context, asked=QUESTIONS) == (None, 0.0)
+
+
+def test_below_min_similarity_leaves_turn_to_llm(bank):
+    question, score = bank.select("we went hiking at the weekend", min_similarity=0.5)
+    assert question is None
+    assert score < 0.5
+
+
+def test_empty_bank_selects_nothing():
+    assert QuestionBank([]).select("anything at all") == (None, 0.0)
+
+
+def test_default_bank_loads():
+    bank = QuestionBank.from_file(DEFAULT_BANK_FILE)
+    assert len(bank) == len(set(bank.questions)) > 0
@@ -0,0 +1,51 @@
+import pytest
+
+from tone_detection import PROFESSIONAL, ToneDetector
+
+
+def test_default_lexicons():
+    detector = ToneDetector()
+    assert detector.detect("Honestly that's stupid, who cares") == "rude"
+    assert detector.detect("We qualify leads by budget and timeline.") == PROFESSIONAL
+
+
+def test_apostrophes_and_case_are_ignored():
+    assert ToneDetector().detect("THATS EASY, obviously") == "arrogant"
+
+
+def test_first_lexicon_wins():
+    assert ToneDetector().detect("Obviously, this is ridiculous") == "arrogant"
+
+
+def test_phrases_match_whole_words_only():
+    detector = ToneDetector({'rude': ["whatever"]})
+    assert detector.detect("whatever works") == "rude"
+    assert detector.detect("whateverworks") == PROFESSIONAL
+
+
+@pytest.mark.parametrize("text, tone", [
+    ("I use c++ daily", "x"),
+    ("c++", "x"),
+    ("lets go!", "y"),
+    ("go! team", "y"),
+    ("I use c++11", PROFESSIONAL),
+    ("ago! now", PROFESSIONAL),
+])
+def test_phrases_with_punctuation_at_the_edges(text, tone):
+    assert ToneDetector({'x': ["c++"], 'y': ["go!"]}).detect(text) == tone
+
+
+def test_detect_batch_matches_detect():
+    detector = ToneDetector({'x': ["c++"], 'rude': ["who cares"]})
+    texts = ["I use c++", "", None, "who cares", "plain answer", "c++ and who cares"]
+    assert detector.detect_batch(texts) == [detector.detect(t) for t in texts]
+
+
+def test_scores_count_hits_per_tone():
+    assert ToneDetector().scores("whatever, whatever, obviously") == {'rude': 2, 'arrogant': 1}
+
+
+def test_empty_lexicons():
+    detector = ToneDetector({'rude': []})
+    assert detector.detect("who cares") == PROFESSIONAL
+    assert detector.detect_batch(["a", "b"]) == [PROFESSIONAL, PROFESSIONAL]
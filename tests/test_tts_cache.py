@@ -0,0 +1,120 @@
+import io
+import time
+import threading
+
+import pytest
+
+from tts_cache import TTSCache, mp3_duration
+
+# MPEG-1 Layer III, 128 kbps, 44.1 kHz, no padding: 417-byte frames of 1152 samples
+FRAME = b"\xff\xfb\x90\x00" + b"\x00" * 413
+FRAME_SECONDS = 1152 / 44100
+
+
+def test_mp3_duration_counts_frames():
+    assert mp3_duration(FRAME * 10) == pytest.approx(10 * FRAME_SECONDS)
+
+
+def test_mp3_duration_skips_id3_tag():
+    tag = b"ID3\x04\x00\x00\x00\x00\x01\x00" + b"\xff" * 128  # Synchsafe size 128
+    assert mp3_duration(tag + FRAME * 4) == pytest.approx(4 * FRAME_SECONDS)
+
+
+def test_mp3_duration_mpeg2():
+    # MPEG-2 Layer III, 64 kbps, 22.05 kHz: 576 samples per frame
+    frame = b"\xff\xf3\x80\x00" + b"\x00" * (576 // 8 * 64000 // 22050 - 4)
+    assert mp3_duration(frame * 3) == pytest.approx(3 * 576 / 22050)
+
+
+@pytest.mark.parametrize("audio", [b"", b"not audio at all", b"\xff\xfb\xf0\x00" * 8])
+def test_mp3_duration_without_frames(audio):
+    assert mp3_duration(audio) is None
+
+
+class FakePolly:
+    """synthesize_speech returning `audio` as a stream; blocks until `release` is set"""
+    def __init__(self, audio):
+        self.audio = audio
+        self.calls = 0
+        self.release = threading.Event()
+        self.release.set()
+
+    def synthesize_speech(self, Text, OutputFormat, VoiceId):
+        self.calls += 1
+        self.release.wait(5)
+        return {"AudioStream": io.BytesIO(self.audio)}
+
+
+def start_waiter(cache, text):
+    """Call synthesize(text) on a thread once the caller's stream has become the leader"""
+    result = {}
+
+    def wait():
+        try:
+            result['audio'] = cache.synthesize(text)
+        except Exception as e:
+            result['error'] = e
+
+    thread = threading.Thread(target=wait)
+    thread.start()
+    deadline = time.monotonic() + 2
+    while not any(f.waiters for f in cache._in_flight.values()) and time.monotonic() < deadline:
+        time.sleep(0.001)
+    return thread, result
+
+
+def test_stream_caches_full_clip():
+    polly = FakePolly(b"x" * 10)
+    cache = TTSCache(polly=polly)
+    assert b"".join(cache.stream("hello", chunk_size=4)) == b"x" * 10
+    assert cache.synthesize("hello") == b"x" * 10
+    assert polly.calls == 1
+
+
+def test_abandoned_stream_still_serves_waiters():
+    polly = FakePolly(b"abcdefghij")
+    cache = TTSCache(polly=polly)
+    chunks = cache.stream("hello", chunk_size=4)
+    assert next(chunks) == b"abcd"  # This session is now the leader
+
+    thread, result = start_waiter(cache, "hello")
+    chunks.close()  # The leader's interview was cancelled
+    thread.join(2)
+    assert result == {'audio': b"abcdefghij"}
+    assert cache.synthesize("hello") == b"abcdefghij"
+    assert polly.calls == 1
+
+
+def test_abandoned_stream_without_waiters_is_not_cached():
+    polly = FakePolly(b"abcdefghij")
+    cache = TTSCache(polly=polly)
+    chunks = cache.stream("hello", chunk_size=4)
+    next(chunks)
+    chunks.close()
+    assert not cache._in_flight
+    assert cache.synthesize("hello") == b"abcdefghij"
+    assert polly.calls == 2
+
+
+def test_disk_tier_evicts_least_recently_used(tmp_path):
+    cache = TTSCache(polly=FakePolly(b"y" * 100), cache_dir=str(tmp_path), max_entries=1, max_disk_bytes=250)
+    for text in ("one", "two"):
+        cache.synthesize(text)
+    cache._memory.clear()
+    cache.synthesize("one")  # Disk hit: "one" is now more recent than "two"
+    cache.synthesize("three")
+
+    names = {p.name for p in tmp_path.iterdir()}
+    assert names == {f"{cache.key(text)}.mp3" for text in ("one", "three")}
+    assert cache.stats()['disk_bytes'] == 200 and cache.stats()['disk_evictions'] == 1
+
+
+def test_disk_index_is_rebuilt_and_trimmed_on_start(tmp_path):
+    cache = TTSCache(polly=FakePolly(b"z" * 100), cache_dir=str(tmp_path), max_disk_bytes=1000)
+    for text in ("a", "b", "c"):
+        cache.synthesize(text)
+        time.sleep(0.01)
+
+    restarted = TTSCache(cache_dir=str(tmp_path), max_disk_bytes=150)
+    assert restarted.stats()['disk_entries'] == 1
+    assert restarted._read_disk(cache.key("c"), "mp3") == b"z" * 100
@@ -0,0 +1,158 @@
+import os
+import asyncio
+import tempfile
+
+# Importing the backend starts its services; keep them offline
+os.environ.setdefault("LLM_BACKEND", "stub")
+os.environ.setdefault("TTS_PREWARM", "0")
+os.environ.setdefault("TTS_CACHE_DIR", tempfile.mkdtemp(prefix="tts-cache-"))
+
+from cancellation import CancellationToken
+import flask_backend as fb
+from flask_backend import WebInterviewBot
+
+PARTIAL = "I usually start with discovery calls to qualify the lead"
+
+
+# Feedback drafted from partial answers
+
+def test_draft_fits_answer_that_adds_a_short_ending():
+    assert WebInterviewBot._draft_fits(PARTIAL, PARTIAL + " and then I book a demo.")
+
+
+def test_draft_fits_tolerates_revised_words():
+    assert WebInterviewBot._draft_fits(PARTIAL, "I usually start with discovery calls to qualify a lead.")
+
+
+def test_draft_rejected_when_answer_prefix_changed():
+    assert not WebInterviewBot._draft_fits(PARTIAL, "Honestly my whole process begins with a pricing review")
+
+
+def test_draft_rejected_when_too_many_words_were_added():
+    ending = " word" * (fb.PARTIAL_MAX_NEW_WORDS + 1)
+    assert WebInterviewBot._draft_fits(PARTIAL, PARTIAL + " word" * fb.PARTIAL_MAX_NEW_WORDS)
+    assert not WebInterviewBot._draft_fits(PARTIAL, PARTIAL + ending)
+
+
+async def drafted(reply, delay=0.0):
+    await asyncio.sleep(delay)
+    return reply
+
+
+def test_take_draft_uses_draft_that_fits():
+    async def take():
+        bot = WebInterviewBot("test-draft-accept")
+        bot._draft = (PARTIAL, asyncio.create_task(drafted(("Nice approach.", "Why discovery first?"))))
+        return await bot._take_draft(PARTIAL + " quickly."), bot
+
+    committed = fb.draft_stats['committed']
+    result, bot = asyncio.run(take())
+    assert result == ("Nice approach.", "Why discovery first?")
+    assert fb.draft_stats['committed'] == committed + 1
+    assert bot._draft is None
+
+
+def test_take_draft_discards_draft_that_no_longer_fits():
+    async def take():
+        bot = WebInterviewBot("test-draft-reject")
+        task = asyncio.create_task(drafted(("Nice approach.", None), delay=1.0))
+        bot._draft = (PARTIAL, task)
+        result = await bot._take_draft("Actually I focus on renewals and expansion revenue")
+        await asyncio.sleep(0)
+        return result, task
+
+    discarded = fb.draft_stats['discarded']
+    result, task = asyncio.run(take())
+    assert result is None
+    assert task.cancelled()
+    assert fb.draft_stats['discarded'] == discarded + 1
+
+
+def test_dropped_draft_is_cancelled_and_not_used():
+    async def take():
+        bot = WebInterviewBot("test-draft-drop")
+        task = asyncio.create_task(drafted(("Nice approach.", None), delay=1.0))
+        bot._draft = (PARTIAL, task)
+        bot._drop_draft()
+        result = await bot._take_draft(PARTIAL)
+        await asyncio.sleep(0)
+        return result, task
+
+    result, task = asyncio.run(take())
+    assert result is None
+    assert task.cancelled()
+
+
+def test_partial_without_payload_is_ignored():
+    fb.sessions.create("test-partial")
+    try:
+        asyncio.run(fb.handle_user_partial("test-partial", None))
+    finally:
+        fb.sessions.remove("test-partial")
+
+
+# Question sources
+
+def test_prefetched_bank_question_counts_only_when_asked():
+    async def prefetch(drop):
+        bot = WebInterviewBot("test-bank-count")
+        bot._plan_next_question("my answer", "A bank question?")
+        if drop:
+            bot._drop_speculative_question()
+            return None
+        bot.conversation_history.append({"role": "user", "content": "my answer"})
+        bot.question_count += 1
+        return await bot._take_speculative_question()
+
+    asked = fb.question_sources['bank']
+    assert asyncio.run(prefetch(drop=True)) is None
+    assert fb.question_sources['bank'] == asked
+    assert asyncio.run(prefetch(drop=False)) == ("A bank question?", 'bank')
+    assert fb.question_sources['bank'] == asked
+
+
+# Cancellation
+
+class FakeTTS:
+    """Stands in for the TTS cache; cancels `token` once `cancel_after` chunks were read"""
+    def __init__(self, token=None, cancel_after=None):
+        self.token = token
+        self.cancel_after = cancel_after
+        self.read = 0
+        self.closed = False
+        self.synthesized = []
+
+    def stream(self, text, chunk_size=4096):
+        try:
+            for _ in range(100):
+                if self.read == self.cancel_after:
+                    self.token.cancel()
+                self.read += 1
+                yield b"mp3"
+        finally:
+            self.closed = True
+
+    def synthesize(self, text):
+        self.synthesized.append(text)
+
+
+def test_cancel_stops_tts_stream(monkeypatch):
+    token = CancellationToken()
+    tts = FakeTTS(token, cancel_after=2)
+    monkeypatch.setattr(fb, "tts_cache", tts)
+    avoided = fb.work_avoided['tts_streams']
+
+    audio = WebInterviewBot("test-tts-cancel")._stream_speech("u1", "Hello there.", token=token)
+    assert audio == b"mp3mp3"
+    assert tts.read == 3 and tts.closed
+    assert fb.work_avoided['tts_streams'] == avoided + 1
+
+
+def test_cancelled_interview_skips_tts_prefetch(monkeypatch):
+    tts = FakeTTS()
+    monkeypatch.setattr(fb, "tts_cache", tts)
+    bot = WebInterviewBot("test-tts-prefetch")
+    bot._warm_tts("Next question?")
+    bot.cancel_token.cancel()
+    bot._warm_tts("Another question?")
+    assert tts.synthesized == ["Next question?"]
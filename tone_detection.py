@@ -0,0 +1,117 @@
+import re
+import json
+import bisect
+import logging
+from collections import Counter
+
+logger = logging.getLogger(__name__)
+
+# Tone -> trigger phrases, checked in this order (the first tone with a hit wins).
+# Apostrophes are ignored on both sides, so "that's easy" also matches "thats easy".
+DEFAULT_LEXICONS = {
+    'arrogant': [
+        "obviously", "everyone knows", "child's play", "that's easy", "trivial",
+        "waste of time", "no brainer", "piece of cake",
+    ],
+    'rude': [
+        "you don't understand", "that's stupid", "dumb question", "are you serious",
+        "this is ridiculous", "who cares", "whatever", "this sucks",
+    ],
+}
+
+PROFESSIONAL = "professional"
+
+_APOSTROPHES = re.compile(r"['’`]")
+_SPACES = re.compile(r"\s+")
+
+
+def _normalize(text):
+    return _SPACES.sub(' ', _APOSTROPHES.sub('', text.lower())).strip()
+
+
+def _trie_pattern(phrases):
+    """Regex alternation with shared prefixes factored out, e.g. (?:th(?:is sucks|ats easy)).
+
+    Python's re tries alternatives one by one, so a flat list of N phrases costs
+    O(N) at every position; the trie only follows branches that match so far.
+    """
+    trie = {}
+    for phrase in phrases:
+        node = trie
+        for char in phrase:
+            node = node.setdefault(char, {})
+        node[''] = {}  # End of a phrase
+
+    def build(node):
+        end = '' in node
+        branches = [re.escape(char) + build(child) for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ''
+        body = branches[0] if len(branches) == 1 else '(?:' + '|'.join(branches) + ')'
+        if end:
+            # Shorter phrase ends here; longer ones are tried first (greedy)
+            return '(?:' + body + ')?'
+        return body
+
+    return build(trie)
+
+
+class ToneDetector:
+    """Tags candidate responses with a tone using one precompiled pattern.
+
+    Every lexicon phrase goes into a single prefix-factored regex that only
+    matches whole words, so a response is scanned once however many phrases
+    there are. detect_batch scores many transcripts in one scan of their concatenation.
+    """
+    def __init__(self, lexicons=None):
+        self.lexicons = {tone: list(phrases) for tone, phrases in (lexicons or DEFAULT_LEXICONS).items()}
+        self._rank = {tone: i for i, tone in enumerate(self.lexicons)}
+        self._tone_of = {}
+        for tone, phrases in self.lexicons.items():
+            for phrase in phrases:
+                # First tone listing a phrase keeps it
+                self._tone_of.setdefault(_normalize(phrase), tone)
+        if self._tone_of:
+            # Lookarounds rather than \b, so phrases may start or end with punctuation ("c++", "go!")
+            self._pattern = re.compile(r'(?<!\w)' + _trie_pattern(self._tone_of) + r'(?!\w)')
+        else:
+            self._pattern = None
+
+    @classmethod
+    def from_file(cls, path):
+        """Load lexicons from a JSON file of {"tone": ["phrase", ...]}"""
+        with open(path, encoding='utf-8') as f:
+            return cls(json.load(f))
+
+    def _pick(self, hits):
+        if not hits:
+            return PROFESSIONAL
+        return min(hits, key=self._rank.__getitem__)
+
+    def scores(self, text):
+        """Number of phrase hits per tone"""
+        if not text or self._pattern is None:
+            return Counter()
+        return Counter(self._tone_of[m.group()] for m in self._pattern.finditer(_normalize(text)))
+
+    def detect(self, text):
+        """Tone of one response: the first matching lexicon's name, or 'professional'"""
+        if not text or self._pattern is None:
+            return PROFESSIONAL
+        return self._pick({self._tone_of[m.group()] for m in self._pattern.finditer(_normalize(text))})
+
+    def detect_batch(self, texts):
+        """Tones for many responses from a single regex scan"""
+        texts = [_normalize(t) if t else '' for t in texts]
+        if self._pattern is None:
+            return [PROFESSIONAL] * len(texts)
+
+        # Newlines never occur inside a normalized text or a phrase, so matches can't straddle texts
+        starts, offset = [], 0
+        for text in texts:
+            starts.append(offset)
+            offset += len(text) + 1
+        hits = [set() for _ in texts]
+        for m in self._pattern.finditer('\n'.join(texts)):
+            hits[bisect.bisect_right(starts, m.start()) - 1].add(self._tone_of[m.group()])
+        return [self._pick(h) for h in hits]
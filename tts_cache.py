@@ -0,0 +1,459 @@
+import os
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_VOICE = "Aditi"
+DEFAULT_FORMAT = "mp3"
+
+
+def create_polly_client(max_connections=None, timeout=None):
+    """Create a Polly client from the environment, or None if boto3 is unavailable.
+
+    max_connections sizes the client's HTTP connection pool (POLLY_MAX_CONNECTIONS,
+    default 32) so concurrent sessions don't queue on botocore's default of 10.
+    timeout (POLLY_TIMEOUT, default 10 s) bounds connecting and each read, so a
+    synthesis nobody needs any more can't hold a worker thread for botocore's 60 s.
+    """
+    try:
+        import boto3
+        from botocore.config import Config
+        if max_connections is None:
+            max_connections = int(os.getenv("POLLY_MAX_CONNECTIONS", "32"))
+        if timeout is None:
+            timeout = float(os.getenv("POLLY_TIMEOUT", "10"))
+        return boto3.client("polly", region_name=os.getenv("AWS_REGION", "ap-south-1"),
+                            config=Config(max_pool_connections=max_connections,
+                                          connect_timeout=timeout, read_timeout=timeout))
+    except Exception as e:
+        logger.warning(f"Polly client unavailable for TTS cache: {e}")
+        return None
+
+
+_shared_polly = None
+_shared_polly_lock = threading.Lock()
+
+
+def shared_polly_client():
+    """The process-wide Polly client, created on first use.
+
+    boto3 clients are thread-safe, so every session and the TTS cache use this
+    one. Returns None (and retries on the next call) if it can't be created.
+    """
+    global _shared_polly
+    with _shared_polly_lock:
+        if _shared_polly is None:
+            _shared_polly = create_polly_client()
+        return _shared_polly
+
+
+# MPEG audio Layer III tables, indexed by header fields
+_MP3_BITRATES = {
+    'v1': [0, 32, 40, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320],
+    'v2': [0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160],
+}
+_MP3_SAMPLE_RATES = {
+    3: [44100, 48000, 32000],  # MPEG 1
+    2: [22050, 24000, 16000],  # MPEG 2
+    0: [11025, 12000, 8000],   # MPEG 2.5
+}
+
+
+def mp3_duration(audio):
+    """Playback length in seconds of an MP3 clip, from its frame headers.
+
+    Returns None if no Layer III frames are found.
+    """
+    pos = 0
+    if audio[:3] == b"ID3" and len(audio) >= 10:
+        # Skip the ID3v2 tag (synchsafe size)
+        size = (audio[6] << 21) | (audio[7] << 14) | (audio[8] << 7) | audio[9]
+        pos = 10 + size
+
+    seconds = 0.0
+    frames = 0
+    end = len(audio) - 4
+    while pos <= end:
+        if audio[pos] != 0xFF or (audio[pos + 1] & 0xE0) != 0xE0:
+            pos += 1
+            continue
+        version = (audio[pos + 1] >> 3) & 0x03
+        layer = (audio[pos + 1] >> 1) & 0x03
+        bitrate_index = audio[pos + 2] >> 4
+        rate_index = (audio[pos + 2] >> 2) & 0x03
+        padding = (audio[pos + 2] >> 1) & 0x01
+        if version == 1 or layer != 1 or bitrate_index in (0, 15) or rate_index == 3:
+            pos += 1
+            continue
+
+        sample_rate = _MP3_SAMPLE_RATES[version][rate_index]
+        bitrate = _MP3_BITRATES['v1' if version == 3 else 'v2'][bitrate_index] * 1000
+        samples = 1152 if version == 3 else 576
+        frame_length = samples // 8 * bitrate // sample_rate + padding
+
+        seconds += samples / sample_rate
+        frames += 1
+        pos += frame_length
+
+    return seconds if frames else None
+
+
+class _InFlight:
+    """A synthesis in progress that other callers can wait on"""
+    def __init__(self):
+        self.done = threading.Event()
+        self.audio = None
+        self.error = None
+        self.waiters = 0  # Callers that joined and wait on done; changed under TTSCache._lock
+
+
+class TTSCache:
+    """Content-addressed Polly audio cache.
+
+    Audio is keyed by (text, voice, format), kept in a bounded in-memory LRU
+    and written through to disk so restarts and other workers can reuse it.
+    The disk tier is an LRU too, capped at max_disk_bytes: generated
+    questions and feedback are synthesized every interview, so it would
+    otherwise grow without bound. Concurrent requests for the same key share
+    a single Polly call.
+    """
+    def __init__(self, polly=None, voice=DEFAULT_VOICE, output_format=DEFAULT_FORMAT,
+                 max_entries=256, cache_dir=None, max_disk_bytes=200 * 1024 * 1024):
+        self.polly = polly
+        self.voice = voice
+        self.output_format = output_format
+        self.max_entries = max_entries
+        self.cache_dir = cache_dir
+        self.max_disk_bytes = max_disk_bytes
+
+        self._memory = OrderedDict()
+        self._disk = OrderedDict()  # File name -> size, least recently used first
+        self._disk_bytes = 0
+        self._in_flight = {}
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.disk_evictions = 0
+
+        if self.cache_dir:
+            try:
+                os.makedirs(self.cache_dir, exist_ok=True)
+                self._load_disk_index()
+            except OSError as e:
+                logger.warning(f"TTS disk cache disabled ({self.cache_dir}): {e}")
+                self.cache_dir = None
+
+    def set_client(self, polly):
+        """Attach a Polly client if the cache doesn't have one yet"""
+        if self.polly is None:
+            self.polly = polly
+
+    def key(self, text, voice=None, output_format=None):
+        voice = voice or self.voice
+        output_format = output_format or self.output_format
+        return hashlib.sha256(f"{voice}\0{output_format}\0{text}".encode("utf-8")).hexdigest()
+
+    def synthesize(self, text, voice=None, output_format=None):
+        """Return audio bytes for text, synthesizing with Polly only on a cache miss"""
+        voice = voice or self.voice
+        output_format = output_format or self.output_format
+        key = self.key(text, voice, output_format)
+
+        with self._lock:
+            audio = self._memory.get(key)
+            if audio is not None:
+                self._memory.move_to_end(key)
+                self.hits += 1
+                return audio
+
+            flight = self._in_flight.get(key)
+            leader = flight is None
+            if leader:
+                flight = _InFlight()
+                self._in_flight[key] = flight
+            else:
+                flight.waiters += 1
+
+        if not leader:
+            # Someone else is already fetching this clip - wait for their result
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.audio
+
+        try:
+            audio = self._read_disk(key, output_format)
+            if audio is not None:
+                self.disk_hits += 1
+            else:
+                self.misses += 1
+                audio = self._synthesize_polly(text, voice, output_format)
+                self._write_disk(key, output_format, audio)
+            self._remember(key, audio)
+            self._finish_flight(key, flight, audio=audio)
+            return audio
+        except Exception as e:
+            self._finish_flight(key, flight, error=e)
+            raise
+
+    def stream(self, text, chunk_size=4096, voice=None, output_format=None):
+        """Yield audio for text in chunks as Polly produces it.
+
+        Cached clips are replayed from memory/disk; on a miss the Polly
+        AudioStream is forwarded chunk by chunk and the full clip is cached
+        once it completes. A clip already being synthesized by another
+        session is waited on rather than requested twice. If the consumer
+        stops early while others wait on the clip, the rest is read in the
+        background for them (see _abandon).
+        """
+        voice = voice or self.voice
+        output_format = output_format or self.output_format
+        key = self.key(text, voice, output_format)
+
+        with self._lock:
+            audio = self._memory.get(key)
+            if audio is not None:
+                self._memory.move_to_end(key)
+                self.hits += 1
+            flight = self._in_flight.get(key)
+            leader = audio is None and flight is None
+            if leader:
+                flight = _InFlight()
+                self._in_flight[key] = flight
+            elif audio is None:
+                flight.waiters += 1
+
+        if audio is None and not leader:
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            audio = flight.audio
+
+        if audio is None:
+            audio = self._read_disk(key, output_format)
+            if audio is not None:
+                self.disk_hits += 1
+
+        if audio is not None:
+            if leader:
+                self._remember(key, audio)
+                self._finish_flight(key, flight, audio=audio)
+            for start in range(0, len(audio), chunk_size):
+                yield audio[start:start + chunk_size]
+            return
+
+        self.misses += 1
+        parts = []
+        body = None
+        try:
+            if self.polly is None:
+                raise RuntimeError("Polly client not initialized")
+            response = self.polly.synthesize_speech(
+                Text=text,
+                OutputFormat=output_format,
+                VoiceId=voice
+            )
+            body = response["AudioStream"]
+            while True:
+                chunk = body.read(chunk_size)
+                if not chunk:
+                    break
+                parts.append(chunk)
+                yield chunk
+        except GeneratorExit:
+            # The consumer stopped early (e.g. its interview was cancelled)
+            if self._abandon(key, flight, body, parts, chunk_size, output_format):
+                body = None  # Now read and closed by the hand-off thread
+            raise
+        except BaseException as e:
+            self._finish_flight(key, flight, error=e if isinstance(e, Exception) else RuntimeError("TTS stream failed"))
+            raise
+        finally:
+            if body is not None:
+                body.close()  # Hands the connection back to the pool even if abandoned
+
+        audio = b"".join(parts)
+        self._write_disk(key, output_format, audio)
+        self._remember(key, audio)
+        self._finish_flight(key, flight, audio=audio)
+
+    def _abandon(self, key, flight, body, parts, chunk_size, output_format):
+        """A streaming leader stopped early. Returns True if a thread took over body.
+
+        With nobody waiting the flight is just dropped (the partial clip isn't
+        cached). Otherwise the rest of the clip is read in the background, so
+        waiters from other sessions still get their audio rather than an error.
+        """
+        with self._lock:
+            if not flight.waiters or body is None:
+                # New callers start their own synthesis from here on
+                self._in_flight.pop(key, None)
+                orphaned = True
+            else:
+                orphaned = False
+        if orphaned:
+            flight.error = RuntimeError("TTS stream abandoned")
+            flight.done.set()
+            return False
+
+        def finish():
+            try:
+                while True:
+                    chunk = body.read(chunk_size)
+                    if not chunk:
+                        break
+                    parts.append(chunk)
+            except Exception as e:
+                self._finish_flight(key, flight, error=e)
+                return
+            finally:
+                body.close()
+            audio = b"".join(parts)
+            self._write_disk(key, output_format, audio)
+            self._remember(key, audio)
+            self._finish_flight(key, flight, audio=audio)
+
+        threading.Thread(target=finish, name="tts-handoff", daemon=True).start()
+        return True
+
+    def prewarm(self, texts, workers=4):
+        """Synthesize static phrases in the background so first use is a cache hit"""
+        texts = [t for t in dict.fromkeys(texts) if t]
+        if not texts or self.polly is None:
+            return None
+
+        def _warm_all():
+            with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="tts-prewarm") as pool:
+                for text in texts:
+                    pool.submit(self._warm_one, text)
+            logger.info(f"TTS cache prewarmed {len(texts)} phrases")
+
+        thread = threading.Thread(target=_warm_all, daemon=True)
+        thread.start()
+        return thread
+
+    def _warm_one(self, text):
+        try:
+            self.synthesize(text)
+        except Exception as e:
+            logger.warning(f"TTS prewarm failed for {text[:40]!r}: {e}")
+
+    def stats(self):
+        with self._lock:
+            return {
+                'entries': len(self._memory),
+                'hits': self.hits,
+                'disk_hits': self.disk_hits,
+                'misses': self.misses,
+                'disk_entries': len(self._disk),
+                'disk_bytes': self._disk_bytes,
+                'disk_evictions': self.disk_evictions,
+            }
+
+    def _synthesize_polly(self, text, voice, output_format):
+        if self.polly is None:
+            raise RuntimeError("Polly client not initialized")
+        response = self.polly.synthesize_speech(
+            Text=text,
+            OutputFormat=output_format,
+            VoiceId=voice
+        )
+        return response["AudioStream"].read()
+
+    def _finish_flight(self, key, flight, audio=None, error=None):
+        flight.audio = audio
+        flight.error = error
+        with self._lock:
+            self._in_flight.pop(key, None)
+        flight.done.set()
+
+    def _remember(self, key, audio):
+        with self._lock:
+            self._memory[key] = audio
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.max_entries:
+                self._memory.popitem(last=False)
+
+    def _path(self, key, output_format):
+        return os.path.join(self.cache_dir, f"{key}.{output_format}")
+
+    def _load_disk_index(self):
+        """Index clips already on disk, oldest modification first, and trim to the cap"""
+        files = []
+        for entry in os.scandir(self.cache_dir):
+            if entry.is_file() and not entry.name.endswith(".tmp"):
+                stat = entry.stat()
+                files.append((stat.st_mtime, entry.name, stat.st_size))
+        with self._lock:
+            for _, name, size in sorted(files):
+                self._disk[name] = size
+                self._disk_bytes += size
+        self._evict_disk()
+
+    def _touch_disk(self, name, size=None):
+        """Mark a file as most recently used; size records a newly written one"""
+        with self._lock:
+            if size is not None:
+                self._disk_bytes += size - self._disk.get(name, 0)
+                self._disk[name] = size
+            if name in self._disk:
+                self._disk.move_to_end(name)
+
+    def _evict_disk(self):
+        """Delete least recently used clips until the disk tier fits max_disk_bytes"""
+        if not self.max_disk_bytes:
+            return
+        victims = []
+        with self._lock:
+            while self._disk_bytes > self.max_disk_bytes and len(self._disk) > 1:
+                name, size = self._disk.popitem(last=False)
+                self._disk_bytes -= size
+                victims.append(name)
+            self.disk_evictions += len(victims)
+        for name in victims:
+            try:
+                os.remove(os.path.join(self.cache_dir, name))
+            except FileNotFoundError:
+                pass  # Another worker sharing the directory evicted it first
+            except OSError as e:
+                logger.warning(f"TTS disk cache eviction failed: {e}")
+
+    def _read_disk(self, key, output_format):
+        if not self.cache_dir:
+            return None
+        path = self._path(key, output_format)
+        try:
+            with open(path, "rb") as f:
+                audio = f.read()
+        except FileNotFoundError:
+            return None
+        except OSError as e:
+            logger.warning(f"TTS disk cache read failed: {e}")
+            return None
+        self._touch_disk(os.path.basename(path), len(audio))
+        try:
+            os.utime(path)  # Recency survives restarts (the index is rebuilt by mtime)
+        except OSError:
+            pass
+        return audio
+
+    def _write_disk(self, key, output_format, audio):
+        if not self.cache_dir:
+            return
+        path = self._path(key, output_format)
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        try:
+            with open(tmp_path, "wb") as f:
+                f.write(audio)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logger.warning(f"TTS disk cache write failed: {e}")
+            return
+        self._touch_disk(os.path.basename(path), len(audio))
+        self._evict_disk()
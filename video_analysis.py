@@ -0,0 +1,334 @@
+import os
+import time
+import base64
+import logging
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+import numpy as np
+
+from face_detectors import create_detector
+from face_tracking import ChangeGate, FaceTracker, FULL_SCAN_EVERY, decode_frame, thumbnail
+
+logger = logging.getLogger(__name__)
+
+# Per-process detector, loaded once by the pool initializer
+_detector = None
+
+
+def frame_buffer(frame_data):
+    """Wrap an uploaded frame as a uint8 array for cv2.imdecode.
+
+    Binary uploads (raw JPEG/WebP bytes) are wrapped without copying; legacy
+    clients still send a base64 data: URL.
+    """
+    if isinstance(frame_data, (bytes, bytearray, memoryview)):
+        return np.frombuffer(frame_data, np.uint8)
+    return np.frombuffer(base64.b64decode(frame_data.split(',', 1)[1]), np.uint8)
+
+
+def _init_worker(detector_name):
+    global _detector
+    try:
+        _detector = create_detector(detector_name)
+    except Exception as e:
+        logger.warning(f"Face detection unavailable in video worker: {e}")
+        _detector = None
+
+
+def analyze_frame(frame_data, tracker, gate=None):
+    """Count the faces in an uploaded frame (runs in a worker process).
+
+    With a ChangeGate, a frame that looks like the last analyzed one reuses
+    its face count without running the detector. Returns (face_count,
+    tracker, gate) with the session's state updated; face_count is None if
+    the frame can't be decoded or no detector is available.
+    """
+    if _detector is None:
+        return None, tracker, gate
+    buffer = frame_buffer(frame_data)
+    if gate is not None:
+        now = time.monotonic()
+        thumb = thumbnail(buffer)
+        faces = gate.check(thumb, now)
+        if faces is not None:
+            return faces, tracker, gate
+    image, _ = decode_frame(buffer, _detector.detect_width, _detector.color)
+    if image is None:
+        return None, tracker, gate
+    if gate is not None and tracker.box is not None and gate.changed_outside(tracker.box, image.shape):
+        tracker.box = None  # Something changed away from the tracked face - scan the whole frame
+    faces = len(tracker.detect(_detector, image))
+    if gate is not None:
+        gate.update(thumb, faces, now)
+    return faces, tracker, gate
+
+
+def analyze_batch(items):
+    """Analyze one frame per session in a single worker round trip.
+
+    items is a list of (frame_data, tracker, gate); returns a list of
+    (face_count, tracker, gate, cpu_seconds) in the same order.
+    """
+    results = []
+    for frame_data, tracker, gate in items:
+        start = time.process_time()
+        try:
+            faces, tracker, gate = analyze_frame(frame_data, tracker, gate)
+        except Exception as e:
+            logger.error(f"Video analysis error: {e}")
+            faces = None
+        results.append((faces, tracker, gate, time.process_time() - start))
+    return results
+
+
+# Upload settings the server asks clients for, from most to least demanding
+CAPTURE_TIERS = {
+    'alert':      {'interval': 0.5, 'width': 640, 'quality': 0.8},  # Watching a recent violation closely
+    'normal':     {'interval': 1.0, 'width': 640, 'quality': 0.8},
+    'busy':       {'interval': 2.0, 'width': 480, 'quality': 0.7},
+    'overloaded': {'interval': 4.0, 'width': 320, 'quality': 0.6},
+}
+
+
+def capture_tier(load, recently_alerted):
+    """Pick a CAPTURE_TIERS key from VideoAnalyzer.load() and the session's alert state"""
+    pressure = max(load['utilization'], load['system'])
+    if pressure > 1.2 or load['backlog'] > 0.5:
+        return 'overloaded'
+    if pressure > 0.8 or load['backlog'] > 0.2:
+        return 'normal' if recently_alerted else 'busy'
+    return 'alert' if recently_alerted else 'normal'
+
+
+class VideoAnalyzer:
+    """Cross-session video analysis scheduler backed by a bounded process pool.
+
+    Uploads never trigger work directly: each session keeps a one-slot
+    mailbox, and a newer frame replaces the waiting one (latest frame wins).
+    Every tick the scheduler collects the waiting frame of each idle
+    session, oldest-analyzed first, and ships them to the workers as a few
+    batches - one round trip per worker instead of one per frame.
+
+    cpu_budget caps detector CPU in cores (CPU-seconds per second across all
+    workers). Each session's per-frame cost is tracked, and when a tick's
+    budget runs out the remaining sessions keep their frame for the next
+    tick. Serving the stalest sessions first gives every session an equal
+    share when the process is overloaded.
+    """
+    def __init__(self, workers=2, full_scan_every=FULL_SCAN_EVERY, detector=None,
+                 tick_interval=0.2, cpu_budget=None, max_staleness=5.0):
+        self.workers = workers
+        self.full_scan_every = full_scan_every
+        self.detector = detector  # Backend name for create_detector; None reads FACE_DETECTOR
+        self.tick_interval = tick_interval
+        self.cpu_budget = cpu_budget or float(workers)
+        self.max_staleness = max_staleness  # Unchanged scenes are re-checked this often; 0 disables the gate
+
+        self._pool = None
+        self._thread = None
+        self._stopped = threading.Event()
+        self._lock = threading.Lock()
+
+        self._mailbox = {}        # session -> (frame, on_result) waiting for the next tick
+        self._busy = set()        # sessions with a frame in a batch
+        self._trackers = {}       # session -> FaceTracker, round-tripped through the workers
+        self._gates = {}          # session -> ChangeGate, likewise
+        self._cost = {}           # session -> smoothed CPU seconds per frame
+        self._last_analyzed = {}  # session -> monotonic time of its last analysis
+        self._batches_in_flight = 0
+        self._credit = 0.0        # unspent CPU-seconds, capped at one tick's budget
+        self._utilization = 0.0   # smoothed detector CPU used / budget
+        self._backlog = 0.0       # smoothed share of ready sessions deferred per tick
+        self._cpu_at_last_tick = 0.0
+
+        self.submitted = 0
+        self.analyzed = 0
+        self.replaced = 0
+        self.deferred = 0
+        self.batches = 0
+        self.cpu_seconds = 0.0
+        self.errors = 0
+
+    def _executor(self):
+        with self._lock:
+            if self._pool is None:
+                # spawn: the server process runs threads, which fork doesn't copy safely
+                self._pool = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=_init_worker,
+                    initargs=(self.detector,)
+                )
+            return self._pool
+
+    def submit(self, session, frame, on_result):
+        """Leave a frame for a session; on_result(face_count) is called from a pool thread"""
+        with self._lock:
+            self.submitted += 1
+            if session in self._mailbox:
+                self.replaced += 1
+            self._mailbox[session] = (frame, on_result)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="video-scheduler", daemon=True)
+                self._thread.start()
+
+    def discard(self, session):
+        """Drop a session's waiting frame and scheduling state (e.g. on disconnect)"""
+        with self._lock:
+            self._mailbox.pop(session, None)
+            self._trackers.pop(session, None)
+            self._gates.pop(session, None)
+            self._cost.pop(session, None)
+            self._last_analyzed.pop(session, None)
+            self._busy.discard(session)
+
+    def _run(self):
+        while not self._stopped.wait(self.tick_interval):
+            try:
+                self._tick()
+            except Exception as e:
+                logger.error(f"Video scheduler error: {e}")
+
+    def _tick(self):
+        with self._lock:
+            budget = self.cpu_budget * self.tick_interval
+            self._credit = min(budget, self._credit + budget)
+            used, self._cpu_at_last_tick = self.cpu_seconds - self._cpu_at_last_tick, self.cpu_seconds
+            self._utilization = 0.9 * self._utilization + 0.1 * used / budget
+            free_workers = self.workers - self._batches_in_flight
+            if free_workers <= 0 or not self._mailbox:
+                if self._mailbox:
+                    self._backlog = 0.9 * self._backlog + 0.1
+                return
+
+            ready = [s for s in self._mailbox if s not in self._busy]
+            ready.sort(key=lambda s: self._last_analyzed.get(s, 0.0))
+            selected = []
+            for session in ready:
+                cost = self._cost.get(session, 0.0)
+                if selected and cost > self._credit:
+                    break
+                self._credit -= cost
+                selected.append(session)
+            self.deferred += len(ready) - len(selected)
+            self._backlog = 0.9 * self._backlog + 0.1 * (len(ready) - len(selected)) / max(1, len(ready))
+            if not selected:
+                return
+
+            items = []
+            for session in selected:
+                frame, on_result = self._mailbox.pop(session)
+                tracker = self._trackers.get(session) or FaceTracker(self.full_scan_every)
+                gate = self._gates.get(session)
+                if gate is None and self.max_staleness > 0:
+                    gate = ChangeGate(self.max_staleness)
+                items.append((session, frame, tracker, gate, on_result))
+                self._busy.add(session)
+
+        # Spread the sessions over the free workers, one batch each
+        batch_count = min(free_workers, len(items))
+        for i in range(batch_count):
+            self._dispatch(items[i::batch_count])
+
+    def _dispatch(self, batch):
+        try:
+            future = self._executor().submit(analyze_batch, [(frame, tracker, gate) for _, frame, tracker, gate, _ in batch])
+        except Exception as e:
+            # Pool shut down or broken - drop these frames
+            logger.error(f"Video analysis dispatch failed: {e}")
+            with self._lock:
+                self.errors += 1
+                for session, *_ in batch:
+                    self._busy.discard(session)
+            return
+        with self._lock:
+            self._batches_in_flight += 1
+            self.batches += 1
+        future.add_done_callback(lambda f: self._finished(batch, f))
+
+    def _finished(self, batch, future):
+        try:
+            results = future.result()
+        except Exception as e:
+            logger.error(f"Video analysis error: {e}")
+            results = [(None, None, None, 0.0)] * len(batch)
+            with self._lock:
+                self.errors += 1
+                if isinstance(e, BrokenProcessPool) and self._pool is not None:
+                    # A worker died; start a fresh pool on the next dispatch
+                    self._pool.shutdown(wait=False)
+                    self._pool = None
+
+        now = time.monotonic()
+        callbacks = []
+        with self._lock:
+            self._batches_in_flight -= 1
+            for (session, _, _, _, on_result), (faces, tracker, gate, cpu) in zip(batch, results):
+                if session not in self._busy:
+                    continue  # Discarded while in flight
+                self._busy.discard(session)
+                self._last_analyzed[session] = now
+                if gate is not None:
+                    self._gates[session] = gate
+                if tracker is not None:
+                    self._trackers[session] = tracker
+                    previous = self._cost.get(session)
+                    self._cost[session] = cpu if previous is None else 0.8 * previous + 0.2 * cpu
+                    self.cpu_seconds += cpu
+                    self.analyzed += 1
+                if faces is not None:
+                    callbacks.append((on_result, faces))
+
+        for on_result, faces in callbacks:
+            try:
+                on_result(faces)
+            except Exception as e:
+                logger.error(f"Video analysis callback error: {e}")
+
+    def load(self):
+        """Current analysis pressure, used to steer client capture settings.
+
+        utilization: detector CPU as a fraction of cpu_budget
+        backlog: share of waiting sessions whose frame had to wait a tick
+        system: host load average per core (0 where unavailable)
+        """
+        try:
+            system = os.getloadavg()[0] / (os.cpu_count() or 1)
+        except (AttributeError, OSError):
+            system = 0.0
+        with self._lock:
+            return {'utilization': self._utilization, 'backlog': self._backlog, 'system': system}
+
+    def stats(self):
+        with self._lock:
+            trackers = list(self._trackers.values())
+            gates = list(self._gates.values())
+            return {
+                'workers': self.workers,
+                'cpu_budget': self.cpu_budget,
+                'utilization': round(self._utilization, 2),
+                'backlog': round(self._backlog, 2),
+                'sessions': len(self._last_analyzed),
+                'busy_sessions': len(self._busy),
+                'waiting_frames': len(self._mailbox),
+                'submitted': self.submitted,
+                'analyzed': self.analyzed,
+                'replaced': self.replaced,
+                'deferred': self.deferred,
+                'batches': self.batches,
+                'cpu_seconds': round(self.cpu_seconds, 2),
+                'full_scans': sum(t.full_scans for t in trackers),
+                'roi_scans': sum(t.roi_scans for t in trackers),
+                'unchanged_skipped': sum(g.skipped for g in gates),
+                'errors': self.errors,
+            }
+
+    def shutdown(self):
+        self._stopped.set()
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=False, cancel_futures=True)